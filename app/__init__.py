@@ -1,25 +1,148 @@
 import os
-from flask import Flask, app
 from flask_login import LoginManager
-from app.db import db, migrate
+from app.db import db, configure_sqlite
+from app.utils.deferred_routes import DeferredRoutesFlask
 
-def create_app():
-    """Create and configure the Flask application."""
-    app = Flask(__name__, instance_relative_config=True)
+def create_app(test_config=None):
+    """Create and configure the Flask application.
+
+    Args:
+        test_config (dict): Optional config values applied on top of the
+            defaults, before extensions are initialized (used by tests and
+            benchmarks to point at a scratch database)
+    """
+    app = DeferredRoutesFlask(__name__, instance_relative_config=True)
 
     # ---- Basic Config ----
     app.config["SECRET_KEY"] = "dev"  # You can replace with a real secret in production
     os.makedirs(app.instance_path, exist_ok=True)
+    # Import and register blueprints when the URL map is first used rather
+    # than at startup, so CLI commands skip the route modules
+    app.config["LAZY_BLUEPRINTS"] = os.environ.get("LAZY_BLUEPRINTS", "1") != "0"
 
     # ---- Database Config ----
     app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(app.instance_path, 'ps.db')}"
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+    # ---- Password Hashing Config ----
+    # Method uses werkzeug syntax; stored hashes with other parameters are
+    # upgraded on the user's next successful login
+    app.config["PASSWORD_HASH_METHOD"] = os.environ.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    app.config["PASSWORD_HASH_WORKERS"] = int(os.environ.get("PASSWORD_HASH_WORKERS", 2))
+    app.config["PASSWORD_HASH_QUEUE_LIMIT"] = int(os.environ.get("PASSWORD_HASH_QUEUE_LIMIT", 16))
+    app.config["PASSWORD_HASH_EXECUTOR"] = os.environ.get("PASSWORD_HASH_EXECUTOR", "thread")
+
+    # ---- Identity Cache Config ----
+    app.config["USER_CACHE_SIZE"] = 5000
+    app.config["USER_CACHE_TTL"] = int(os.environ.get("USER_CACHE_TTL", 300))
+    app.config["USER_CACHE_CHECK_INTERVAL"] = int(os.environ.get("USER_CACHE_CHECK_INTERVAL", 5))
+
+    # ---- Rate Limit Config ----
+    # Per-endpoint overrides go in RATE_LIMITS, e.g. {"login": "5/minute;burst=10"}
+    app.config["RATE_LIMIT_ENABLED"] = os.environ.get("RATE_LIMIT_ENABLED", "1") != "0"
+    # "memory" or "sqlite"; unset means sqlite under multi-worker `flask serve`, memory otherwise
+    app.config["RATE_LIMIT_STORAGE"] = os.environ.get("RATE_LIMIT_STORAGE")
+    app.config["RATE_LIMIT_SQLITE_PATH"] = os.path.join(app.instance_path, 'ratelimit.db')
+    app.config["RATE_LIMIT_MAX_KEYS"] = 10000
+    app.config["RATE_LIMITS"] = {}
+
+    # ---- Pagination Config ----
+    app.config["BOOKINGS_PER_PAGE"] = int(os.environ.get("BOOKINGS_PER_PAGE", 20))
+    app.config["BOOKINGS_MAX_PER_PAGE"] = 100
+    app.config["SHOP_PRODUCTS_PER_PAGE"] = int(os.environ.get("SHOP_PRODUCTS_PER_PAGE", 24))
+    app.config["ADMIN_PRODUCTS_PER_PAGE"] = 50
+    app.config["BOOKINGS_EXPORT_CHUNK_SIZE"] = 1000  # Rows per partition query in CSV exports
+
+    # ---- Cache Config ----
+    app.config["CATALOG_CACHE_TTL"] = float(os.environ.get("CATALOG_CACHE_TTL", 30))
+    app.config["PUBLIC_PAGE_MAX_AGE"] = int(os.environ.get("PUBLIC_PAGE_MAX_AGE", 60))
+    app.config["ASSETS_USE_BUNDLES"] = os.environ.get("ASSETS_USE_BUNDLES", "1") != "0"
+
+    # ---- Template Cache Config ----
+    # {% cache %} fragment store: "memory" (per process), "sqlite" (shared) or "none"
+    app.config["FRAGMENT_CACHE_BACKEND"] = os.environ.get("FRAGMENT_CACHE_BACKEND", "memory")
+    app.config["FRAGMENT_CACHE_TTL"] = int(os.environ.get("FRAGMENT_CACHE_TTL", 300))  # Default seconds per entry
+    app.config["FRAGMENT_CACHE_MAX_ENTRIES"] = 5000
+    app.config["FRAGMENT_CACHE_SQLITE_PATH"] = os.path.join(app.instance_path, 'fragments.db')
+    # Compiled templates persist here across restarts; set to an empty string to disable
+    app.config["JINJA_BYTECODE_CACHE_DIR"] = os.environ.get("JINJA_BYTECODE_CACHE_DIR", os.path.join(app.instance_path, 'jinja_cache'))
+
+    # ---- Availability Config ----
+    # Opening hours default to app.utils.availability.DEFAULT_OPENING_HOURS;
+    # set AVAILABILITY_OPENING_HOURS to override them per client
+    app.config["AVAILABILITY_SLOT_MINUTES"] = int(os.environ.get("AVAILABILITY_SLOT_MINUTES", 60))
+    app.config["AVAILABILITY_CAPACITY"] = int(os.environ.get("AVAILABILITY_CAPACITY", 1))
+    app.config["AVAILABILITY_MAX_DAYS"] = 62
+
+    # ---- Performance Instrumentation Config ----
+    # Adds Server-Timing headers and the /admin/performance summary
+    app.config["REQUEST_TIMING_ENABLED"] = os.environ.get("REQUEST_TIMING_ENABLED", "0") == "1"
+    app.config["REQUEST_TIMING_WINDOW"] = 200  # Requests kept per endpoint
+
+    # ---- Slow Query Log Config ----
+    # Set SLOW_QUERY_LOG_PATH to an empty string to keep slow queries in memory only
+    app.config["SLOW_QUERY_ENABLED"] = os.environ.get("SLOW_QUERY_ENABLED", "1") != "0"
+    app.config["SLOW_QUERY_THRESHOLD_MS"] = float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", 100))
+    app.config["SLOW_QUERY_BUFFER_SIZE"] = 200
+    app.config["SLOW_QUERY_LOG_PATH"] = os.environ.get("SLOW_QUERY_LOG_PATH", os.path.join(app.instance_path, 'slow_queries.log'))
+    app.config["SLOW_QUERY_LOG_MAX_BYTES"] = 5 * 1024 * 1024
+    app.config["SLOW_QUERY_LOG_BACKUPS"] = 3
+
+    # ---- Metrics Config ----
+    # /metrics is open to admins, and to scrapers sending "Authorization: Bearer <METRICS_TOKEN>"
+    app.config["METRICS_ENABLED"] = os.environ.get("METRICS_ENABLED", "1") != "0"
+    app.config["METRICS_DIR"] = os.environ.get("METRICS_DIR", os.path.join(app.instance_path, 'metrics'))
+    app.config["METRICS_TOKEN"] = os.environ.get("METRICS_TOKEN")
+
+    # ---- Background Job Config ----
+    app.config["JOB_WORKER_CONCURRENCY"] = int(os.environ.get("JOB_WORKER_CONCURRENCY", 2))
+    app.config["JOB_POLL_INTERVAL"] = float(os.environ.get("JOB_POLL_INTERVAL", 1.0))
+    app.config["JOB_MAX_ATTEMPTS"] = int(os.environ.get("JOB_MAX_ATTEMPTS", 5))
+    app.config["JOB_RETRY_BASE_SECONDS"] = 30  # Doubles after every failed attempt...
+    app.config["JOB_RETRY_MAX_SECONDS"] = 3600  # ...up to this
+    app.config["JOB_LOCK_TIMEOUT"] = 600  # Requeue jobs whose worker died mid-run after this
+
+    # ---- Mail Config ----
+    # Without MAIL_SERVER, emails are written to the log instead of sent
+    app.config["MAIL_SERVER"] = os.environ.get("MAIL_SERVER")
+    app.config["MAIL_PORT"] = int(os.environ.get("MAIL_PORT", 25))
+    app.config["MAIL_USE_TLS"] = os.environ.get("MAIL_USE_TLS", "0") == "1"
+    app.config["MAIL_USE_SSL"] = os.environ.get("MAIL_USE_SSL", "0") == "1"
+    app.config["MAIL_USERNAME"] = os.environ.get("MAIL_USERNAME")
+    app.config["MAIL_PASSWORD"] = os.environ.get("MAIL_PASSWORD")
+    app.config["MAIL_DEFAULT_SENDER"] = os.environ.get("MAIL_DEFAULT_SENDER", "no-reply@localhost")
+    app.config["MAIL_TIMEOUT"] = 10
+    app.config["CONTACT_EMAIL_TO"] = os.environ.get("CONTACT_EMAIL_TO")  # Defaults to MAIL_DEFAULT_SENDER
+
+    # ---- Server Config (flask serve) ----
+    app.config["SERVER_HOST"] = os.environ.get("SERVER_HOST", "127.0.0.1")
+    app.config["SERVER_PORT"] = int(os.environ.get("SERVER_PORT", 5000))
+    app.config["SERVER_WORKERS"] = int(os.environ.get("SERVER_WORKERS", os.cpu_count() or 1))
+    app.config["SERVER_THREADS"] = int(os.environ.get("SERVER_THREADS", 8))
+    app.config["SERVER_MAX_REQUESTS"] = int(os.environ.get("SERVER_MAX_REQUESTS", 10000))  # 0 = never recycle workers
+    app.config["SERVER_MAX_REQUESTS_JITTER"] = 1000
+    app.config["SERVER_GRACEFUL_TIMEOUT"] = float(os.environ.get("SERVER_GRACEFUL_TIMEOUT", 30))
+    app.config["SERVER_BACKLOG"] = 2048
+    app.config["SERVER_ACCESS_LOG"] = os.environ.get("SERVER_ACCESS_LOG", "0") == "1"
+
+    if test_config:
+        app.config.update(test_config)
+
     # ---- Initialize SQLAlchemy ----
     db.init_app(app)
+    configure_sqlite(app)  # WAL, busy_timeout, etc. (override via SQLITE_PRAGMAS or SQLITE_* env)
+
+    # ---- Request Timing (first, so its hooks wrap everyone else's) ----
+    from app.utils.request_timing import init_request_timing
+    init_request_timing(app)
+    from app.utils.slow_queries import init_slow_query_log
+    init_slow_query_log(app)
+    from app.utils.metrics import init_metrics
+    init_metrics(app)
 
-    # ---- Initialize Flask-Migrate ----
-    migrate.init_app(app, db)
+    # ---- Flask-Migrate ----
+    # Set up by `flask db` on first use (app.cli.MigrateGroup): it imports
+    # Alembic, a large share of startup time that nothing else needs
 
     # ---- Register custom CLI commands ----
     from app.cli import register_commands
@@ -34,8 +157,9 @@ def create_app():
 
     @login_manager.user_loader
     def load_user(user_id):
-        from app.models import User
-        return User.query.get(int(user_id))
+        # Served from a per-process identity cache instead of a DB hit per request
+        from app.utils.identity_cache import load_cached_user
+        return load_cached_user(user_id)
 
     # ---- Error Handlers ----
     @app.errorhandler(403)
@@ -43,34 +167,62 @@ def create_app():
         from flask import render_template
         return render_template('errors/403.html'), 403
 
+    @app.errorhandler(429)
+    def too_many_requests(error):
+        from flask import render_template
+        retry_after = str(getattr(error, 'retry_after', None) or 60)
+        return render_template('errors/429.html', retry_after=retry_after), 429, {'Retry-After': retry_after}
+
     # ---- Import Models ----
     from app import models  # Must import models before creating tables
+    from app.utils import analytics  # noqa: F401 - registers booking rollup maintenance
+    from app.utils import booking_stats  # noqa: F401 - registers booking stats invalidation
 
     # ---- Register Blueprints ----
-    from app.routes.home import home_bp
-    app.register_blueprint(home_bp)
-    from app.routes.auth import auth_bp
-    app.register_blueprint(auth_bp)
-    from app.routes.account import account_bp
-    app.register_blueprint(account_bp)
-    from app.routes.shop import shop_bp
-    app.register_blueprint(shop_bp)
-    from app.routes.contact import contact_bp
-    app.register_blueprint(contact_bp)
-    from app.routes.services import services_bp
-    app.register_blueprint(services_bp)
-    from app.routes.bookings import bookings_bp
-    app.register_blueprint(bookings_bp)
-    from app.routes.admin.dashboard import admin_bp
-    app.register_blueprint(admin_bp)
-    from app.routes.admin.services import admin_services_bp
-    app.register_blueprint(admin_services_bp)
-    from app.routes.admin.users import admin_users_bp
-    app.register_blueprint(admin_users_bp)
-    from app.routes.admin.bookings import admin_bookings_bp
-    app.register_blueprint(admin_bookings_bp)
-    from app.routes.admin.analytics import admin_analytics_bp
-    app.register_blueprint(admin_analytics_bp)
+    def register_blueprints():
+        from app.routes.home import home_bp
+        app.register_blueprint(home_bp)
+        from app.routes.auth import auth_bp
+        app.register_blueprint(auth_bp)
+        from app.routes.account import account_bp
+        app.register_blueprint(account_bp)
+        from app.routes.shop import shop_bp
+        app.register_blueprint(shop_bp)
+        from app.routes.contact import contact_bp
+        app.register_blueprint(contact_bp)
+        from app.routes.services import services_bp
+        app.register_blueprint(services_bp)
+        from app.routes.bookings import bookings_bp
+        app.register_blueprint(bookings_bp)
+        from app.routes.admin.dashboard import admin_bp
+        app.register_blueprint(admin_bp)
+        from app.routes.admin.services import admin_services_bp
+        app.register_blueprint(admin_services_bp)
+        from app.routes.admin.products import admin_products_bp
+        app.register_blueprint(admin_products_bp)
+        from app.routes.admin.users import admin_users_bp
+        app.register_blueprint(admin_users_bp)
+        from app.routes.admin.bookings import admin_bookings_bp
+        app.register_blueprint(admin_bookings_bp)
+        from app.routes.admin.analytics import admin_analytics_bp
+        app.register_blueprint(admin_analytics_bp)
+        from app.routes.admin.performance import admin_performance_bp
+        app.register_blueprint(admin_performance_bp)
+        from app.routes.metrics import metrics_bp
+        app.register_blueprint(metrics_bp)
+
+    if app.config["LAZY_BLUEPRINTS"]:
+        app.url_map.defer(register_blueprints)  # See app/utils/deferred_routes.py
+    else:
+        register_blueprints()
+
+    # ---- Static Asset Bundles ----
+    from app.utils.assets import init_assets
+    init_assets(app)
+
+    # ---- Template Caches ----
+    from app.utils.template_cache import init_template_caches
+    init_template_caches(app)
 
 
     # (Later we'll add services, shop, auth blueprints here)
@@ -1,10 +1,14 @@
 """Flask CLI commands for administrative tasks."""
 
 import click
+from datetime import datetime
 from flask import current_app
-from flask.cli import with_appcontext
+from flask.cli import ScriptInfo, with_appcontext
+from sqlalchemy import func
 from app.db import db
-from app.models import User, Service
+from app.models import User, Service, Booking, Product, get_all_services
+from app.utils.catalog_cache import product_catalog, service_catalog
+from app.utils.identity_cache import identity_cache, invalidate_user
 
 
 # User Management Commands
@@ -74,6 +78,7 @@ def edit_user_role():
     
     old_role = user.role
     user.role = new_role
+    invalidate_user(user.id)
     db.session.commit()
     
     click.echo(click.style(f'✅ User "{username}" role changed from "{old_role}" to "{new_role}".', fg='green'))
@@ -94,6 +99,7 @@ def delete_user():
         click.echo(click.style('User deletion cancelled.', fg='yellow'))
         return
     
+    invalidate_user(user.id)
     db.session.delete(user)
     db.session.commit()
     
@@ -112,7 +118,7 @@ def service_cli():
 @with_appcontext
 def list_services():
     """List all services in the database."""
-    services = Service.query.all()
+    services = get_all_services()
     
     if not services:
         click.echo(click.style('⚠️  No services found.', fg='yellow'))
@@ -158,6 +164,7 @@ def add_service():
     new_service = Service(name=name, description=description or None, price=price)
     
     db.session.add(new_service)
+    service_catalog.invalidate()
     db.session.commit()
     
     click.echo(click.style(f'✅ Service "{name}" created successfully.', fg='green'))
@@ -199,6 +206,7 @@ def edit_service():
         except ValueError:
             click.echo(click.style('⚠️  Invalid price format. Price not updated.', fg='yellow'))
     
+    service_catalog.invalidate()
     db.session.commit()
     click.echo(click.style(f'✏️  Service "{service.name}" updated successfully.', fg='green'))
 
@@ -226,11 +234,38 @@ def delete_service():
     
     service_name = service.name
     db.session.delete(service)
+    service_catalog.invalidate()
     db.session.commit()
     
     click.echo(click.style(f'🗑️  Service "{service_name}" deleted successfully.', fg='green'))
 
 
+@service_cli.command('reindex')
+@with_appcontext
+def reindex_services():
+    """Rebuild the full-text search index over services."""
+    from app.utils.search import rebuild_service_index
+    
+    count = rebuild_service_index()
+    click.echo(click.style(f'✅ Search index rebuilt for {count} service(s).', fg='green'))
+
+
+@service_cli.command('search')
+@click.argument('query')
+@with_appcontext
+def search_services_command(query):
+    """Search services by name and description, best matches first."""
+    from app.utils.search import search_services
+    
+    services = search_services(query)
+    if not services:
+        click.echo(click.style(f'⚠️  No services match "{query}".', fg='yellow'))
+        return
+    
+    for service in services:
+        click.echo(click.style(f'{service.id:2} | {service.name}', fg='green'))
+
+
 # Database Management Commands
 
 @click.group('database')
@@ -252,6 +287,9 @@ def reset_db():
     # Drop all tables and recreate
     db.drop_all()
     db.create_all()
+    service_catalog.clear()
+    product_catalog.clear()
+    identity_cache.clear()
     
     click.echo(click.style('✅ Database reset successfully!', fg='green'))
 
@@ -259,18 +297,421 @@ def reset_db():
 @database_cli.command('status')
 @with_appcontext
 def db_status():
-    """Show database status with counts of users and services."""
+    """Show database status with counts of users, services and products."""
     user_count = User.query.count()
     service_count = Service.query.count()
+    product_count = Product.query.count()
     
     click.echo(click.style('📊 Database Status', fg='cyan'))
     click.echo(click.style('----------------', fg='cyan'))
     click.echo(click.style(f'👥 Users: {user_count}', fg='green'))
     click.echo(click.style(f'🛠️  Services: {service_count}', fg='green'))
+    click.echo(click.style(f'🛒 Products: {product_count}', fg='green'))
+
+
+@database_cli.command('explain')
+@with_appcontext
+def explain_queries():
+    """Print EXPLAIN QUERY PLAN for the app's main queries."""
+    from app.utils.query_plans import explain_query_plan, format_query_plan, is_table_scan
+    
+    now = datetime.utcnow()
+    page_size = current_app.config['BOOKINGS_PER_PAGE'] + 1
+    shop_page_size = current_app.config['SHOP_PRODUCTS_PER_PAGE'] + 1
+    active_products = Product.query.filter_by(is_active=True)
+    queries = [
+        ('Admin bookings page',
+         Booking.query.order_by(Booking.booking_date.desc(), Booking.id.desc()).limit(page_size)),
+        ('Admin bookings page (after cursor)',
+         Booking.query.filter(Booking.booking_date <= now,
+                              db.or_(Booking.booking_date < now, Booking.id < 1))
+         .order_by(Booking.booking_date.desc(), Booking.id.desc()).limit(page_size)),
+        ('Customer bookings page',
+         Booking.query.filter_by(user_id=1)
+         .order_by(Booking.booking_date.desc(), Booking.id.desc()).limit(page_size)),
+        ('Bookings by status',
+         Booking.query.filter_by(status='pending').order_by(Booking.booking_date.desc())),
+        ('Bookings for service in date range',
+         Booking.query.filter(Booking.service_id == 1, Booking.booking_date >= now)),
+        ('Guest bookings by email',
+         Booking.query.filter_by(guest_email='guest@example.com')),
+        ('Booking stats aggregate',
+         db.session.query(Booking.status, func.count(Booking.id)).group_by(Booking.status)),
+        ('User lookup by username',
+         User.query.filter_by(username='admin')),
+        ('Shop page (newest)',
+         active_products.order_by(Product.id.desc()).limit(shop_page_size)),
+        ('Shop page (category, newest)',
+         active_products.filter(Product.category == 'toys')
+         .order_by(Product.id.desc()).limit(shop_page_size)),
+        ('Shop page (category, price range, cheapest first)',
+         active_products.filter(Product.category == 'toys', Product.price.between(10, 50))
+         .order_by(Product.price.asc(), Product.id.asc()).limit(shop_page_size)),
+        ('Shop page (price range, by name)',
+         active_products.filter(Product.price.between(10, 50))
+         .order_by(Product.name.asc(), Product.id.asc()).limit(shop_page_size)),
+        ('Shop page (by price, after cursor)',
+         active_products.filter(Product.price >= 20, db.or_(Product.price > 20, Product.id > 1))
+         .order_by(Product.price.asc(), Product.id.asc()).limit(shop_page_size)),
+        ('Shop categories',
+         db.session.query(Product.category).filter_by(is_active=True)
+         .distinct().order_by(Product.category)),
+    ]
+    
+    scans = 0
+    for name, query in queries:
+        click.echo(click.style(f'▶ {name}', fg='cyan'))
+        plan = explain_query_plan(db.session, query)
+        for line, (_, _, detail) in zip(format_query_plan(plan), plan):
+            if is_table_scan(detail):
+                scans += 1
+                click.echo(click.style(f'  {line}', fg='red'))
+            else:
+                click.echo(click.style(f'  {line}', fg='green'))
+        click.echo()
+    
+    if scans:
+        click.echo(click.style(f'⚠️  {scans} full table scan(s) found.', fg='yellow'))
+    else:
+        click.echo(click.style('✅ All queries use indexes.', fg='green'))
+
+
+@database_cli.command('slow-queries')
+@click.option('--list', 'as_list', is_flag=True, help='Show individual statements, newest first, instead of grouping them.')
+@click.option('--limit', default=20, show_default=True, help='Number of statements or groups to show.')
+@click.option('--file', 'path', type=click.Path(dir_okay=False), help='Log file to read (default: SLOW_QUERY_LOG_PATH).')
+@with_appcontext
+def slow_queries(as_list, limit, path):
+    """Show slow SQL statements recorded in the slow-query log."""
+    from app.utils.query_plans import is_table_scan
+    from app.utils.slow_queries import aggregate, read_log_file
+    
+    path = path or current_app.config['SLOW_QUERY_LOG_PATH']
+    if not path:
+        click.echo(click.style('⚠️  SLOW_QUERY_LOG_PATH is not set; slow queries are only kept in memory '
+                               '(see /admin/performance).', fg='yellow'))
+        return
+    entries = list(read_log_file(path, current_app.config['SLOW_QUERY_LOG_BACKUPS']))
+    if not entries:
+        click.echo(click.style(f'✅ No slow queries recorded in {path}.', fg='green'))
+        return
+    
+    threshold = current_app.config['SLOW_QUERY_THRESHOLD_MS']
+    if as_list:
+        click.echo(click.style(f'🐢 {len(entries)} statement(s) over {threshold:g} ms, newest first', fg='cyan'))
+        for entry in reversed(entries[-limit:]):
+            click.echo(click.style(f'\n{entry["at"]}  {entry["duration_ms"]:.1f} ms  {entry.get("source") or "-"}', fg='yellow'))
+            click.echo(f'   {entry["statement"]}')
+            click.echo(f'   params: {entry.get("parameters")}')
+            for line in entry.get('plan') or []:
+                click.echo(f'   | {line}')
+        return
+    
+    groups = aggregate(entries)
+    click.echo(click.style(f'🐢 {len(entries)} statement(s) over {threshold:g} ms in {len(groups)} group(s), '
+                           'most total time first', fg='cyan'))
+    for group in groups[:limit]:
+        click.echo(click.style(
+            f'\n{group["count"]}x  total {group["total_ms"]:.1f} ms  mean {group["mean_ms"]:.1f} ms  '
+            f'max {group["max_ms"]:.1f} ms', fg='yellow'))
+        click.echo(f'   {group["statement"]}')
+        click.echo(f'   from: {", ".join(group["sources"]) or "-"}')
+        for line in group['plan']:
+            color = 'red' if is_table_scan(line.strip()) else None
+            click.echo(click.style(f'   | {line}', fg=color))
+
+
+# Bulk Import / Export Commands
+
+@click.group('booking')
+def booking_cli():
+    """Booking management commands."""
+    pass
+
+
+def add_bulk_commands(group, entity):
+    """Attach ``import`` and ``export`` commands for ``entity`` to a CLI group.
+    
+    Usage:
+        flask service import services.csv
+        flask booking export bookings.jsonl
+        flask user export - --format jsonl | gzip > users.jsonl.gz
+    """
+    from app.utils.bulk_io import DEFAULT_BATCH_SIZE, FORMATS
+    
+    @group.command('import', help=f'Import {entity}s from a CSV or JSONL file (- for stdin).')
+    @click.argument('source', type=click.File('r', encoding='utf-8', lazy=True))
+    @click.option('--format', 'fmt', type=click.Choice(FORMATS), help='Input format (default: from file extension).')
+    @click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True, help='Rows per transaction.')
+    @with_appcontext
+    def import_command(source, fmt, batch_size):
+        from app.utils.bulk_io import detect_format, import_records, read_records
+        
+        fmt = detect_format(source.name, fmt)
+        result = import_records(entity, read_records(source, fmt), batch_size=batch_size)
+        
+        click.echo(click.style(
+            f'✅ Read {result.read} row(s): {result.inserted} inserted, {result.updated} updated, '
+            f'{result.skipped} skipped.', fg='green'))
+        for line, message in sorted(result.errors)[:20]:
+            click.echo(click.style(f'⚠️  Line {line}: {message}', fg='yellow'))
+        if result.skipped > 20:
+            click.echo(click.style(f'⚠️  ... and {result.skipped - 20} more.', fg='yellow'))
+        if result.errors:
+            raise SystemExit(1)
+    
+    @group.command('export', help=f'Export all {entity}s to a CSV or JSONL file (- for stdout).')
+    @click.argument('destination', type=click.File('w', encoding='utf-8', lazy=True))
+    @click.option('--format', 'fmt', type=click.Choice(FORMATS), help='Output format (default: from file extension).')
+    @click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True, help='Rows fetched per round trip.')
+    @with_appcontext
+    def export_command(destination, fmt, batch_size):
+        from app.utils.bulk_io import detect_format, export_records
+        
+        fmt = detect_format(destination.name, fmt)
+        count = export_records(entity, destination, fmt, batch_size=batch_size)
+        if destination.name != '-':
+            click.echo(click.style(f'✅ Exported {count} {entity}(s) to {destination.name}.', fg='green'))
+
+
+add_bulk_commands(user_cli, 'user')
+add_bulk_commands(service_cli, 'service')
+add_bulk_commands(booking_cli, 'booking')
+
+
+# Analytics Commands
+
+@click.group('analytics')
+def analytics_cli():
+    """Booking analytics commands."""
+    pass
+
+
+@analytics_cli.command('rebuild')
+@click.option('--chunk-days', default=31, show_default=True, help='Days of bookings aggregated per transaction.')
+@with_appcontext
+def rebuild_analytics(chunk_days):
+    """Recompute the booking analytics rollups from the booking table."""
+    from app.utils.analytics import rebuild_rollups
+    
+    def progress(start, end):
+        click.echo(f'   {start.isoformat()} .. {end.isoformat()}')
+    
+    count = rebuild_rollups(chunk_days=chunk_days, progress=progress)
+    click.echo(click.style(f'✅ Analytics rebuilt: {count} rollup row(s).', fg='green'))
+
+
+# Background Job Commands
+
+@click.group('worker')
+def worker_cli():
+    """Background job queue commands."""
+    pass
+
+
+@worker_cli.command('run')
+@click.option('--concurrency', type=int, help='Worker threads (default: JOB_WORKER_CONCURRENCY).')
+@click.option('--poll-interval', type=float, help='Seconds between polls when idle (default: JOB_POLL_INTERVAL).')
+@click.option('--burst', is_flag=True, help='Exit once no jobs are due instead of waiting for more.')
+@with_appcontext
+def run_worker(concurrency, poll_interval, burst):
+    """Run queued background jobs until stopped (Ctrl+C / SIGTERM)."""
+    from app.utils import notifications  # noqa: F401 - registers the email job handlers
+    from app.utils.jobs import Worker
+    
+    config = current_app.config
+    worker = Worker(
+        current_app._get_current_object(),
+        concurrency=concurrency or config['JOB_WORKER_CONCURRENCY'],
+        poll_interval=poll_interval or config['JOB_POLL_INTERVAL'],
+        burst=burst,
+    )
+    click.echo(click.style(f'👷 Worker {worker.name} running {worker.concurrency} thread(s).', fg='cyan'))
+    stats = worker.run()
+    click.echo(click.style(
+        f'✅ Worker stopped: {stats["done"]} done, {stats["retry"]} to retry, {stats["dead"]} dead.', fg='green'))
+
+
+@worker_cli.command('status')
+@with_appcontext
+def worker_status():
+    """Show queued, running and dead job counts."""
+    from app.models import Job
+    
+    counts = dict(db.session.query(Job.status, func.count()).group_by(Job.status).all())
+    due = Job.query.filter(Job.status == 'queued', Job.run_at <= datetime.utcnow()).count()
+    
+    click.echo(click.style('📬 Job Queue', fg='cyan'))
+    click.echo(click.style('-----------', fg='cyan'))
+    click.echo(click.style(f'⏳ Queued: {counts.get("queued", 0)} ({due} due now)', fg='green'))
+    click.echo(click.style(f'🏃 Running: {counts.get("running", 0)}', fg='green'))
+    click.echo(click.style(f'💀 Dead: {counts.get("dead", 0)}', fg='red' if counts.get('dead') else 'green'))
+    for job in Job.query.filter_by(status='dead').order_by(Job.id).limit(20):
+        error = (job.last_error or '').strip().splitlines()[-1:] or ['']
+        click.echo(f'   #{job.id} {job.kind} after {job.attempts} attempt(s): {error[0]}')
+
+
+@worker_cli.command('retry')
+@click.argument('job_ids', nargs=-1, type=int)
+@with_appcontext
+def retry_jobs(job_ids):
+    """Requeue dead jobs (all of them, or only JOB_IDS)."""
+    from app.utils.jobs import retry_dead_jobs
+    
+    count = retry_dead_jobs(job_ids)
+    click.echo(click.style(f'✅ Requeued {count} dead job(s).', fg='green'))
+
+
+# Static Asset Commands
+
+@click.group('assets')
+def assets_cli():
+    """Static asset pipeline commands."""
+    pass
+
+
+@assets_cli.command('build')
+@click.option('--no-minify', is_flag=True, help='Concatenate bundles without minifying.')
+@with_appcontext
+def build_assets_command(no_minify):
+    """Bundle, fingerprint and precompress CSS into static/dist."""
+    from app.utils.assets import build_assets, brotli
+    
+    report = build_assets(current_app, minify=not no_minify)
+    
+    click.echo(click.style('Bundle       | File                          |   Size |   Gzip | Brotli', fg='cyan'))
+    click.echo(click.style('-------------|-------------------------------|--------|--------|-------', fg='cyan'))
+    for name, info in report.items():
+        br_size = info['brotli'] if info['brotli'] is not None else '-'
+        click.echo(click.style(
+            f"{name:12} | {info['file']:29} | {info['size']:6} | {info['gzip']:6} | {br_size:>6}", fg='green'))
+    
+    if brotli is None:
+        click.echo(click.style('⚠️  brotli not installed; skipped .br variants.', fg='yellow'))
+    click.echo(click.style(f'✅ Built {len(report)} asset bundles.', fg='green'))
+
+
+# Database Migration Commands
+
+class MigrateGroup(click.Group):
+    """``flask db``, importing Flask-Migrate (and Alembic) only when it runs."""
+
+    def _migrate_cli(self, ctx):
+        from app.db import init_migrate
+        return init_migrate(ctx.ensure_object(ScriptInfo).load_app())
+
+    def list_commands(self, ctx):
+        return self._migrate_cli(ctx).list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._migrate_cli(ctx).get_command(ctx, name)
+
+
+migrate_cli = MigrateGroup('db', help='Perform database migrations.')
+
+
+# Production Server Command
+
+@click.command('serve')
+@click.option('--host', help='Interface to bind (default: SERVER_HOST).')
+@click.option('--port', type=int, help='Port to bind (default: SERVER_PORT).')
+@click.option('--workers', type=int, help='Worker processes (default: SERVER_WORKERS).')
+@click.option('--threads', type=int, help='Request threads per worker (default: SERVER_THREADS).')
+@click.option('--max-requests', type=int, help='Recycle a worker after this many requests, 0 for never (default: SERVER_MAX_REQUESTS).')
+@click.option('--graceful-timeout', type=float, help='Seconds to finish in-flight requests on stop/reload (default: SERVER_GRACEFUL_TIMEOUT).')
+@click.option('--access-log/--no-access-log', default=None, help='Log every request (default: SERVER_ACCESS_LOG).')
+@with_appcontext
+def serve_command(host, port, workers, threads, max_requests, graceful_timeout, access_log):
+    """Serve the app with preforked, multithreaded workers.
+
+    SIGHUP replaces the workers gracefully; SIGTERM or Ctrl+C drains
+    in-flight requests and exits.
+
+    With more than one worker, rate limits are kept in the shared sqlite
+    store unless RATE_LIMIT_STORAGE says otherwise. RATE_LIMIT_STORAGE=memory
+    gives each worker its own buckets, so clients get every limit once per
+    worker.
+    """
+    import logging
+    from app.server import PreforkServer
+    from app.utils.deferred_routes import load_routes
+    
+    load_routes(current_app)  # Import routes once here instead of in every worker
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(process)d] %(levelname)s %(message)s')
+    config = current_app.config
+    workers = workers or config['SERVER_WORKERS']
+    if workers > 1 and config['RATE_LIMIT_ENABLED']:
+        if not config.get('RATE_LIMIT_STORAGE'):
+            config['RATE_LIMIT_STORAGE'] = 'sqlite'
+        elif config['RATE_LIMIT_STORAGE'] == 'memory':
+            logging.getLogger(__name__).warning(
+                'RATE_LIMIT_STORAGE=memory with %d workers: each worker enforces its own '
+                'rate limits, so clients get %dx the configured limits', workers, workers)
+    server = PreforkServer(
+        current_app._get_current_object(),
+        host=host or config['SERVER_HOST'],
+        port=port if port is not None else config['SERVER_PORT'],
+        workers=workers,
+        threads=threads or config['SERVER_THREADS'],
+        max_requests=max_requests if max_requests is not None else config['SERVER_MAX_REQUESTS'],
+        max_requests_jitter=config['SERVER_MAX_REQUESTS_JITTER'],
+        graceful_timeout=graceful_timeout if graceful_timeout is not None else config['SERVER_GRACEFUL_TIMEOUT'],
+        backlog=config['SERVER_BACKLOG'],
+        access_log=access_log if access_log is not None else config['SERVER_ACCESS_LOG'],
+    )
+    try:
+        server.run()
+    except OSError as e:
+        raise click.ClickException(f'Could not listen on {server.host}:{server.port}: {e.strerror}')
+
+
+# Startup Profiling Command
+
+@click.command('import-profile', context_settings={'ignore_unknown_options': True})
+@click.argument('command', nargs=-1, type=click.UNPROCESSED)
+@click.option('--limit', default=15, show_default=True, help='Rows per table.')
+@click.pass_context
+def import_profile_command(ctx, command, limit):
+    """Show where startup time goes on imports.
+
+    Profiles create_app() in a fresh interpreter, or with COMMAND the whole
+    `flask COMMAND` run, e.g. `flask import-profile user list`.
+    """
+    import os
+    from app.utils.import_profile import (CREATE_APP_SNIPPET, by_package, run_importtime,
+                                          total_import_us)
+    
+    if command:
+        app_import_path = ctx.find_object(ScriptInfo).app_import_path
+        args = ['-m', 'flask', *(['--app', app_import_path] if app_import_path else []), *command]
+        label = f'flask {" ".join(command)}'
+    else:
+        args, label = ['-c', CREATE_APP_SNIPPET], 'create_app()'
+    entries, wall = run_importtime(args, cwd=os.getcwd())
+    if not entries:
+        raise click.ClickException('No import timings captured; does the command run?')
+    
+    click.echo(click.style(f'⏱️  {label}: {wall * 1000:.0f} ms wall, '
+                           f'{total_import_us(entries) / 1000:.0f} ms importing {len(entries)} modules', fg='cyan'))
+    click.echo(click.style('\nPackage                        | Self ms | Modules', fg='cyan'))
+    click.echo(click.style('-------------------------------|---------|--------', fg='cyan'))
+    for package, self_us, count in by_package(entries)[:limit]:
+        click.echo(f'{package[:30]:30} | {self_us / 1000:7.1f} | {count:7}')
+    click.echo(click.style('\nSlowest imports (incl. dependencies)          | Cum. ms', fg='cyan'))
+    click.echo(click.style('----------------------------------------------|--------', fg='cyan'))
+    for entry in sorted(entries, key=lambda entry: entry['cumulative_us'], reverse=True)[:limit]:
+        click.echo(f'{entry["module"][:45]:45} | {entry["cumulative_us"] / 1000:7.1f}')
 
 
 def register_commands(app):
     """Register CLI commands with the Flask app."""
+    app.cli.add_command(migrate_cli)
     app.cli.add_command(user_cli)
     app.cli.add_command(service_cli)
-    app.cli.add_command(database_cli)
\ No newline at end of file
+    app.cli.add_command(booking_cli)
+    app.cli.add_command(database_cli)
+    app.cli.add_command(analytics_cli)
+    app.cli.add_command(worker_cli)
+    app.cli.add_command(assets_cli)
+    app.cli.add_command(serve_command)
+    app.cli.add_command(import_profile_command)
\ No newline at end of file
@@ -1,5 +1,6 @@
 from app.db import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import DDL, event, inspect, select
+from sqlalchemy.orm import joinedload
 from flask_login import UserMixin
 from datetime import datetime
 
@@ -12,14 +13,27 @@ class User(UserMixin, db.Model):
     password = db.Column(db.String(200), nullable=False)
     role = db.Column(db.String(20), default='customer')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Bumped on password change to invalidate the user's other sessions
+    session_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
+    def get_id(self):
+        """Session identifier for Flask-Login: '<id>:<session_version>'."""
+        return f'{self.id}:{self.session_version or 0}'
     
     def set_password(self, password):
-        """Hash and set the user's password."""
-        self.password = generate_password_hash(password)
+        """Hash and set the user's password (runs on the hashing pool)."""
+        from app.utils.password_hashing import hash_password
+        self.password = hash_password(password)
     
     def verify_password(self, password):
-        """Verify the user's password against the stored hash."""
-        return check_password_hash(self.password, password)
+        """Verify the user's password against the stored hash (runs on the hashing pool)."""
+        from app.utils.password_hashing import verify_password
+        return verify_password(self.password, password)
+    
+    def password_needs_rehash(self):
+        """Check if the stored hash uses outdated method or cost parameters."""
+        from app.utils.password_hashing import needs_rehash
+        return needs_rehash(self.password)
     
     def __repr__(self):
         return f'<User {self.username}>'
@@ -37,6 +51,43 @@ class Service(db.Model):
         return f'<Service {self.name}>'
 
 
+# Full-text index over service names and descriptions (see app/utils/search.py).
+# service_fts is an external-content FTS5 table: it stores only the index and
+# reads the text back from the service table, and triggers keep it in sync
+# with every insert, delete and name/description update. The migration that
+# introduced it carries its own copy of these statements; these ones make
+# db.create_all() / db.drop_all() (database reset, benchmarks) match it.
+SERVICE_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS service_fts USING fts5(
+        name, description,
+        content='service', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS service_fts_ai AFTER INSERT ON service BEGIN
+        INSERT INTO service_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS service_fts_ad AFTER DELETE ON service BEGIN
+        INSERT INTO service_fts(service_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS service_fts_au AFTER UPDATE OF name, description ON service BEGIN
+        INSERT INTO service_fts(service_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO service_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+]
+
+for _statement in SERVICE_FTS_DDL:
+    event.listen(Service.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+event.listen(Service.__table__, 'before_drop', DDL('DROP TABLE IF EXISTS service_fts').execute_if(dialect='sqlite'))
+
+
+def _current_service_price(context):
+    """Insert default for Booking.price: the booked service's price right now."""
+    service_id = context.get_current_parameters().get('service_id')
+    return context.connection.execute(select(Service.price).where(Service.id == service_id)).scalar()
+
+
 class Booking(db.Model):
     """Booking model linking users to services. Supports both registered users and guest bookings."""
     
@@ -46,6 +97,8 @@ class Booking(db.Model):
     booking_date = db.Column(db.DateTime, nullable=False)
     status = db.Column(db.String(20), default='pending')  # pending, confirmed, cancelled, completed
     notes = db.Column(db.Text)
+    # Service price when the booking was made; later price changes don't touch it
+    price = db.Column(db.Float, default=_current_service_price)
     
     # Guest booking fields (used when user_id is None)
     guest_name = db.Column(db.String(100))
@@ -59,6 +112,17 @@ class Booking(db.Model):
     user = db.relationship('User', backref=db.backref('bookings', lazy=True))
     service = db.relationship('Service', backref=db.backref('bookings', lazy=True))
     
+    # Secondary indexes for the hot access paths: per-customer listings,
+    # admin listing/date ranges, status filters, per-service lookups (stats,
+    # availability) and guest lookups by email
+    __table_args__ = (
+        db.Index('ix_booking_booking_date', 'booking_date'),
+        db.Index('ix_booking_user_id_booking_date', 'user_id', 'booking_date'),
+        db.Index('ix_booking_status_booking_date', 'status', 'booking_date'),
+        db.Index('ix_booking_service_id_booking_date', 'service_id', 'booking_date'),
+        db.Index('ix_booking_guest_email', 'guest_email'),
+    )
+    
     def get_customer_name(self):
         """Get the customer name for display (either registered user or guest)."""
         return self.user.username if self.user else self.guest_name
@@ -72,9 +136,140 @@ class Booking(db.Model):
         """Check if this is a guest booking."""
         return self.user_id is None
     
+    @classmethod
+    def query_with_details(cls):
+        """Return a Booking query that eager-loads the service and user.
+        
+        Use this for any listing that displays service or customer details,
+        so N bookings cost one joined SELECT instead of 2N+1 lazy loads.
+        """
+        return cls.query.options(joinedload(cls.service), joinedload(cls.user))
+    
     def __repr__(self):
-        customer_name = self.get_customer_name()
-        return f'<Booking {customer_name} - {self.service.name}>'
+        # Only use relationships that are already loaded so that logging or
+        # debugging a booking never fires extra SELECTs
+        unloaded = inspect(self).unloaded
+        if 'user' in unloaded:
+            customer_name = self.guest_name or f'user #{self.user_id}'
+        else:
+            customer_name = self.get_customer_name()
+        service_name = f'service #{self.service_id}' if 'service' in unloaded else self.service.name
+        return f'<Booking {customer_name} - {service_name}>'
+
+
+class Product(db.Model):
+    """Product sold in the shop.
+    
+    Only active products are listed publicly; deactivating a product hides
+    it from the shop without losing its history.
+    """
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text)
+    category = db.Column(db.String(50), nullable=False, default='general')
+    price = db.Column(db.Float, nullable=False)
+    image = db.Column(db.String(16))  # Emoji shown on the product card
+    is_active = db.Column(db.Boolean, nullable=False, default=True)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # One index per shop listing shape: the filters (active, optional
+    # category) form an index prefix and the trailing column provides the
+    # sort order, so pages are read by index seek. Newest-first pages use
+    # ix_product_is_active_id, or within a category the implicit rowid at
+    # the end of ix_product_is_active_category. A price range is only
+    # index-ordered when sorting by price: with newest or name sort the
+    # range is seeked on the price index and the matches are sorted in a
+    # temp b-tree, which is bounded by the number of products in the range.
+    __table_args__ = (
+        db.Index('ix_product_is_active_id', 'is_active', 'id'),
+        db.Index('ix_product_is_active_price', 'is_active', 'price'),
+        db.Index('ix_product_is_active_name', 'is_active', 'name'),
+        db.Index('ix_product_is_active_category', 'is_active', 'category'),
+        db.Index('ix_product_is_active_category_price', 'is_active', 'category', 'price'),
+        db.Index('ix_product_is_active_category_name', 'is_active', 'category', 'name'),
+    )
+    
+    def __repr__(self):
+        return f'<Product {self.name}>'
+
+
+class BookingRollup(db.Model):
+    """Daily booking counts and revenue per service and status.
+    
+    Maintained incrementally in the same transaction as every booking write
+    (see app/utils/analytics.py) so the analytics dashboard never has to
+    aggregate the booking table itself. ``day`` is the day of the
+    appointment; revenue is the sum of the bookings' own ``price``, i.e.
+    the service price when each booking was made.
+    """
+    
+    __tablename__ = 'booking_rollup'
+    
+    day = db.Column(db.Date, primary_key=True)
+    service_id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    bookings = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    
+    __table_args__ = (
+        db.Index('ix_booking_rollup_service_id_day', 'service_id', 'day'),
+    )
+    
+    def __repr__(self):
+        return f'<BookingRollup {self.day} service #{self.service_id} {self.status}={self.bookings}>'
+
+
+class Job(db.Model):
+    """A unit of background work, e.g. sending an email.
+    
+    Jobs are added to the session of the request that causes them, so they
+    are committed (or rolled back) together with it, and run later by
+    ``flask worker run`` (see app/utils/jobs.py). ``status`` is one of
+    ``queued``, ``running`` or ``dead``; finished jobs are deleted.
+    """
+    
+    __tablename__ = 'job'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default='{}')
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(64))
+    locked_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Workers claim the oldest due job: status = 'queued' AND run_at <= now
+    __table_args__ = (
+        db.Index('ix_job_status_run_at', 'status', 'run_at'),
+    )
+    
+    def __repr__(self):
+        return f'<Job {self.id} {self.kind} {self.status}>'
+
+
+class CacheVersion(db.Model):
+    """Version counter for a cached dataset (e.g. the service catalog).
+    
+    Every write to the underlying data bumps the row in the same transaction,
+    so caches in other worker processes can detect staleness with a single
+    primary-key lookup instead of reloading the data.
+    """
+    
+    __tablename__ = 'cache_version'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<CacheVersion {self.name}={self.version}>'
 
 
 # Helper methods
@@ -89,13 +284,20 @@ def add_user(username, password, role='customer'):
 
 def add_service(name, description=None, price=None):
     """Create and add a new service to the database."""
+    from app.utils.catalog_cache import service_catalog
     service = Service(name=name, description=description, price=price)
     db.session.add(service)
+    service_catalog.invalidate()
     db.session.commit()
     return service
 
 
 def get_all_services():
-    """Return all services from the database."""
-    return Service.query.all()
+    """Return all services, served from the in-process catalog cache.
+    
+    Returns read-only ServiceRecord snapshots rather than Service instances;
+    query Service directly when you need to modify a row.
+    """
+    from app.utils.catalog_cache import service_catalog
+    return service_catalog.get()
 
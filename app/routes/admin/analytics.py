@@ -1,23 +1,81 @@
 """Admin analytics blueprint for PS Framework v2.
 
 This module handles admin functionality for viewing analytics and business insights
-including customer metrics, performance analytics, and business reporting.
+including booking volume, revenue and service popularity over a date range.
 """
 
-from flask import Blueprint, render_template
+from datetime import date, timedelta
+
+from flask import Blueprint, flash, render_template, request
+from app.models import get_all_services
+from app.utils.analytics import get_analytics
+from app.utils.booking_stats import BOOKING_STATUSES
 from app.utils.decorators import admin_required
 
 # Create admin analytics blueprint with URL prefix
 admin_analytics_bp = Blueprint('admin_analytics', __name__, url_prefix='/admin/analytics')
 
+# Longest range the dashboard charts day by day
+MAX_RANGE_DAYS = 366
+
+# (label, days before today, days after today)
+RANGE_PRESETS = [
+    ('Last 7 days', 6, 0),
+    ('Last 30 days', 29, 0),
+    ('Last 90 days', 89, 0),
+    ('Next 30 days', 0, 29),
+    ('±30 days', 30, 30),
+]
+
+
+def _date_range(args, today):
+    """Read ``start``/``end`` from the query string, falling back to today +/- 30 days."""
+    default_start, default_end = today - timedelta(days=30), today + timedelta(days=30)
+    try:
+        start = date.fromisoformat(args['start']) if args.get('start') else default_start
+        end = date.fromisoformat(args['end']) if args.get('end') else default_end
+    except ValueError:
+        flash('Dates must use the YYYY-MM-DD format.', 'error')
+        return default_start, default_end
+    if end < start:
+        flash('End date must not be before the start date.', 'error')
+        return default_start, default_end
+    if (end - start).days >= MAX_RANGE_DAYS:
+        flash(f'Showing the first {MAX_RANGE_DAYS} days of the selected range.', 'info')
+        end = start + timedelta(days=MAX_RANGE_DAYS - 1)
+    return start, end
+
 
 @admin_analytics_bp.route('/')
 @admin_required
 def analytics_dashboard():
     """Analytics and business insights dashboard.
     
-    Renders the main analytics page where administrators can view
-    business insights, customer metrics, and performance analytics.
+    Shows booking volume, revenue and service popularity for appointments
+    between the ``start`` and ``end`` query parameters (YYYY-MM-DD, both
+    inclusive). Reads only the booking rollups (see app/utils/analytics.py),
+    so it stays fast however many bookings there are.
     Accessible at /admin/analytics route.
     """
-    return render_template('admin/analytics.html')
\ No newline at end of file
+    today = date.today()
+    start, end = _date_range(request.args, today)
+    analytics = get_analytics(start, end)
+    
+    service_names = {service.id: service.name for service in get_all_services()}
+    for entry in analytics['services']:
+        entry['name'] = service_names.get(entry['service_id'], f"Service #{entry['service_id']}")
+    
+    return render_template(
+        'admin/analytics.html',
+        start=start,
+        end=end,
+        today=today,
+        presets=[(label, today - timedelta(days=back), today + timedelta(days=ahead))
+                 for label, back, ahead in RANGE_PRESETS],
+        statuses=BOOKING_STATUSES,
+        totals=analytics['totals'],
+        daily=analytics['daily'],
+        services=analytics['services'][:10],
+        max_daily=max((entry['bookings'] for entry in analytics['daily']), default=0),
+        max_service=max((entry['bookings'] for entry in analytics['services']), default=0),
+    )
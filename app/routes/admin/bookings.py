@@ -4,7 +4,14 @@ This module handles admin functionality for managing bookings and orders includi
 viewing customer bookings, managing scheduling, and handling order fulfillment.
 """
 
-from flask import Blueprint, redirect, url_for
+from datetime import date, datetime
+
+from flask import Blueprint, Response, current_app, flash, redirect, request, stream_with_context, url_for
+
+from app.db import db
+from app.models import Service
+from app.utils.booking_export import generate_bookings_csv
+from app.utils.booking_stats import BOOKING_STATUSES
 from app.utils.decorators import admin_required
 
 # Create admin bookings blueprint with URL prefix
@@ -20,4 +27,48 @@ def bookings_dashboard():
     customer bookings and manage their status.
     Accessible at /admin/bookings route.
     """
-    return redirect(url_for('bookings.all_bookings'))
\ No newline at end of file
+    return redirect(url_for('bookings.all_bookings'))
+
+
+@admin_bookings_bp.route('/export.csv')
+@admin_required
+def export_bookings():
+    """Download bookings as CSV, streamed as it is read.
+    
+    Query parameters (all optional):
+        start / end: Booking day range, YYYY-MM-DD, both inclusive
+        status: One of BOOKING_STATUSES
+        service_id: Only bookings for this service
+    
+    Invalid filters redirect back to the bookings page with an error.
+    """
+    try:
+        start = date.fromisoformat(request.args['start']) if request.args.get('start') else None
+        end = date.fromisoformat(request.args['end']) if request.args.get('end') else None
+    except ValueError:
+        flash('Export dates must use the YYYY-MM-DD format.', 'error')
+        return redirect(url_for('bookings.all_bookings'))
+    if start and end and end < start:
+        flash('Export end date must not be before the start date.', 'error')
+        return redirect(url_for('bookings.all_bookings'))
+    
+    status = request.args.get('status') or None
+    if status is not None and status not in BOOKING_STATUSES:
+        flash('Invalid status selected for export.', 'error')
+        return redirect(url_for('bookings.all_bookings'))
+    
+    service_id = request.args.get('service_id', type=int)
+    if service_id is not None and db.session.get(Service, service_id) is None:
+        flash('Unknown service selected for export.', 'error')
+        return redirect(url_for('bookings.all_bookings'))
+    
+    rows = generate_bookings_csv(
+        current_app.config['BOOKINGS_EXPORT_CHUNK_SIZE'],
+        start=start, end=end, status=status, service_id=service_id,
+    )
+    filename = f"bookings-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.csv"
+    response = Response(stream_with_context(rows), mimetype='text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-store'
+    response.headers['X-Accel-Buffering'] = 'no'  # Let proxies pass chunks straight through
+    return response
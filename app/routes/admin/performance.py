@@ -0,0 +1,47 @@
+"""Admin performance blueprint for PS Framework v2.
+
+This module shows the rolling per-endpoint request timings collected when
+REQUEST_TIMING_ENABLED is set (see app/utils/request_timing.py) and the
+most recent slow SQL statements (see app/utils/slow_queries.py).
+"""
+
+from flask import Blueprint, current_app, flash, redirect, render_template, url_for
+from app.utils.decorators import admin_required
+from app.utils.request_timing import get_timing_summary
+from app.utils.slow_queries import get_slow_query_log
+
+# Create admin performance blueprint with URL prefix
+admin_performance_bp = Blueprint('admin_performance', __name__, url_prefix='/admin/performance')
+
+
+@admin_performance_bp.route('/')
+@admin_required
+def performance_dashboard():
+    """Per-endpoint request timing summary.
+    
+    Lists every endpoint seen by this worker process with its request
+    count, latency percentiles and average SQL/template cost, busiest
+    first, followed by the latest slow SQL statements.
+    Accessible at /admin/performance route.
+    """
+    summary = get_timing_summary(current_app)
+    rows = summary.snapshot() if summary is not None else []
+    slow_log = get_slow_query_log(current_app)
+    return render_template('admin/performance.html', enabled=summary is not None, rows=rows,
+                           window=current_app.config['REQUEST_TIMING_WINDOW'],
+                           slow_queries=slow_log.entries()[:20] if slow_log is not None else None,
+                           slow_threshold=current_app.config['SLOW_QUERY_THRESHOLD_MS'])
+
+
+@admin_performance_bp.route('/reset', methods=['POST'])
+@admin_required
+def reset_performance():
+    """Clear the collected timings and slow queries (for this worker process)."""
+    summary = get_timing_summary(current_app)
+    if summary is not None:
+        summary.clear()
+    slow_log = get_slow_query_log(current_app)
+    if slow_log is not None:
+        slow_log.clear()
+    flash('Performance statistics cleared.', 'success')
+    return redirect(url_for('admin_performance.performance_dashboard'))
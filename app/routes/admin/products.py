@@ -0,0 +1,170 @@
+"""Admin products management blueprint for PS Framework v2.
+
+This module handles admin functionality for managing the shop catalog:
+listing products, adding new ones, editing or deactivating existing ones
+and deleting them. Every write invalidates the product catalog cache.
+"""
+
+from flask import Blueprint, current_app, render_template, request, flash, redirect, url_for
+
+from app.models import Product
+from app.db import db
+from app.utils.catalog_cache import product_catalog
+from app.utils.decorators import admin_required
+from app.utils.pagination import keyset_paginate
+
+# Create admin products blueprint with URL prefix
+admin_products_bp = Blueprint('admin_products', __name__, url_prefix='/admin/products')
+
+
+def _read_product_form():
+    """Validate the add/edit product form.
+
+    Returns:
+        tuple: ``(fields, error)``; ``fields`` is a dict of Product column
+        values when the form is valid, otherwise ``error`` is a message
+    """
+    name = request.form.get('name', '').strip()
+    description = request.form.get('description', '').strip()
+    category = request.form.get('category', '').strip().lower()
+    price_str = request.form.get('price', '').strip()
+    image = request.form.get('image', '').strip()
+
+    if not name:
+        return None, 'Product name is required.'
+    if not category:
+        return None, 'Category is required.'
+    if len(category) > 50:
+        return None, 'Category must be at most 50 characters.'
+    if len(image) > 16:
+        return None, 'Image must be a single emoji.'
+    try:
+        price = float(price_str)
+    except ValueError:
+        return None, 'Price must be a valid number.'
+    if price < 0:
+        return None, 'Price must be a positive number.'
+
+    return {
+        'name': name,
+        'description': description if description else None,
+        'category': category,
+        'price': price,
+        'image': image if image else None,
+        'is_active': request.form.get('is_active') == 'on',
+    }, None
+
+
+@admin_products_bp.route('/')
+@admin_required
+def products_management():
+    """Admin products management homepage.
+
+    Lists every product, including inactive ones, newest first with keyset
+    pagination so the page stays fast however large the catalog grows.
+    Accessible at /admin/products route.
+    """
+    page = keyset_paginate(
+        Product.query,
+        Product.id,
+        Product.id,
+        current_app.config['ADMIN_PRODUCTS_PER_PAGE'],
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+    )
+    return render_template('admin/products_management.html', products=page.items, page=page)
+
+
+@admin_products_bp.route('/new', methods=['GET'])
+@admin_required
+def new_product():
+    """Show form for adding a new product."""
+    return render_template('admin/add_product.html')
+
+
+@admin_products_bp.route('/new', methods=['POST'])
+@admin_required
+def create_product():
+    """Handle form submission to create a new product.
+
+    Validates the form, saves the product, invalidates the shop catalog
+    cache and redirects back to products management.
+    """
+    fields, error = _read_product_form()
+    if error:
+        flash(error, 'error')
+        return render_template('admin/add_product.html')
+
+    try:
+        db.session.add(Product(**fields))
+        product_catalog.invalidate()
+        db.session.commit()
+
+        flash(f'Product "{fields["name"]}" has been added successfully!', 'success')
+        return redirect(url_for('admin_products.products_management'))
+
+    except Exception as e:
+        # Rollback in case of error
+        db.session.rollback()
+        flash('An error occurred while adding the product. Please try again.', 'error')
+        return render_template('admin/add_product.html')
+
+
+@admin_products_bp.route('/edit/<int:id>', methods=['GET'])
+@admin_required
+def edit_product(id):
+    """Show form for editing an existing product (404 if it doesn't exist)."""
+    product = Product.query.get_or_404(id)
+    return render_template('admin/edit_product.html', product=product)
+
+
+@admin_products_bp.route('/edit/<int:id>', methods=['POST'])
+@admin_required
+def update_product(id):
+    """Handle form submission to update an existing product.
+
+    Unticking "Active" hides the product from the shop without deleting it.
+    """
+    product = Product.query.get_or_404(id)
+
+    fields, error = _read_product_form()
+    if error:
+        flash(error, 'error')
+        return render_template('admin/edit_product.html', product=product)
+
+    try:
+        for column, value in fields.items():
+            setattr(product, column, value)
+        product_catalog.invalidate()
+        db.session.commit()
+
+        flash(f'Product "{product.name}" has been updated successfully!', 'success')
+        return redirect(url_for('admin_products.products_management'))
+
+    except Exception as e:
+        # Rollback in case of error
+        db.session.rollback()
+        flash('An error occurred while updating the product. Please try again.', 'error')
+        return render_template('admin/edit_product.html', product=product)
+
+
+@admin_products_bp.route('/delete/<int:id>', methods=['POST'])
+@admin_required
+def delete_product(id):
+    """Handle deletion of an existing product (404 if it doesn't exist)."""
+    product = Product.query.get_or_404(id)
+    product_name = product.name  # Store name for flash message before deletion
+
+    try:
+        db.session.delete(product)
+        product_catalog.invalidate()
+        db.session.commit()
+
+        flash(f'Product "{product_name}" has been deleted successfully!', 'success')
+
+    except Exception as e:
+        # Rollback in case of error
+        db.session.rollback()
+        flash('An error occurred while deleting the product. Please try again.', 'error')
+
+    return redirect(url_for('admin_products.products_management'))
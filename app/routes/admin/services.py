@@ -6,9 +6,11 @@ adding new services, editing existing ones, and handling service data.
 
 from flask import Blueprint, render_template, request, flash, redirect, url_for, abort
 
-from app.models import Service
+from app.models import Service, get_all_services
 from app.db import db
+from app.utils.catalog_cache import service_catalog
 from app.utils.decorators import admin_required
+from app.utils.search import search_services
 
 # Create admin services blueprint with URL prefix
 admin_services_bp = Blueprint('admin_services', __name__, url_prefix='/admin/services')
@@ -21,10 +23,11 @@ def services_management():
     
     Renders the services management page where administrators can view all
     services, add new ones, edit existing services, and manage service data.
-    Accessible at /admin/services route.
+    Accessible at /admin/services route; ``?q=`` searches the services.
     """
-    services = Service.query.all()
-    return render_template('admin/services_management.html', services=services)
+    query = request.args.get('q', '').strip()
+    services = search_services(query) if query else get_all_services()
+    return render_template('admin/services_management.html', services=services, query=query)
 
 
 @admin_services_bp.route('/new', methods=['GET'])
@@ -79,6 +82,7 @@ def create_service():
         
         # Save to database
         db.session.add(new_service)
+        service_catalog.invalidate()
         db.session.commit()
         
         flash(f'Service "{name}" has been added successfully!', 'success')
@@ -143,6 +147,7 @@ def update_service(id):
         service.price = price
         
         # Save to database
+        service_catalog.invalidate()
         db.session.commit()
         
         flash(f'Service "{name}" has been updated successfully!', 'success')
@@ -169,6 +174,7 @@ def delete_service(id):
     try:
         # Delete service from database
         db.session.delete(service)
+        service_catalog.invalidate()
         db.session.commit()
         
         flash(f'Service "{service_name}" has been deleted successfully!', 'success')
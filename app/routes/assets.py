@@ -0,0 +1,44 @@
+"""Fingerprinted asset blueprint for PS Framework v2.
+
+Serves the bundles written by ``flask assets build`` from static/dist. The
+filenames contain a content hash, so responses are marked immutable with a
+one-year max-age. When the client accepts it, the pre-generated brotli or
+gzip variant is sent instead of compressing on the fly.
+"""
+
+import os
+
+from flask import Blueprint, abort, current_app, request, send_from_directory
+
+from app.utils.assets import dist_folder
+
+# Create assets blueprint
+assets_bp = Blueprint('assets', __name__, url_prefix='/assets')
+
+# Encoding preference order, with the suffix of the pre-generated file
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+ONE_YEAR = 365 * 24 * 60 * 60
+
+
+@assets_bp.route('/<path:filename>')
+def bundle(filename):
+    """Serve a fingerprinted bundle, preferring a precompressed variant."""
+    if not filename.endswith('.css'):
+        abort(404)
+    
+    folder = dist_folder(current_app)
+    encoding = None
+    served = filename
+    for candidate, suffix in PRECOMPRESSED:
+        if request.accept_encodings[candidate] and os.path.isfile(os.path.join(folder, filename + suffix)):
+            encoding, served = candidate, filename + suffix
+            break
+    
+    response = send_from_directory(folder, served, mimetype='text/css', max_age=ONE_YEAR)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
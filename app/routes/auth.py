@@ -2,15 +2,19 @@
 
 from flask import Blueprint, render_template, request, flash, redirect, url_for
 from flask_login import login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash
 from app.models import User
 from app.db import db
+from app.utils.password_hashing import PasswordHashingBusy
+from app.utils.identity_cache import invalidate_user
+from app.utils.metrics import LOGIN_FAILURES
+from app.utils.rate_limit import rate_limit, client_ip, form_field
 
 # Create auth blueprint with URL prefix '/auth'
 auth_bp = Blueprint('auth_bp', __name__, url_prefix='/auth')
 
 
 @auth_bp.route('/register', methods=['GET', 'POST'])
+@rate_limit('register', '5/hour;burst=10', keys=(client_ip,))
 def register():
     """User registration route - GET displays form, POST processes registration."""
     
@@ -55,6 +59,10 @@ def register():
             flash('Registration successful! Please log in.', 'success')
             return redirect(url_for('auth_bp.login'))
             
+        except PasswordHashingBusy:
+            db.session.rollback()
+            flash('The server is busy right now. Please try again in a moment.', 'error')
+            return render_template('auth/register.html'), 503
         except Exception as e:
             # Rollback on error
             db.session.rollback()
@@ -66,6 +74,7 @@ def register():
 
 
 @auth_bp.route('/login', methods=['GET', 'POST'])
+@rate_limit('login', '10/minute', keys=(client_ip, form_field('username')))
 def login():
     """User login route - GET displays form, POST processes authentication."""
     
@@ -95,6 +104,15 @@ def login():
             
             # Verify credentials
             if user and user.verify_password(password):
+                # Upgrade hashes made with old method/cost settings while we
+                # have the plaintext; a failure here must not block the login
+                if user.password_needs_rehash():
+                    try:
+                        user.set_password(password)
+                        db.session.commit()
+                    except Exception:
+                        db.session.rollback()
+                
                 # Login successful
                 login_user(user, remember=remember_me)
                 flash(f'Welcome back, {user.username}!', 'success')
@@ -111,9 +129,13 @@ def login():
                     return redirect(url_for('home_bp.index'))
             else:
                 # Invalid credentials
+                LOGIN_FAILURES.inc('unknown_user' if user is None else 'bad_password')
                 flash('Invalid username or password.', 'error')
                 return render_template('auth/login.html')
                 
+        except PasswordHashingBusy:
+            flash('The server is busy right now. Please try again in a moment.', 'error')
+            return render_template('auth/login.html'), 503
         except Exception as e:
             flash('An error occurred during login. Please try again.', 'error')
             return render_template('auth/login.html')
@@ -149,6 +171,7 @@ def profile():
 
 @auth_bp.route('/change-password', methods=['GET', 'POST'])
 @login_required
+@rate_limit('change_password', '5/minute', keys=(client_ip,))
 def change_password():
     """Change password route - requires login."""
     
@@ -181,13 +204,22 @@ def change_password():
                 flash('Current password is incorrect.', 'error')
                 return render_template('auth/change_password.html')
             
-            # Update password
-            current_user.set_password(new_password)
+            # Update password and bump the session version, which logs out
+            # the user's other sessions; then re-issue this session's id
+            user = current_user.model
+            user.set_password(new_password)
+            user.session_version = (user.session_version or 0) + 1
+            invalidate_user(user.id)
             db.session.commit()
+            login_user(user)
             
             flash('Password changed successfully!', 'success')
             return redirect(url_for('auth_bp.profile'))
             
+        except PasswordHashingBusy:
+            db.session.rollback()
+            flash('The server is busy right now. Please try again in a moment.', 'error')
+            return render_template('auth/change_password.html'), 503
         except Exception as e:
             db.session.rollback()
             flash('An error occurred while changing password. Please try again.', 'error')
@@ -1,16 +1,24 @@
 """Booking management routes for PSv2."""
 
-from flask import Blueprint, render_template, request, redirect, url_for, flash, abort
+from flask import Blueprint, render_template, request, redirect, url_for, flash, abort, current_app
 from flask_login import login_required, current_user
 from datetime import datetime
 from app.db import db
-from app.models import Booking, Service, User
+from app.models import Booking, Service, User, get_all_services
+from app.utils.availability import is_slot_available, is_slot_overbooked
+from app.utils.booking_stats import get_booking_stats
+from app.utils.catalog_cache import service_catalog
+from app.utils.metrics import BOOKINGS_CREATED
+from app.utils.notifications import queue_booking_cancellation, queue_booking_confirmation
+from app.utils.pagination import keyset_paginate
+from app.utils.rate_limit import rate_limit, client_ip, form_field
 
 # Create bookings blueprint
 bookings_bp = Blueprint('bookings', __name__, url_prefix='/bookings')
 
 
 @bookings_bp.route('/new/<int:service_id>', methods=['GET', 'POST'])
+@rate_limit('new_booking', '20/hour;burst=5', keys=(client_ip, form_field('guest_email')))
 def new_booking(service_id):
     """Create a new booking for a service."""
     # Get the service or return 404
@@ -48,6 +56,11 @@ def new_booking(service_id):
                 flash('Booking date must be in the future.', 'error')
                 return render_template('bookings/new.html', service=service)
             
+            # Check the slot isn't already fully booked
+            if not is_slot_available(service_id, booking_datetime):
+                flash('That time slot is fully booked. Please choose another time.', 'error')
+                return render_template('bookings/new.html', service=service)
+            
             # Create new booking
             if current_user.is_authenticated:
                 # Registered user booking
@@ -72,7 +85,18 @@ def new_booking(service_id):
                 )
             
             db.session.add(booking)
+            db.session.flush()
+            
+            # Re-check now that this transaction holds the write lock, in
+            # case a concurrent request took the slot after the check above
+            if is_slot_overbooked(service_id, booking_datetime):
+                db.session.rollback()
+                flash('That time slot is fully booked. Please choose another time.', 'error')
+                return render_template('bookings/new.html', service=service)
+            
+            queue_booking_confirmation(booking)
             db.session.commit()
+            BOOKINGS_CREATED.inc('registered' if current_user.is_authenticated else 'guest')
             
             customer_name = current_user.username if current_user.is_authenticated else guest_name
             flash(f'Booking created successfully for {service.name}, {customer_name}!', 'success')
@@ -102,17 +126,44 @@ def new_booking(service_id):
 @bookings_bp.route('/all')
 @login_required
 def all_bookings():
-    """List bookings based on user role."""
+    """List bookings based on user role.
+    
+    Results are keyset-paginated on (booking_date, id) so each page costs the
+    same regardless of table size. Query parameters:
+        after: cursor of the last booking on the previous page (older bookings)
+        before: cursor of the first booking on the next page (newer bookings)
+        per_page: page size, capped at BOOKINGS_MAX_PER_PAGE
+    """
+    per_page = request.args.get('per_page', current_app.config['BOOKINGS_PER_PAGE'], type=int)
+    per_page = max(1, min(per_page, current_app.config['BOOKINGS_MAX_PER_PAGE']))
+    
     if current_user.role == 'admin':
         # Admins see all bookings
-        bookings = Booking.query.order_by(Booking.booking_date.desc()).all()
+        query = Booking.query_with_details()
         page_title = "All Bookings"
+        stats = get_booking_stats()
+        export_services = get_all_services()
     else:
         # Customers see only their own bookings
-        bookings = Booking.query.filter_by(user_id=current_user.id).order_by(Booking.booking_date.desc()).all()
+        query = Booking.query_with_details().filter_by(user_id=current_user.id)
         page_title = "My Bookings"
+        stats = None
+        export_services = None
+    
+    page = keyset_paginate(
+        query,
+        Booking.booking_date,
+        Booking.id,
+        per_page,
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+    )
     
-    return render_template('bookings/all.html', bookings=bookings, page_title=page_title)
+    # Booking cards are fragment-cached; service_version invalidates them
+    # when a service's name or price changes
+    return render_template('bookings/all.html', bookings=page.items, page=page, stats=stats,
+                           page_title=page_title, export_services=export_services,
+                           service_version=service_catalog.version)
 
 
 @bookings_bp.route('/cancel/<int:booking_id>', methods=['POST'])
@@ -134,6 +185,7 @@ def cancel_booking(booking_id):
     # Cancel the booking
     booking.status = 'cancelled'
     booking.updated_at = datetime.utcnow()
+    queue_booking_cancellation(booking)
     
     try:
         db.session.commit()
@@ -162,6 +214,8 @@ def update_status(booking_id):
         return redirect(url_for('bookings.all_bookings'))
     
     # Update status
+    if new_status == 'cancelled' and booking.status != 'cancelled':
+        queue_booking_cancellation(booking)
     booking.status = new_status
     booking.updated_at = datetime.utcnow()
     
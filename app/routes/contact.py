@@ -3,11 +3,18 @@
 from flask import Blueprint, render_template, request, flash, redirect, url_for
 import re
 
+from app.db import db
+from app.utils.http_cache import conditional_get
+from app.utils.notifications import queue_contact_message
+from app.utils.rate_limit import rate_limit, client_ip, form_field
+
 # Create contact blueprint
 contact_bp = Blueprint('contact_bp', __name__)
 
 
 @contact_bp.route('/contact', methods=['GET', 'POST'])
+@conditional_get()
+@rate_limit('contact', '5/hour;burst=3', keys=(client_ip, form_field('email')))
 def contact():
     """Contact page with form for customer inquiries."""
     
@@ -47,11 +54,15 @@ def contact():
                 flash('Message must be at least 10 characters long.', 'error')
                 return render_template('contact.html')
             
-            # If all validation passes
+            # Delivered by the background worker
+            queue_contact_message(name, email, message)
+            db.session.commit()
+            
             flash(f'Thank you, {name}! Your message has been sent successfully. We will get back to you soon.', 'success')
             return redirect(url_for('contact_bp.contact'))
             
         except Exception as e:
+            db.session.rollback()
             flash('An error occurred while sending your message. Please try again.', 'error')
             return render_template('contact.html')
     
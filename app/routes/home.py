@@ -1,10 +1,13 @@
 from flask import Blueprint, render_template
 
+from app.utils.http_cache import conditional_get
+
 # Create a Flask Blueprint named 'home_bp'
 home_bp = Blueprint('home_bp', __name__)
 
 
 @home_bp.route('/')
+@conditional_get()
 def index():
 	"""Home page route that renders home.html template."""
 	return render_template('home.html')
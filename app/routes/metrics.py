@@ -0,0 +1,35 @@
+"""Prometheus metrics endpoint for PS Framework v2."""
+
+import hmac
+
+from flask import Blueprint, Response, abort, current_app, request
+from flask_login import current_user
+
+from app.utils.metrics import render_metrics
+
+# Create metrics blueprint
+metrics_bp = Blueprint('metrics', __name__)
+
+
+def _authorized():
+    token = current_app.config['METRICS_TOKEN']
+    header = request.headers.get('Authorization', '')
+    if token and header.startswith('Bearer ') and hmac.compare_digest(header[len('Bearer '):], token):
+        return True
+    return current_user.is_authenticated and current_user.role == 'admin'
+
+
+@metrics_bp.route('/metrics')
+def metrics():
+    """Application metrics in the Prometheus text format, summed over all worker processes.
+    
+    Requires an admin session or ``Authorization: Bearer <METRICS_TOKEN>``.
+    """
+    if not current_app.config['METRICS_ENABLED']:
+        abort(404)
+    if not _authorized():
+        abort(403)
+    response = Response(render_metrics(current_app.config['METRICS_DIR']),
+                        mimetype='text/plain; version=0.0.4')
+    response.headers['Cache-Control'] = 'no-store'
+    return response
@@ -3,20 +3,64 @@
 Handles the services listing page where users can view all available services.
 """
 
-from flask import Blueprint, render_template
+from datetime import date, timedelta
 
-from app.models import Service
+from flask import Blueprint, render_template, request, jsonify, current_app
+
+from app.models import Service, get_all_services
+from app.utils.availability import get_open_slots
+from app.utils.catalog_cache import service_catalog, service_catalog_version
+from app.utils.http_cache import conditional_get
+from app.utils.search import search_services
 
 # Create services blueprint
 services_bp = Blueprint('services', __name__)
 
 
 @services_bp.route('/services')
+@conditional_get(data_version=service_catalog_version)
 def services_list():
     """Display all services stored in the database.
     
-    Fetches all services using Service.query.all() and renders them
-    in the services.html template.
+    Services come from the in-process catalog cache (see get_all_services)
+    and are rendered in the services.html template. With a ``q`` query
+    parameter only matching services are shown, best matches first.
+    """
+    query = request.args.get('q', '').strip()
+    services = search_services(query) if query else get_all_services()
+    # Rows are fragment-cached per service and catalog version
+    return render_template('services.html', services=services, query=query,
+                           service_version=service_catalog.version)
+
+
+@services_bp.route('/services/<int:service_id>/availability')
+def service_availability(service_id):
+    """Return open booking slots for a service as JSON.
+    
+    Query parameters:
+        start: First day, YYYY-MM-DD (default: today)
+        end: Last day, YYYY-MM-DD (default: start + 6 days)
+    
+    The range may span at most AVAILABILITY_MAX_DAYS days.
     """
-    services = Service.query.all()
-    return render_template('services.html', services=services)
\ No newline at end of file
+    service = Service.query.get_or_404(service_id)
+    
+    try:
+        start = date.fromisoformat(request.args['start']) if request.args.get('start') else date.today()
+        end = date.fromisoformat(request.args['end']) if request.args.get('end') else start + timedelta(days=6)
+    except ValueError:
+        return jsonify(error='Dates must use the YYYY-MM-DD format.'), 400
+    
+    if end < start:
+        return jsonify(error='End date must not be before start date.'), 400
+    
+    max_days = current_app.config['AVAILABILITY_MAX_DAYS']
+    if (end - start).days + 1 > max_days:
+        return jsonify(error=f'Date range may span at most {max_days} days.'), 400
+    
+    return jsonify(
+        service_id=service.id,
+        slot_minutes=current_app.config['AVAILABILITY_SLOT_MINUTES'],
+        capacity=current_app.config['AVAILABILITY_CAPACITY'],
+        days=get_open_slots(service.id, start, end),
+    )
@@ -1,59 +1,43 @@
 """Shop blueprint for displaying products and shop functionality."""
 
-from flask import Blueprint, render_template
+from flask import Blueprint, current_app, render_template, request
+
+from app.utils.catalog_cache import product_catalog_version
+from app.utils.http_cache import conditional_get
+from app.utils.products import SORT_OPTIONS, get_product_categories, get_product_page, parse_product_filters
 
 # Create shop blueprint
 shop_bp = Blueprint('shop_bp', __name__)
 
 
 @shop_bp.route('/shop')
+@conditional_get(data_version=product_catalog_version)
 def shop():
-    """Shop page displaying products grid."""
-    
-    # Placeholder product data
-    products = [
-        {
-            'id': 1,
-            'name': 'Premium Dog Food',
-            'price': 49.99,
-            'image': '🍖',
-            'description': 'High-quality nutrition for your furry friend'
-        },
-        {
-            'id': 2,
-            'name': 'Cat Grooming Kit',
-            'price': 29.99,
-            'image': '🧴',
-            'description': 'Complete grooming essentials for cats'
-        },
-        {
-            'id': 3,
-            'name': 'Pet Toy Set',
-            'price': 19.99,
-            'image': '🎾',
-            'description': 'Fun and interactive toys for pets'
-        },
-        {
-            'id': 4,
-            'name': 'Pet Carrier',
-            'price': 79.99,
-            'image': '🎒',
-            'description': 'Safe and comfortable travel carrier'
-        },
-        {
-            'id': 5,
-            'name': 'Pet Bed',
-            'price': 39.99,
-            'image': '🛏️',
-            'description': 'Cozy and comfortable pet bed'
-        },
-        {
-            'id': 6,
-            'name': 'Dog Leash',
-            'price': 15.99,
-            'image': '🦮',
-            'description': 'Durable and comfortable dog leash'
-        }
-    ]
-    
-    return render_template('shop.html', products=products)
\ No newline at end of file
+    """Shop page displaying a filterable, paginated products grid.
+
+    Query parameters:
+        category: Only show products in this category
+        min_price / max_price: Price range filter
+        sort: One of SORT_OPTIONS (newest, price_asc, price_desc, name)
+        after / before: Keyset pagination cursors
+    """
+    filters = parse_product_filters(request.args)
+    page = get_product_page(
+        filters,
+        current_app.config['SHOP_PRODUCTS_PER_PAGE'],
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+    )
+
+    # Filter values to carry over into the pagination links
+    filter_args = {key: value for key, value in filters._asdict().items() if value is not None}
+
+    return render_template(
+        'shop.html',
+        products=page.items,
+        page=page,
+        filters=filters,
+        filter_args=filter_args,
+        categories=get_product_categories(),
+        sort_options={key: option[0] for key, option in SORT_OPTIONS.items()},
+    )
@@ -0,0 +1,303 @@
+"""Preforking production HTTP server (``flask serve``).
+
+The master process loads the app once, binds the listening socket and forks
+SERVER_WORKERS worker processes that share it. Each worker runs Werkzeug's
+HTTP server with a fixed pool of SERVER_THREADS threads, and only accepts a
+connection once a thread is free, so a busy worker leaves new connections
+in the listen backlog for an idle one.
+
+Signals, sent to the master:
+
+    SIGTERM, SIGINT  stop accepting, let in-flight requests finish (for up to
+                     SERVER_GRACEFUL_TIMEOUT seconds), then exit
+    SIGHUP           start a new set of workers, then gracefully stop the
+                     old ones; no request is dropped
+
+A worker also retires after SERVER_MAX_REQUESTS requests (plus up to
+SERVER_MAX_REQUESTS_JITTER more, so workers don't all recycle at once) and
+is replaced by a fresh fork, which bounds slow memory growth.
+
+Because the app is preloaded, forked workers run the master's code: SIGHUP
+gives fresh processes, not new code. Restart the master to deploy.
+
+Responses are sent with ``Connection: close``; put a reverse proxy in front
+for keep-alive and TLS.
+"""
+
+import logging
+import os
+import random
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from app.db import db
+
+logger = logging.getLogger(__name__)
+
+_STOP_SIGNALS = (signal.SIGTERM, signal.SIGINT, signal.SIGQUIT)
+
+
+class _RequestHandler(WSGIRequestHandler):
+    # One request per connection keeps a pool thread from idling on a
+    # keep-alive connection while others queue
+    protocol_version = 'HTTP/1.0'
+    timeout = 30  # Seconds a client may stall mid-request
+
+
+class _QuietRequestHandler(_RequestHandler):
+    def log_request(self, code='-', size='-'):
+        pass
+
+
+class PoolServer(BaseWSGIServer):
+    """Werkzeug server running requests on a fixed-size thread pool.
+
+    Args:
+        app: WSGI application
+        sock (socket.socket): Non-blocking listening socket shared with the
+            other workers
+        threads (int): Requests handled concurrently
+        access_log (bool): Log one line per request
+        max_requests (int): Set ``retire`` once this many requests are
+            handled; 0 for no limit
+    """
+
+    multithread = True
+    multiprocess = True
+
+    def __init__(self, app, sock, threads, access_log=False, max_requests=0):
+        host, port = sock.getsockname()[:2]
+        handler = _RequestHandler if access_log else _QuietRequestHandler
+        super().__init__(host, port, app, handler=handler, fd=sock.fileno())
+        self._slots = threading.BoundedSemaphore(threads)
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='http')
+        self._count_lock = threading.Lock()
+        self.handled = 0
+        self.max_requests = max_requests
+        self.retire = threading.Event()
+
+    def get_request(self):
+        # Wait for a free thread before accepting. The socket is
+        # non-blocking: if another worker took the connection first, accept
+        # raises and the serve loop goes back to waiting.
+        self._slots.acquire()
+        try:
+            return super().get_request()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._count_lock:
+                self.handled += 1
+                if self.max_requests and self.handled >= self.max_requests:
+                    self.retire.set()
+            self._slots.release()
+
+    def drain(self):
+        """Wait for accepted requests to finish (call after ``shutdown``)."""
+        self._pool.shutdown(wait=True)
+
+
+def create_listener(host, port, backlog=2048):
+    """Bind a non-blocking TCP listening socket."""
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.setblocking(False)
+    return sock
+
+
+def _run_worker(app, sock, threads, max_requests, access_log, master_pid):
+    """Serve requests until told to stop, recycled, or orphaned; return the exit status."""
+    server = PoolServer(app, sock, threads, access_log=access_log, max_requests=max_requests)
+    stopping = server.retire
+    for signum in _STOP_SIGNALS:
+        signal.signal(signum, lambda *args: stopping.set())
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+
+    # Connections pooled by the master (or a previous generation) belong to
+    # the parent; drop them without closing the parent's sockets
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+    serving = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.5}, name='accept')
+    serving.start()
+    reason = 'stopped'
+    while not stopping.wait(1.0):
+        if os.getppid() != master_pid:
+            reason = 'orphaned'
+            break
+    if max_requests and server.handled >= max_requests:
+        reason = f'recycled after {server.handled} requests'
+
+    server.shutdown()  # Stop accepting; waits for the accept loop to exit
+    server.drain()
+    server.server_close()
+    logger.info('Worker %s %s', os.getpid(), reason)
+    return 0
+
+
+class PreforkServer:
+    """Master process: forks, supervises and replaces workers.
+
+    Args:
+        app (Flask): The preloaded application
+        host (str), port (int): Address to listen on
+        workers (int): Worker processes
+        threads (int): Request threads per worker
+        max_requests (int): Requests after which a worker is replaced; 0 to
+            never recycle
+        max_requests_jitter (int): Up to this many extra requests, chosen
+            per worker
+        graceful_timeout (float): Seconds a stopping worker gets to finish
+            its requests before being killed
+        backlog (int): Listen queue length
+        access_log (bool): Log one line per request
+
+    Usage:
+        PreforkServer(app, '0.0.0.0', 5000, workers=4, threads=8).run()
+    """
+
+    def __init__(self, app, host, port, workers=2, threads=8, max_requests=0, max_requests_jitter=0,
+                 graceful_timeout=30, backlog=2048, access_log=False):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.worker_count = max(1, workers)
+        self.threads = max(1, threads)
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.backlog = backlog
+        self.access_log = access_log
+        self.socket = None
+        self.generation = 0
+        self.workers = {}  # pid -> generation
+        self.retiring = {}  # pid -> kill deadline
+        self._signals = []
+
+    def run(self):
+        """Serve until SIGTERM/SIGINT, then stop all workers and return."""
+        self.socket = create_listener(self.host, self.port, self.backlog)
+        self.port = self.socket.getsockname()[1]
+        for signum in (*_STOP_SIGNALS, signal.SIGHUP, signal.SIGCHLD):
+            signal.signal(signum, self._queue_signal)
+        logger.info('Master %s listening on http://%s:%s with %s worker(s) x %s thread(s)',
+                    os.getpid(), self.host, self.port, self.worker_count, self.threads)
+        try:
+            self._manage_workers()
+            while True:
+                signals, self._signals = self._signals, []
+                if any(signum in _STOP_SIGNALS for signum in signals):
+                    break
+                if signal.SIGHUP in signals:
+                    self.reload()
+                self._reap()
+                self._kill_overdue()
+                self._manage_workers()
+                if not self._signals:
+                    time.sleep(0.5)
+        finally:
+            self.stop()
+
+    def reload(self):
+        """Replace every worker: fork a new generation, then retire the old one."""
+        logger.info('Reloading workers')
+        old = list(self.workers)
+        self.generation += 1
+        self._manage_workers()
+        for pid in old:
+            self._retire(pid)
+
+    def stop(self):
+        """Gracefully stop all workers, killing those that overrun the timeout."""
+        for pid in list(self.workers):
+            self._retire(pid)
+        while self.workers:
+            self._reap()
+            self._kill_overdue()
+            if self.workers:
+                time.sleep(0.1)
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+        logger.info('Master %s stopped', os.getpid())
+
+    def _queue_signal(self, signum, frame):
+        self._signals.append(signum)
+
+    def _manage_workers(self):
+        current = sum(1 for generation in self.workers.values() if generation == self.generation)
+        for _ in range(self.worker_count - current):
+            self._spawn()
+
+    def _spawn(self):
+        master_pid = os.getpid()
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = self.generation
+            return
+        status = 1
+        try:
+            max_requests = self.max_requests
+            if max_requests:
+                max_requests += random.randint(0, self.max_requests_jitter)
+            status = _run_worker(self.app, self.socket, self.threads, max_requests, self.access_log, master_pid)
+        except BaseException:
+            logger.exception('Worker %s crashed', os.getpid())
+        finally:
+            logging.shutdown()
+            os._exit(status)  # Never return into the master's stack
+
+    def _retire(self, pid):
+        if pid in self.retiring:
+            return
+        self.retiring[pid] = time.monotonic() + self.graceful_timeout
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def _kill_overdue(self):
+        now = time.monotonic()
+        for pid, deadline in list(self.retiring.items()):
+            if now >= deadline and pid in self.workers:
+                logger.warning('Worker %s did not stop within %ss; killing it', pid, self.graceful_timeout)
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                self.retiring[pid] = float('inf')
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            self.workers.pop(pid, None)
+            retired = self.retiring.pop(pid, None) is not None
+            code = os.waitstatus_to_exitcode(status)
+            if code and not retired:
+                logger.warning('Worker %s exited with status %s', pid, code)
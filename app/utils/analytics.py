@@ -0,0 +1,262 @@
+"""Booking analytics backed by incrementally maintained rollups.
+
+booking_rollup holds one row per (appointment day, service, status) with a
+booking count and revenue. The admin analytics dashboard reads only this
+table, so its cost depends on the date range shown, not on how many
+bookings exist.
+
+The rollups are kept current by an ``after_flush`` session listener. It
+turns every Booking insert, delete and status/date/service/price change
+being flushed into +1/-1 deltas and upserts them on the flushing connection, i.e.
+inside the same transaction as the booking write. A rolled-back booking
+therefore never leaves a trace in the rollups. Revenue deltas use the
+booking's own ``price`` (the service price when it was booked), so taking
+a booking out of a rollup always removes exactly what adding it put in,
+however the service price has changed since. This covers the booking
+routes, CLI commands and anything else going through the ORM. Bulk
+statements that bypass it (app/utils/bulk_io.py) call
+apply_rollup_deltas() themselves.
+
+``flask analytics rebuild`` recomputes everything from the booking table in
+day-range chunks, e.g. after restoring a backup.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import case, delete, event, func, insert, inspect, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import ObjectDeletedError
+
+from app.db import db
+from app.models import Booking, BookingRollup
+
+# Bookings in these statuses count towards volume but not revenue
+NON_REVENUE_STATUSES = ('cancelled',)
+
+_TRACKED_ATTRIBUTES = ('booking_date', 'service_id', 'status', 'price')
+
+
+def _start_of(day):
+    return datetime.combine(day, time.min)
+
+
+class RollupDeltas:
+    """Pending +/- booking counts and revenue keyed by (day, service_id, status)."""
+
+    def __init__(self):
+        self._deltas = defaultdict(lambda: [0, 0.0])
+
+    def add(self, booking_date, service_id, status, sign, price=None):
+        if booking_date is None or service_id is None:
+            return
+        day = booking_date.date() if isinstance(booking_date, datetime) else booking_date
+        delta = self._deltas[(day, service_id, status or 'pending')]
+        delta[0] += sign
+        delta[1] += sign * (price or 0.0)
+
+    def items(self):
+        """Return ``[(key, bookings, revenue)]`` for the keys that changed."""
+        return [(key, count, revenue) for key, (count, revenue) in self._deltas.items() if count or revenue]
+
+    def __bool__(self):
+        return bool(self.items())
+
+
+def apply_rollup_deltas(connection, deltas):
+    """Upsert ``deltas`` into booking_rollup on ``connection``.
+
+    Run it on the connection of the transaction that writes the bookings so
+    the rollups commit or roll back together with them.
+    """
+    changes = deltas.items()
+    if not changes:
+        return
+    table = BookingRollup.__table__
+    statement = sqlite_insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.day, table.c.service_id, table.c.status],
+        set_={
+            'bookings': table.c.bookings + statement.excluded.bookings,
+            'revenue': table.c.revenue + statement.excluded.revenue,
+        },
+    )
+    connection.execute(statement, [
+        {'day': day, 'service_id': service_id, 'status': status,
+         'bookings': count, 'revenue': revenue}
+        for (day, service_id, status), count, revenue in changes
+    ])
+
+
+def _old_and_new(state, attribute):
+    history = state.attrs[attribute].history
+    if history.deleted:
+        old = history.deleted[0]
+    else:
+        old = history.unchanged[0] if history.unchanged else None
+    new = history.added[0] if history.added else old
+    return old, new
+
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    pass
+
+
+# active_history makes SQLAlchemy load the committed value of an expired
+# attribute before it is overwritten, so the flush knows which rollup to
+# take the booking out of
+for _name in _TRACKED_ATTRIBUTES:
+    event.listen(getattr(Booking, _name), 'set', _keep_old_value, active_history=True)
+
+
+@event.listens_for(Session, 'before_flush')
+def _load_deleted_bookings(session, flush_context, instances):
+    # A booking loaded before a commit and deleted after it has been expired,
+    # so its tracked values are not in memory, and once the flush has run
+    # there is no row left to load them from. Load them while there is.
+    for obj in session.deleted:
+        if isinstance(obj, Booking) and inspect(obj).expired_attributes.intersection(_TRACKED_ATTRIBUTES):
+            try:
+                obj.booking_date  # Loads every expired column in one SELECT
+            except ObjectDeletedError:
+                pass  # Already deleted elsewhere, which took it out of the rollups
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_booking_writes(session, flush_context):
+    deltas = RollupDeltas()
+    for obj in session.new:
+        if isinstance(obj, Booking):
+            deltas.add(obj.booking_date, obj.service_id, obj.status, +1, obj.price)
+    for obj in session.deleted:
+        if isinstance(obj, Booking):
+            state = inspect(obj)
+            # The committed values: those are what the rollups counted
+            old = {name: _old_and_new(state, name)[0] for name in _TRACKED_ATTRIBUTES}
+            deltas.add(old['booking_date'], old['service_id'], old['status'], -1, old['price'])
+    for obj in session.dirty:
+        if not isinstance(obj, Booking):
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[name].history.has_changes() for name in _TRACKED_ATTRIBUTES):
+            continue
+        (old_date, new_date), (old_service, new_service), (old_status, new_status), (old_price, new_price) = (
+            _old_and_new(state, name) for name in _TRACKED_ATTRIBUTES
+        )
+        deltas.add(old_date, old_service, old_status, -1, old_price)
+        deltas.add(new_date, new_service, new_status, +1, new_price)
+    if deltas:
+        apply_rollup_deltas(session.connection(), deltas)
+
+
+def rebuild_rollups(chunk_days=31, progress=None):
+    """Recompute booking_rollup from the booking table.
+
+    Works through the booking date range ``chunk_days`` at a time, replacing
+    each range's rollups in its own short transaction, so the dashboard
+    keeps showing data while a rebuild runs.
+
+    Args:
+        chunk_days (int): Days of bookings aggregated per transaction
+        progress (callable): Called with ``(first day, day after last)``
+            after each chunk
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    table = BookingRollup.__table__
+    first, last = db.session.query(func.min(Booking.booking_date), func.max(Booking.booking_date)).one()
+    if first is None:
+        db.session.execute(delete(table))
+        db.session.commit()
+        return 0
+
+    first_day, end_day = first.date(), last.date() + timedelta(days=1)
+    db.session.execute(delete(table).where(or_(table.c.day < first_day, table.c.day >= end_day)))
+    db.session.commit()
+
+    written = 0
+    day = first_day
+    while day < end_day:
+        chunk_end = min(day + timedelta(days=chunk_days), end_day)
+        db.session.execute(delete(table).where(table.c.day >= day, table.c.day < chunk_end))
+        aggregate = (
+            select(
+                func.date(Booking.booking_date),
+                Booking.service_id,
+                func.coalesce(Booking.status, 'pending'),
+                func.count(),
+                func.coalesce(func.sum(Booking.price), 0),
+            )
+            .where(Booking.booking_date >= _start_of(day), Booking.booking_date < _start_of(chunk_end))
+            .group_by(func.date(Booking.booking_date), Booking.service_id,
+                      func.coalesce(Booking.status, 'pending'))
+        )
+        result = db.session.execute(insert(table).from_select(
+            ['day', 'service_id', 'status', 'bookings', 'revenue'], aggregate
+        ))
+        written += result.rowcount
+        db.session.commit()
+        if progress is not None:
+            progress(day, chunk_end)
+        day = chunk_end
+    return written
+
+
+def get_analytics(start, end):
+    """Summarize bookings with appointments between ``start`` and ``end`` (inclusive).
+
+    Reads booking_rollup only.
+
+    Returns:
+        dict: ``totals`` (bookings, revenue, per-status counts), ``daily``
+        (one entry per day, zero-filled) and ``services`` (busiest first)
+    """
+    table = BookingRollup.__table__
+    in_range = (table.c.day >= start, table.c.day <= end)
+    revenue = func.sum(case((table.c.status.in_(NON_REVENUE_STATUSES), 0.0), else_=table.c.revenue))
+
+    by_status = {
+        status: bookings
+        for status, bookings in db.session.execute(
+            select(table.c.status, func.sum(table.c.bookings)).where(*in_range).group_by(table.c.status)
+        )
+        if bookings
+    }
+
+    per_day = {
+        (day if isinstance(day, date) else date.fromisoformat(day)): (bookings, amount)
+        for day, bookings, amount in db.session.execute(
+            select(table.c.day, func.sum(table.c.bookings), revenue).where(*in_range).group_by(table.c.day)
+        )
+    }
+    daily = []
+    day = start
+    while day <= end:
+        bookings, amount = per_day.get(day, (0, 0.0))
+        daily.append({'day': day, 'bookings': bookings, 'revenue': amount or 0.0})
+        day += timedelta(days=1)
+
+    services = [
+        {'service_id': service_id, 'bookings': bookings, 'revenue': amount or 0.0}
+        for service_id, bookings, amount in db.session.execute(
+            select(table.c.service_id, func.sum(table.c.bookings).label('bookings'), revenue)
+            .where(*in_range)
+            .group_by(table.c.service_id)
+            .order_by(func.sum(table.c.bookings).desc())
+        )
+        if bookings
+    ]
+
+    total = sum(by_status.values())
+    return {
+        'totals': {
+            'bookings': total,
+            'revenue': sum(entry['revenue'] for entry in daily),
+            'by_status': by_status,
+            'cancellation_rate': (by_status.get('cancelled', 0) / total) if total else 0.0,
+        },
+        'daily': daily,
+        'services': services,
+    }
@@ -0,0 +1,160 @@
+"""Static asset pipeline: CSS bundling, fingerprinting and precompression.
+
+``flask assets build`` concatenates and minifies each bundle in BUNDLES,
+writes it to static/dist/ under a content-hashed filename (so it can be
+cached forever), and pre-generates .gz and, when the optional ``brotli``
+package is installed, .br variants. A manifest.json maps bundle names to the
+hashed filenames.
+
+Templates include bundles with ``{{ css_bundle('core') }}``. When no build
+exists (local development) the helper falls back to linking the individual
+source files through the regular static route.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+
+from flask import current_app, url_for
+from markupsafe import Markup, escape
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+# Bundle name -> source files (relative to the static folder), in load order.
+# 'core' is linked from base.html on every page; the rest are per page group.
+BUNDLES = {
+    'core': ['css/base.css', 'css/navbar.css', 'css/theme.css'],
+    'home': ['css/home.css'],
+    'shop': ['css/shop.css'],
+    'forms': ['css/forms.css'],
+    'account': ['css/account.css', 'css/theme.css'],
+    'bookings': ['css/bookings.css'],
+    'admin': ['css/admin.css'],
+    'admin_forms': ['css/admin.css', 'css/forms.css'],
+}
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+
+_manifests = {}
+
+_CSS_STRINGS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+_CSS_COMMENTS = re.compile(r'/\*.*?\*/', re.S)
+_CSS_SPACES = re.compile(r'\s+')
+_CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*')
+_CSS_COLON = re.compile(r':\s+')
+
+
+def minify_css(css):
+    """Minify CSS by removing comments and redundant whitespace.
+
+    Quoted strings are left untouched so ``content: ' / '`` style values
+    survive intact.
+    """
+    css = _CSS_COMMENTS.sub('', css)
+    parts = _CSS_STRINGS.split(css)
+    for index in range(0, len(parts), 2):  # even indexes are outside strings
+        chunk = _CSS_SPACES.sub(' ', parts[index])
+        chunk = _CSS_PUNCTUATION.sub(r'\1', chunk)
+        # Only drop space *after* colons: 'a :hover' differs from 'a:hover'
+        chunk = _CSS_COLON.sub(':', chunk)
+        parts[index] = chunk.replace(';}', '}')
+    return ''.join(parts).strip()
+
+
+def dist_folder(app):
+    return os.path.join(app.static_folder, DIST_DIR)
+
+
+def build_assets(app, minify=True):
+    """Build every bundle into static/dist and write the manifest.
+
+    Returns:
+        dict: Bundle name -> ``{'file', 'size', 'gzip', 'brotli'}`` byte sizes
+    """
+    output = dist_folder(app)
+    os.makedirs(output, exist_ok=True)
+    for filename in os.listdir(output):
+        os.remove(os.path.join(output, filename))
+
+    manifest, report = {}, {}
+    for name, sources in BUNDLES.items():
+        chunks = []
+        for source in sources:
+            with open(os.path.join(app.static_folder, source), encoding='utf-8') as handle:
+                chunks.append(handle.read())
+        css = '\n'.join(chunks)
+        if minify:
+            css = minify_css(css)
+        data = css.encode('utf-8')
+
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        filename = f'{name}.{digest}.css'
+        path = os.path.join(output, filename)
+        with open(path, 'wb') as handle:
+            handle.write(data)
+
+        gz_data = gzip.compress(data, compresslevel=9, mtime=0)
+        with open(path + '.gz', 'wb') as handle:
+            handle.write(gz_data)
+        br_size = None
+        if brotli is not None:
+            br_data = brotli.compress(data, quality=11)
+            with open(path + '.br', 'wb') as handle:
+                handle.write(br_data)
+            br_size = len(br_data)
+
+        manifest[name] = filename
+        report[name] = {'file': filename, 'size': len(data), 'gzip': len(gz_data), 'brotli': br_size}
+
+    with open(os.path.join(output, MANIFEST_NAME), 'w', encoding='utf-8') as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+    _manifests.pop(app.static_folder, None)
+    return report
+
+
+def load_manifest(app):
+    """Return the bundle manifest ({} if assets have not been built)."""
+    manifest = _manifests.get(app.static_folder)
+    if manifest is None:
+        try:
+            with open(os.path.join(dist_folder(app), MANIFEST_NAME), encoding='utf-8') as handle:
+                manifest = json.load(handle)
+        except (OSError, ValueError):
+            manifest = {}
+        _manifests[app.static_folder] = manifest
+    return manifest
+
+
+def asset_urls(bundle):
+    """Return the URLs to load for a bundle, like ``url_for`` for static files.
+
+    One fingerprinted URL when the bundle has been built and ASSETS_USE_BUNDLES
+    is on, otherwise one plain static URL per source file.
+    """
+    if bundle not in BUNDLES:
+        raise KeyError(f'Unknown asset bundle: {bundle}')
+    if current_app.config.get('ASSETS_USE_BUNDLES', True):
+        filename = load_manifest(current_app).get(bundle)
+        if filename:
+            return [url_for('assets.bundle', filename=filename)]
+    return [url_for('static', filename=source) for source in BUNDLES[bundle]]
+
+
+def css_bundle(bundle):
+    """Render ``<link>`` tags for a CSS bundle (Jinja global)."""
+    return Markup('\n'.join(
+        f'<link rel="stylesheet" href="{escape(href)}">' for href in asset_urls(bundle)
+    ))
+
+
+def init_assets(app):
+    """Register the asset route and Jinja helpers on the app."""
+    from app.routes.assets import assets_bp
+    app.register_blueprint(assets_bp)
+    app.jinja_env.globals.update(asset_urls=asset_urls, css_bundle=css_bundle)
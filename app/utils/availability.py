@@ -0,0 +1,141 @@
+"""Service availability (free slot) computation for PSv2.
+
+Availability for a date range is computed from a single range query over the
+booking table. Each active booking is treated as occupying one slot-length
+interval starting at its booking_date; the sorted start times are then
+swept against the candidate slots generated from the opening hours, so the
+cost is one indexed query plus O(slots * log bookings) in Python.
+
+Configuration (app.config):
+    AVAILABILITY_OPENING_HOURS: {weekday: ('HH:MM', 'HH:MM') or None},
+        Monday is 0; missing or None weekdays are closed
+    AVAILABILITY_SLOT_MINUTES: Slot length in minutes
+    AVAILABILITY_CAPACITY: Bookings allowed to overlap a single slot
+    AVAILABILITY_MAX_DAYS: Longest range a single request may ask for
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timedelta
+
+from flask import current_app
+
+from app.db import db
+from app.models import Booking
+
+DEFAULT_OPENING_HOURS = {
+    0: ('09:00', '17:00'),
+    1: ('09:00', '17:00'),
+    2: ('09:00', '17:00'),
+    3: ('09:00', '17:00'),
+    4: ('09:00', '17:00'),
+    5: ('10:00', '14:00'),
+    6: None,
+}
+
+# Statuses that no longer hold a slot
+INACTIVE_STATUSES = ('cancelled',)
+
+
+def _parse_clock(value):
+    hours, minutes = value.split(':')
+    return time(int(hours), int(minutes))
+
+
+def _settings():
+    config = current_app.config
+    return (
+        config.get('AVAILABILITY_OPENING_HOURS', DEFAULT_OPENING_HOURS),
+        timedelta(minutes=config.get('AVAILABILITY_SLOT_MINUTES', 60)),
+        config.get('AVAILABILITY_CAPACITY', 1),
+    )
+
+
+def booked_start_times(service_id, start, end, slot_length):
+    """Return sorted start times of active bookings that may overlap [start, end).
+
+    A booking starting up to one slot length before ``start`` still overlaps
+    the first slot, so the range query is widened accordingly.
+    """
+    rows = (
+        db.session.query(Booking.booking_date)
+        .filter(
+            Booking.service_id == service_id,
+            Booking.booking_date > start - slot_length,
+            Booking.booking_date < end,
+            db.or_(Booking.status.is_(None), Booking.status.notin_(INACTIVE_STATUSES)),
+        )
+        .order_by(Booking.booking_date)
+        .all()
+    )
+    return [row[0] for row in rows]
+
+
+def count_overlapping(starts, slot_start, slot_end, slot_length):
+    """Count bookings in the sorted ``starts`` list overlapping [slot_start, slot_end)."""
+    return bisect_left(starts, slot_end) - bisect_right(starts, slot_start - slot_length)
+
+
+def get_open_slots(service_id, start_date, end_date, now=None):
+    """Return open slots for a service between two dates (inclusive).
+
+    Args:
+        service_id (int): Service to check
+        start_date (date): First day of the range
+        end_date (date): Last day of the range
+        now (datetime): Slots starting before this are skipped (default: now)
+
+    Returns:
+        list[dict]: One entry per day with ``date`` and ``slots``, each slot
+        having ``start``, ``end`` and ``remaining`` capacity
+    """
+    opening_hours, slot_length, capacity = _settings()
+    now = now or datetime.now()
+    range_start = datetime.combine(start_date, time.min)
+    range_end = datetime.combine(end_date + timedelta(days=1), time.min)
+    starts = booked_start_times(service_id, range_start, range_end, slot_length)
+
+    days = []
+    day = start_date
+    while day <= end_date:
+        hours = opening_hours.get(day.weekday())
+        slots = []
+        if hours:
+            slot_start = datetime.combine(day, _parse_clock(hours[0]))
+            closing = datetime.combine(day, _parse_clock(hours[1]))
+            while slot_start + slot_length <= closing:
+                slot_end = slot_start + slot_length
+                if slot_start >= now:
+                    remaining = capacity - count_overlapping(starts, slot_start, slot_end, slot_length)
+                    if remaining > 0:
+                        slots.append({
+                            'start': slot_start.isoformat(timespec='minutes'),
+                            'end': slot_end.isoformat(timespec='minutes'),
+                            'remaining': remaining,
+                        })
+                slot_start = slot_end
+        days.append({'date': day.isoformat(), 'slots': slots})
+        day += timedelta(days=1)
+    return days
+
+
+def is_slot_available(service_id, booking_datetime):
+    """Return True if a booking at ``booking_datetime`` would fit within capacity."""
+    _, slot_length, capacity = _settings()
+    slot_end = booking_datetime + slot_length
+    starts = booked_start_times(service_id, booking_datetime, slot_end, slot_length)
+    return count_overlapping(starts, booking_datetime, slot_end, slot_length) < capacity
+
+
+def is_slot_overbooked(service_id, booking_datetime):
+    """Return True if the slot at ``booking_datetime`` holds more bookings than capacity.
+
+    is_slot_available() is a check-then-insert race: two requests can both
+    see a free slot before either commits. Call this after flushing the new
+    booking, in the same transaction. SQLite runs one write transaction at
+    a time, so a competing booking of the slot is either committed already
+    and counted here, or will count this one when it runs the same check.
+    """
+    _, slot_length, capacity = _settings()
+    slot_end = booking_datetime + slot_length
+    starts = booked_start_times(service_id, booking_datetime, slot_end, slot_length)
+    return count_overlapping(starts, booking_datetime, slot_end, slot_length) > capacity
@@ -0,0 +1,101 @@
+"""Booking statistics for the admin stat cards.
+
+Counts per status are computed with a single grouped aggregate instead of
+walking a materialized list of bookings in Jinja. Results are cached per
+process under the ``booking`` row of the cache_version table, the same
+scheme as the catalog caches (app/utils/catalog_cache.py):
+
+    * a ``before_flush`` session listener bumps the version whenever a
+      booking is created, deleted, or changes status, date or service, so
+      the bump commits or rolls back with the booking write itself
+    * the writing process drops its own entries once that transaction
+      ends, so it sees its change immediately
+    * other processes (``flask serve`` workers, CLI commands, the job
+      worker) re-check the version every CATALOG_CACHE_TTL seconds
+
+Bulk statements that bypass the ORM (app/utils/bulk_io.py) call
+invalidate_booking_stats() before committing and
+clear_booking_stats() after.
+"""
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+from app.db import db
+from app.models import Booking
+from app.utils.catalog_cache import KeyedCatalogCache, bump_version
+
+BOOKING_STATUSES = ('pending', 'confirmed', 'completed', 'cancelled')
+
+VERSION_KEY = 'booking'
+
+_TRACKED_ATTRIBUTES = ('status', 'booking_date', 'service_id')
+
+booking_stats_cache = KeyedCatalogCache(VERSION_KEY, max_entries=256)
+
+
+def get_booking_stats(start=None, end=None, service_id=None):
+    """Return booking counts by status, optionally filtered.
+
+    Args:
+        start (datetime): Only count bookings on or after this date
+        end (datetime): Only count bookings before this date
+        service_id (int): Only count bookings for this service
+
+    Returns:
+        dict: ``total`` plus one key per status in BOOKING_STATUSES
+    """
+    def load():
+        query = db.session.query(Booking.status, func.count(Booking.id))
+        if start is not None:
+            query = query.filter(Booking.booking_date >= start)
+        if end is not None:
+            query = query.filter(Booking.booking_date < end)
+        if service_id is not None:
+            query = query.filter(Booking.service_id == service_id)
+
+        stats = dict.fromkeys(BOOKING_STATUSES, 0)
+        for status, count in query.group_by(Booking.status).all():
+            stats[status or 'pending'] = stats.get(status or 'pending', 0) + count
+        stats['total'] = sum(stats.values())
+        return stats
+
+    return dict(booking_stats_cache.get((start, end, service_id), load))
+
+
+def invalidate_booking_stats():
+    """Bump the shared booking version (call before committing the change)."""
+    booking_stats_cache.invalidate()
+
+
+def clear_booking_stats():
+    """Drop this process's cached statistics (call after committing or rolling back)."""
+    booking_stats_cache.clear()
+
+
+def _changes_stats(session):
+    if any(isinstance(obj, Booking) for obj in session.new) \
+            or any(isinstance(obj, Booking) for obj in session.deleted):
+        return True
+    for obj in session.dirty:
+        if isinstance(obj, Booking):
+            state = inspect(obj)
+            if any(state.attrs[name].history.has_changes() for name in _TRACKED_ATTRIBUTES):
+                return True
+    return False
+
+
+@event.listens_for(Session, 'before_flush')
+def _track_booking_writes(session, flush_context, instances):
+    if _changes_stats(session):
+        bump_version(VERSION_KEY, session=session)
+        session.info['booking_stats_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_soft_rollback')
+def _transaction_ended(session, *args):
+    # Entries cached mid-transaction may hold counts that were rolled back,
+    # or be tagged with a version other sessions couldn't see yet
+    if session.info.pop('booking_stats_changed', False):
+        clear_booking_stats()
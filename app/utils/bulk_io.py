@@ -0,0 +1,531 @@
+"""Streaming bulk import/export of users, services and bookings (CSV or JSONL).
+
+Import reads its input one record at a time and never holds more than one
+chunk in memory:
+
+    1. each record is validated; bad ones are reported with their line
+       number and skipped
+    2. a chunk of valid records is matched against existing rows by its
+       natural key (username, service name, booking id) with one IN query
+    3. new rows go out as one executemany INSERT and existing ones as one
+       executemany UPDATE, and the chunk is committed on its own
+
+So a failure half way through keeps every chunk committed before it, and
+re-running the same file is safe: rows already imported are updated in
+place instead of duplicated.
+
+Export streams rows with ``yield_per`` so memory use does not depend on
+table size.
+
+Bulk statements bypass ORM events, so each entity invalidates the caches
+its rows feed (service catalog, identities, booking stats) itself, and
+bookings apply their analytics rollup deltas in the chunk's transaction.
+"""
+
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy import bindparam, insert, select, update
+
+from app.db import db
+from app.models import Booking, Service, User
+from app.utils.analytics import RollupDeltas, apply_rollup_deltas
+from app.utils.booking_stats import BOOKING_STATUSES, clear_booking_stats, invalidate_booking_stats
+
+FORMATS = ('csv', 'jsonl')
+DEFAULT_BATCH_SIZE = 1000
+
+USER_ROLES = ('customer', 'admin')
+
+
+def detect_format(filename, fmt=None):
+    """Pick 'csv' or 'jsonl' from an explicit format or the file extension."""
+    if fmt:
+        return fmt
+    if filename and filename.lower().endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    return 'csv'
+
+
+def read_records(stream, fmt):
+    """Yield ``(line number, dict)`` for each record in a CSV or JSONL stream.
+
+    Malformed JSON lines are yielded as ``(line number, ValueError)`` so the
+    importer can report them alongside validation errors.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError('expected a JSON object')
+        except ValueError as e:
+            yield line_number, ValueError(f'invalid JSON: {e}')
+            continue
+        yield line_number, record
+
+
+def _to_text(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def write_records(stream, fmt, fieldnames, rows):
+    """Write dict rows to ``stream`` as CSV (with header) or JSONL.
+
+    Returns:
+        int: Number of rows written
+    """
+    count = 0
+    if fmt == 'csv':
+        writer = csv.writer(stream)
+        writer.writerow(fieldnames)
+        for row in rows:
+            writer.writerow(['' if row[name] is None else _to_text(row[name]) for name in fieldnames])
+            count += 1
+    else:
+        for row in rows:
+            stream.write(json.dumps({name: _to_text(row[name]) for name in fieldnames}, ensure_ascii=False))
+            stream.write('\n')
+            count += 1
+    return count
+
+
+# ---- Field parsing helpers -------------------------------------------------
+# Each takes the raw value (string from CSV, any JSON type from JSONL) and
+# returns a clean value or raises ValueError with a user-facing message.
+
+def _blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _text(record, field, max_length=None, required=False):
+    value = record.get(field)
+    if _blank(value):
+        if required:
+            raise ValueError(f'{field} is required')
+        return None
+    value = str(value).strip()
+    if max_length and len(value) > max_length:
+        raise ValueError(f'{field} must be at most {max_length} characters')
+    return value
+
+
+def _number(record, field):
+    value = record.get(field)
+    if _blank(value):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{field} must be a number')
+    if number < 0:
+        raise ValueError(f'{field} must not be negative')
+    return number
+
+
+def _integer(record, field):
+    value = record.get(field)
+    if _blank(value):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{field} must be an integer')
+
+
+def _datetime(record, field, required=False):
+    value = record.get(field)
+    if _blank(value):
+        if required:
+            raise ValueError(f'{field} is required')
+        return None
+    try:
+        return datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        raise ValueError(f'{field} must be an ISO date/time, e.g. 2030-01-31T14:00')
+
+
+def _choice(record, field, choices):
+    value = _text(record, field)
+    if value is None:
+        return None
+    value = value.lower()
+    if value not in choices:
+        raise ValueError(f'{field} must be one of: {", ".join(choices)}')
+    return value
+
+
+def _present(values):
+    """Drop columns left blank, so updates never wipe fields the input omits."""
+    return {column: value for column, value in values.items() if value is not None}
+
+
+# ---- Entities --------------------------------------------------------------
+
+class EntitySpec:
+    """How one model is validated, matched, written and exported in bulk.
+
+    Subclasses define:
+        model: The SQLAlchemy model
+        key_column (str): Natural key used to match existing rows
+        fieldnames (list): Export columns, in order
+        insert_defaults (dict): Column values for new rows missing them
+    """
+
+    model = None
+    key_column = None
+    fieldnames = []
+    insert_defaults = {}
+
+    def parse(self, record):
+        """Validate one input record; return ``{column: value}`` or raise ValueError."""
+        raise NotImplementedError
+
+    def resolve(self, rows):
+        """Resolve references for a chunk in place; return ``{index: error}``."""
+        return {}
+
+    def validate_insert(self, values):
+        """Raise ValueError if ``values`` is not enough to create a new row."""
+
+    def before_write(self, inserts, updates):
+        """Hook run before a chunk's rows are written.
+
+        Args:
+            inserts (list): Column dicts of the new rows
+            updates (list): ``{'_id': id, '_<column>': value}`` dicts of the
+                rows being changed; their old values are still in the table
+        """
+
+    def before_commit(self):
+        """Invalidate shared caches inside the chunk's transaction."""
+
+    def after_commit(self):
+        """Invalidate process-local caches once the chunk is committed."""
+
+    def export_rows(self, batch_size):
+        """Yield export rows as dicts keyed by ``fieldnames``."""
+        raise NotImplementedError
+
+
+class UserSpec(EntitySpec):
+    """Users, matched by username.
+
+    ``password_hash`` carries an existing werkzeug hash (as exported); a
+    plain ``password`` is hashed on import instead, which is deliberately
+    slow and meant for small hand-written files.
+    """
+
+    model = User
+    key_column = 'username'
+    fieldnames = ['username', 'role', 'password_hash', 'created_at']
+    insert_defaults = {'role': 'customer', 'session_version': 0}
+
+    def parse(self, record):
+        values = _present({
+            'username': _text(record, 'username', max_length=80, required=True),
+            'role': _choice(record, 'role', USER_ROLES),
+            'password': _text(record, 'password_hash', max_length=200),
+            'created_at': _datetime(record, 'created_at'),
+        })
+        if 'password' not in values and not _blank(record.get('password')):
+            from app.utils.password_hashing import hash_password
+            values['password'] = hash_password(str(record['password']))
+        return values
+
+    def validate_insert(self, values):
+        if 'password' not in values:
+            raise ValueError('password_hash or password is required for new users')
+
+    def before_write(self, inserts, updates):
+        # A new password signs out the user's other sessions, as it does
+        # when changed in the app
+        passwords = {values['_id']: values['_password'] for values in updates if '_password' in values}
+        if passwords:
+            changed = [user_id for user_id, stored in db.session.execute(
+                select(User.id, User.password).where(User.id.in_(passwords))
+            ) if stored != passwords[user_id]]
+            if changed:
+                db.session.execute(
+                    update(User.__table__).where(User.id.in_(changed))
+                    .values(session_version=User.session_version + 1)
+                )
+
+    def before_commit(self):
+        from app.utils.identity_cache import invalidate_all_users
+        invalidate_all_users()
+
+    def export_rows(self, batch_size):
+        query = select(User.username, User.role, User.password, User.created_at).order_by(User.id)
+        for row in db.session.execute(query, execution_options={'yield_per': batch_size}):
+            yield {'username': row.username, 'role': row.role,
+                   'password_hash': row.password, 'created_at': row.created_at}
+
+
+class ServiceSpec(EntitySpec):
+    """Services, matched by name."""
+
+    model = Service
+    key_column = 'name'
+    fieldnames = ['name', 'description', 'price']
+
+    def parse(self, record):
+        return _present({
+            'name': _text(record, 'name', max_length=100, required=True),
+            'description': _text(record, 'description'),
+            'price': _number(record, 'price'),
+        })
+
+    def before_commit(self):
+        from app.utils.catalog_cache import service_catalog
+        service_catalog.invalidate()
+
+    def export_rows(self, batch_size):
+        query = select(Service.name, Service.description, Service.price).order_by(Service.id)
+        for row in db.session.execute(query, execution_options={'yield_per': batch_size}):
+            yield row._asdict()
+
+
+class BookingSpec(EntitySpec):
+    """Bookings, matched by id when one is given (otherwise always inserted).
+
+    Services and registered customers are referenced by name (``service``,
+    ``username``) so files move between installations whose ids differ.
+    """
+
+    model = Booking
+    key_column = 'id'
+    fieldnames = ['id', 'service', 'username', 'guest_name', 'guest_email', 'guest_phone',
+                  'booking_date', 'status', 'notes', 'created_at']
+    insert_defaults = {'status': 'pending'}
+
+    def parse(self, record):
+        values = _present({
+            'id': _integer(record, 'id'),
+            'guest_name': _text(record, 'guest_name', max_length=100),
+            'guest_email': _text(record, 'guest_email', max_length=120),
+            'guest_phone': _text(record, 'guest_phone', max_length=20),
+            'booking_date': _datetime(record, 'booking_date'),
+            'status': _choice(record, 'status', BOOKING_STATUSES),
+            'notes': _text(record, 'notes'),
+            'created_at': _datetime(record, 'created_at'),
+        })
+        # Names are swapped for ids per chunk in resolve()
+        service = _text(record, 'service', max_length=100)
+        if service is not None:
+            values['service_id'] = service
+        username = _text(record, 'username', max_length=80)
+        if username is not None:
+            values['user_id'] = username
+        return values
+
+    def resolve(self, rows):
+        services = {value['service_id'] for value in rows if 'service_id' in value}
+        usernames = {value['user_id'] for value in rows if 'user_id' in value}
+        service_ids = dict(db.session.execute(
+            select(Service.name, Service.id).where(Service.name.in_(services))
+        ).all()) if services else {}
+        user_ids = dict(db.session.execute(
+            select(User.username, User.id).where(User.username.in_(usernames))
+        ).all()) if usernames else {}
+
+        errors = {}
+        for index, values in enumerate(rows):
+            if 'service_id' in values:
+                name = values['service_id']
+                if name not in service_ids:
+                    errors[index] = f'unknown service "{name}"'
+                    continue
+                values['service_id'] = service_ids[name]
+            if 'user_id' in values:
+                name = values['user_id']
+                if name not in user_ids:
+                    errors[index] = f'unknown user "{name}"'
+                    continue
+                values['user_id'] = user_ids[name]
+        return errors
+
+    def validate_insert(self, values):
+        if 'service_id' not in values:
+            raise ValueError('service is required for new bookings')
+        if 'booking_date' not in values:
+            raise ValueError('booking_date is required for new bookings')
+        if 'user_id' not in values and 'guest_name' not in values:
+            raise ValueError('username or guest_name is required for new bookings')
+
+    def before_write(self, inserts, updates):
+        deltas = RollupDeltas()
+        if inserts:
+            # Set here rather than by the column default, which is one SELECT per row
+            prices = dict(db.session.execute(
+                select(Service.id, Service.price).where(Service.id.in_({values['service_id'] for values in inserts}))
+            ).all())
+            for values in inserts:
+                values['price'] = prices.get(values['service_id'])
+                deltas.add(values['booking_date'], values['service_id'], values['status'], +1, values['price'])
+        tracked = ('_booking_date', '_service_id', '_status')
+        changed = {values['_id']: values for values in updates if any(name in values for name in tracked)}
+        if changed:
+            for booking_id, booking_date, service_id, status, price in db.session.execute(
+                select(Booking.id, Booking.booking_date, Booking.service_id, Booking.status, Booking.price)
+                .where(Booking.id.in_(changed))
+            ):
+                values = changed[booking_id]
+                deltas.add(booking_date, service_id, status, -1, price)
+                deltas.add(values.get('_booking_date', booking_date), values.get('_service_id', service_id),
+                           values.get('_status', status), +1, price)
+        apply_rollup_deltas(db.session.connection(), deltas)
+
+    def before_commit(self):
+        invalidate_booking_stats()
+
+    def after_commit(self):
+        clear_booking_stats()
+
+    def export_rows(self, batch_size):
+        query = (
+            select(Booking.id, Service.name.label('service'), User.username,
+                   Booking.guest_name, Booking.guest_email, Booking.guest_phone,
+                   Booking.booking_date, Booking.status, Booking.notes, Booking.created_at)
+            .join(Service, Booking.service_id == Service.id)
+            .outerjoin(User, Booking.user_id == User.id)
+            .order_by(Booking.id)
+        )
+        for row in db.session.execute(query, execution_options={'yield_per': batch_size}):
+            yield row._asdict()
+
+
+ENTITIES = {
+    'user': UserSpec(),
+    'service': ServiceSpec(),
+    'booking': BookingSpec(),
+}
+
+
+# ---- Import / export drivers -----------------------------------------------
+
+class ImportResult:
+    """Outcome of an import: row counts plus ``(line, message)`` errors."""
+
+    def __init__(self):
+        self.read = 0
+        self.inserted = 0
+        self.updated = 0
+        self.errors = []
+
+    @property
+    def skipped(self):
+        return len(self.errors)
+
+
+def _grouped_by_columns(rows):
+    """Split rows into groups with identical key sets (one executemany each)."""
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    return groups.values()
+
+
+def _write_chunk(spec, chunk, result):
+    """Validate references, upsert and commit one chunk of parsed rows."""
+    lines = [line for line, _ in chunk]
+    rows = [values for _, values in chunk]
+    for index, message in spec.resolve(rows).items():
+        result.errors.append((lines[index], message))
+        rows[index] = None
+
+    table = spec.model.__table__
+    key_column = table.c[spec.key_column]
+    keys = {row[spec.key_column] for row in rows if row is not None and row.get(spec.key_column) is not None}
+    existing = dict(db.session.execute(
+        select(key_column, table.c.id).where(key_column.in_(keys))
+    ).all()) if keys else {}
+
+    # Last occurrence of a key in the chunk wins
+    inserts, updates = {}, {}
+    for line, row in zip(lines, rows):
+        if row is None:
+            continue
+        key = row.get(spec.key_column)
+        if key in existing:
+            row = dict(row)
+            row.pop('id', None)
+            updates[key] = {'_id': existing[key], **{f'_{column}': value for column, value in row.items()}}
+            continue
+        try:
+            spec.validate_insert(row)
+        except ValueError as e:
+            result.errors.append((line, str(e)))
+            continue
+        inserts[key if key is not None else ('line', line)] = {**spec.insert_defaults, **row}
+
+    spec.before_write(list(inserts.values()), list(updates.values()))
+    for group in _grouped_by_columns(inserts.values()):
+        db.session.execute(insert(table), group)
+    for group in _grouped_by_columns(updates.values()):
+        columns = [name[1:] for name in group[0] if name != '_id']
+        if columns:
+            statement = (
+                update(table)
+                .where(table.c.id == bindparam('_id'))
+                .values({column: bindparam(f'_{column}') for column in columns})
+            )
+            db.session.connection().execute(statement, group)
+
+    spec.before_commit()
+    db.session.commit()
+    spec.after_commit()
+    result.inserted += len(inserts)
+    result.updated += len(updates)
+
+
+def import_records(entity, records, batch_size=DEFAULT_BATCH_SIZE):
+    """Import ``(line, record)`` pairs (see read_records) into ``entity``.
+
+    Args:
+        entity (str): One of ENTITIES
+        records: Iterable of ``(line number, dict or ValueError)``
+        batch_size (int): Records per executemany batch and transaction
+
+    Returns:
+        ImportResult
+    """
+    spec = ENTITIES[entity]
+    result = ImportResult()
+    records = iter(records)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            break
+        chunk = []
+        for line, record in batch:
+            result.read += 1
+            if isinstance(record, Exception):
+                result.errors.append((line, str(record)))
+                continue
+            try:
+                chunk.append((line, spec.parse(record)))
+            except ValueError as e:
+                result.errors.append((line, str(e)))
+        if chunk:
+            _write_chunk(spec, chunk, result)
+    return result
+
+
+def export_records(entity, stream, fmt, batch_size=DEFAULT_BATCH_SIZE):
+    """Stream every row of ``entity`` to ``stream``; returns the row count."""
+    spec = ENTITIES[entity]
+    return write_records(stream, fmt, spec.fieldnames, spec.export_rows(batch_size))
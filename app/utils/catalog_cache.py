@@ -0,0 +1,220 @@
+"""Invalidation-aware in-process caches for rarely changing catalogs.
+
+Each cache keeps an immutable snapshot of its rows in process memory,
+tagged with the version from its ``cache_version`` row. Within the TTL the
+snapshot is served without touching the database. Once the TTL lapses, a
+single primary-key lookup of the version row decides whether the snapshot
+is still good or must be reloaded.
+
+Writers call ``invalidate()`` before committing. That bumps the version row
+inside the same transaction and drops the local snapshot, so:
+    * the writing process sees the change immediately
+    * other worker processes see it within CATALOG_CACHE_TTL seconds
+
+Catalogs too large to snapshot whole (products) use KeyedCatalogCache
+instead, which caches the result of each distinct query (one filtered page,
+the category list) under the same version scheme.
+
+TTL is read from app.config['CATALOG_CACHE_TTL'] (seconds).
+"""
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+
+from flask import current_app
+
+from app.db import db
+from app.models import CacheVersion, Service
+
+ServiceRecord = namedtuple('ServiceRecord', ['id', 'name', 'description', 'price'])
+ProductRecord = namedtuple('ProductRecord', ['id', 'name', 'description', 'category', 'price', 'image'])
+
+
+def get_version(name):
+    """Return ``(version, updated_at)`` for a cached dataset.
+
+    A dataset that has never been bumped reports version 0 and no timestamp.
+    """
+    row = db.session.query(CacheVersion.version, CacheVersion.updated_at).filter_by(name=name).first()
+    return (row.version, row.updated_at) if row else (0, None)
+
+
+def bump_version(name, session=None):
+    """Increment a dataset's version inside the current transaction.
+
+    Args:
+        name (str): Key of the dataset's cache_version row
+        session (Session): Session whose transaction to use (db.session by default)
+    """
+    session = session or db.session
+    updated = (
+        session.query(CacheVersion).filter_by(name=name)
+        .update({'version': CacheVersion.version + 1, 'updated_at': datetime.utcnow()},
+                synchronize_session=False)
+    )
+    if not updated:
+        session.add(CacheVersion(name=name, version=1, updated_at=datetime.utcnow()))
+
+
+class CatalogCache:
+    """TTL + version-stamped snapshot cache for one catalog.
+
+    Args:
+        name (str): Key of the catalog's row in the cache_version table
+        loader (callable): Returns the full list of records to cache
+    """
+
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self._lock = threading.Lock()
+        self._items = None
+        self._version = None
+        self._updated_at = None
+        self._checked_at = 0.0
+
+    def get(self):
+        """Return the cached records, reloading them if stale."""
+        ttl = current_app.config.get('CATALOG_CACHE_TTL', 30)
+        now = time.monotonic()
+        with self._lock:
+            if self._items is not None and now - self._checked_at < ttl:
+                return self._items
+
+        version, updated_at = get_version(self.name)
+        with self._lock:
+            if self._items is not None and version == self._version:
+                self._checked_at = now
+                return self._items
+
+        items = tuple(self.loader())
+        with self._lock:
+            self._items, self._version, self._updated_at, self._checked_at = items, version, updated_at, now
+        return items
+
+    @property
+    def version(self):
+        """Version of the current snapshot, loading it first if needed."""
+        self.get()
+        return self._version
+
+    @property
+    def updated_at(self):
+        """When the current snapshot's version was last bumped (None if never)."""
+        self.get()
+        return self._updated_at
+
+    def invalidate(self):
+        """Bump the shared version (in the current transaction) and drop the snapshot."""
+        bump_version(self.name)
+        self.clear()
+
+    def clear(self):
+        """Drop this process's snapshot without touching the shared version."""
+        with self._lock:
+            self._items = None
+            self._version = None
+            self._updated_at = None
+            self._checked_at = 0.0
+
+
+class KeyedCatalogCache:
+    """TTL + version-stamped LRU of query results over one catalog.
+
+    All entries share the catalog's version: once the TTL lapses, one
+    version lookup decides whether every entry is still good.
+
+    Args:
+        name (str): Key of the catalog's row in the cache_version table
+        max_entries (int): Most query results kept per process
+
+    Usage:
+        page = product_catalog.get(('page', category, sort, cursor), load_page)
+    """
+
+    def __init__(self, name, max_entries=512):
+        self.name = name
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._version = None
+        self._updated_at = None
+        self._checked_at = 0.0
+
+    def _sync(self):
+        """Drop every entry if the shared version moved since the last check."""
+        ttl = current_app.config.get('CATALOG_CACHE_TTL', 30)
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < ttl:
+            return
+        version, updated_at = get_version(self.name)
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version, self._updated_at = version, updated_at
+            self._checked_at = now
+
+    def get(self, key, loader):
+        """Return the cached result for ``key``, calling ``loader()`` on a miss.
+
+        ``loader`` must return plain, immutable data (tuples, namedtuples),
+        never ORM instances bound to the current session.
+        """
+        self._sync()
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        value = loader()
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    @property
+    def version(self):
+        self._sync()
+        return self._version
+
+    @property
+    def updated_at(self):
+        self._sync()
+        return self._updated_at
+
+    def invalidate(self):
+        """Bump the shared version (in the current transaction) and drop all entries."""
+        bump_version(self.name)
+        self.clear()
+
+    def clear(self):
+        """Drop this process's entries without touching the shared version."""
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+            self._updated_at = None
+            self._checked_at = 0.0
+
+
+def _load_services():
+    rows = db.session.query(Service.id, Service.name, Service.description, Service.price)
+    return [ServiceRecord(*row) for row in rows.order_by(Service.id)]
+
+
+service_catalog = CatalogCache('service', _load_services)
+
+
+def service_catalog_version():
+    """Return ``(version, updated_at)`` of the service catalog snapshot."""
+    return service_catalog.version, service_catalog.updated_at
+
+
+product_catalog = KeyedCatalogCache('product')
+
+
+def product_catalog_version():
+    """Return ``(version, updated_at)`` of the product catalog."""
+    return product_catalog.version, product_catalog.updated_at
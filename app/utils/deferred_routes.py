@@ -0,0 +1,75 @@
+"""Deferred blueprint registration.
+
+Importing the route modules, and everything they import, is wasted work for
+CLI commands like ``flask user list`` that never route a request or build a
+URL. With LAZY_BLUEPRINTS on (the default), create_app hands blueprint
+registration to the app's URL map, which runs it the first time the map is
+used:
+
+    * routing a request (test client, dev server, ``flask serve`` workers)
+    * building a URL with url_for outside a request (needs SERVER_NAME)
+    * listing the rules (``flask routes``)
+
+``flask serve`` calls load_routes() in the master before forking, so
+workers start with the routes already imported.
+"""
+
+import threading
+
+from flask import Flask
+from werkzeug.routing import Map
+
+
+class DeferredRoutesMap(Map):
+    """URL map that runs a deferred registration function on first use."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._loader = None
+        self._loaded = True
+        self._lock = threading.RLock()
+
+    def defer(self, loader):
+        """Call ``loader()`` (which adds the rules) before the map is first used."""
+        self._loader = loader
+        self._loaded = False
+
+    def load(self):
+        """Run the deferred registration now if it hasn't run yet."""
+        if self._loaded:
+            return
+        with self._lock:
+            # _loader is None here when called re-entrantly from the loader
+            if self._loaded or self._loader is None:
+                return
+            loader, self._loader = self._loader, None
+            try:
+                loader()
+            except BaseException:
+                self._loader = loader  # Fail again on the next use, not silently 404
+                raise
+            self._loaded = True
+
+    def bind(self, *args, **kwargs):
+        self.load()
+        return super().bind(*args, **kwargs)
+
+    def bind_to_environ(self, *args, **kwargs):
+        self.load()
+        return super().bind_to_environ(*args, **kwargs)
+
+    def iter_rules(self, *args, **kwargs):
+        self.load()
+        return super().iter_rules(*args, **kwargs)
+
+
+class DeferredRoutesFlask(Flask):
+    """Flask app whose ``url_map`` supports ``defer()``."""
+
+    url_map_class = DeferredRoutesMap
+
+
+def load_routes(app):
+    """Register any deferred blueprints on ``app`` now."""
+    if isinstance(app.url_map, DeferredRoutesMap):
+        app.url_map.load()
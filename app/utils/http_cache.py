@@ -0,0 +1,111 @@
+"""Conditional GET support (ETag / Last-Modified / 304) for public pages.
+
+Anonymous visitors all see the same HTML for the public pages, so the ETag
+is derived up front from what the page depends on. That is a site stamp
+(newest template/stylesheet mtime, which changes on deploy) plus an optional
+data version such as the service catalog's version counter. A repeat visit
+or crawler with a matching If-None-Match / If-Modified-Since gets a 304
+without the view running or the template being rendered.
+
+Logged-in users and requests with pending flash messages always get a full
+response, since those pages contain per-user markup.
+
+Configuration (app.config):
+    PUBLIC_PAGE_MAX_AGE: Seconds anonymous responses may be reused without
+        revalidation (0 means always revalidate)
+"""
+
+import hashlib
+import os
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import current_app, make_response, request, session
+from flask_login import current_user
+
+_site_stamp = {}
+
+
+def site_stamp():
+    """Return the newest mtime (UTC datetime) of the app's templates and static files.
+
+    Computed once per process; a deploy or template edit restarts workers,
+    which changes the stamp and therefore every ETag.
+    """
+    stamp = _site_stamp.get(current_app.root_path)
+    if stamp is None:
+        newest = 0.0
+        for folder in (current_app.template_folder, current_app.static_folder):
+            folder = os.path.join(current_app.root_path, folder)
+            for dirpath, _, filenames in os.walk(folder):
+                for filename in filenames:
+                    newest = max(newest, os.path.getmtime(os.path.join(dirpath, filename)))
+        stamp = datetime.fromtimestamp(int(newest), tz=timezone.utc)
+        _site_stamp[current_app.root_path] = stamp
+    return stamp
+
+
+def _is_cacheable_request():
+    return (
+        request.method in ('GET', 'HEAD')
+        and not current_user.is_authenticated
+        and not session.get('_flashes')
+    )
+
+
+def conditional_get(data_version=None):
+    """Decorator adding ETag/Last-Modified validation to a public GET view.
+
+    Args:
+        data_version (callable): Optional function returning
+            ``(version, updated_at)`` for the data the page renders, e.g. the
+            service catalog's version counter and its last bump time
+
+    Usage:
+        @services_bp.route('/services')
+        @conditional_get(data_version=service_catalog_version)
+        def services_list():
+            ...
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped_view(*args, **kwargs):
+            if not _is_cacheable_request():
+                return view(*args, **kwargs)
+
+            last_modified = site_stamp()
+            version = ''
+            if data_version is not None:
+                version, updated_at = data_version()
+                if updated_at is not None:
+                    updated_at = updated_at.replace(tzinfo=timezone.utc, microsecond=0)
+                    last_modified = max(last_modified, updated_at)
+
+            etag_source = f'{request.full_path}|{last_modified.timestamp()}|{version}'
+            etag = hashlib.sha1(etag_source.encode('utf-8')).hexdigest()[:20]
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            else:
+                not_modified = (
+                    request.if_modified_since is not None
+                    and request.if_modified_since >= last_modified
+                )
+
+            if not_modified:
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            response.cache_control.public = True
+            response.cache_control.max_age = current_app.config.get('PUBLIC_PAGE_MAX_AGE', 0)
+            response.vary.add('Cookie')
+            return response
+
+        return wrapped_view
+
+    return decorator
@@ -0,0 +1,173 @@
+"""Per-process cache of logged-in user identities for Flask-Login.
+
+Without it, every authenticated request pays a users-table lookup in the
+user_loader. Instead, this module keeps slim CachedUser records (id, username,
+role, session version, join date) in a bounded LRU with a TTL.
+
+Staleness is bounded in two ways:
+    * Anything that changes a user's role, password or existence bumps the
+      shared 'user' row in cache_version. Each process re-reads that row at
+      most every USER_CACHE_CHECK_INTERVAL seconds and drops its whole cache
+      when it moves, so CLI edits reach web workers quickly.
+    * Each user has a session_version stamp embedded in their session id
+      (see User.get_id). Changing a password bumps it, which invalidates
+      every other session of that user on their next request.
+
+Configuration (app.config):
+    USER_CACHE_SIZE: Maximum cached identities per process
+    USER_CACHE_TTL: Seconds an identity may be served before reloading
+    USER_CACHE_CHECK_INTERVAL: Seconds between shared version checks
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from flask_login import UserMixin
+
+from app.db import db
+from app.models import User
+from app.utils.catalog_cache import bump_version, get_version
+
+VERSION_KEY = 'user'
+
+
+class CachedUser(UserMixin):
+    """Slim, request-independent stand-in for User used as current_user.
+
+    Attributes not held in the record (e.g. ``set_password``) are delegated
+    to the full User row, which is loaded lazily on first such access within
+    the request.
+    """
+
+    def __init__(self, id, username, role, session_version, created_at):
+        self.id = id
+        self.username = username
+        self.role = role
+        self.session_version = session_version
+        self.created_at = created_at
+        self._model = None
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.username, user.role, user.session_version or 0, user.created_at)
+
+    def get_id(self):
+        return f'{self.id}:{self.session_version}'
+
+    @property
+    def model(self):
+        """The full User row, loaded from the current session on demand."""
+        if self._model is None:
+            self._model = db.session.get(User, self.id)
+        return self._model
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def copy(self):
+        """Fresh per-request copy, so a loaded model never leaks across requests."""
+        return CachedUser(self.id, self.username, self.role, self.session_version, self.created_at)
+
+    def __repr__(self):
+        return f'<CachedUser {self.username}>'
+
+
+class IdentityCache:
+    """Bounded LRU + TTL cache of CachedUser records keyed by user id."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = 0.0
+
+    def _sync_version(self, now):
+        """Drop everything if the shared user version moved since the last check."""
+        interval = current_app.config.get('USER_CACHE_CHECK_INTERVAL', 5)
+        if now - self._checked_at < interval:
+            return
+        version, _ = get_version(VERSION_KEY)
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            self._checked_at = now
+
+    def get(self, user_id, refresh=False):
+        """Return a CachedUser for ``user_id`` (None if no such user).
+
+        ``refresh=True`` bypasses the cached record and reloads it.
+        """
+        now = time.monotonic()
+        self._sync_version(now)
+        ttl = current_app.config.get('USER_CACHE_TTL', 300)
+        with self._lock:
+            entry = None if refresh else self._entries.get(user_id)
+            if entry is not None:
+                record, stored_at = entry
+                if now - stored_at < ttl:
+                    self._entries.move_to_end(user_id)
+                    return record.copy()
+                del self._entries[user_id]
+
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        record = CachedUser.from_user(user)
+        with self._lock:
+            self._entries[user_id] = (record, now)
+            while len(self._entries) > current_app.config.get('USER_CACHE_SIZE', 5000):
+                self._entries.popitem(last=False)
+        return record.copy()
+
+    def discard(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+            self._checked_at = 0.0
+
+
+identity_cache = IdentityCache()
+
+
+def load_cached_user(session_id):
+    """Flask-Login user_loader: resolve ``'<id>:<session_version>'`` to a CachedUser.
+
+    Returns None (treated as logged out) for unknown users or sessions issued
+    before the user's last password change. Plain ``'<id>'`` values from
+    sessions created before session versions existed count as version 0, so
+    they stay valid only until the user's first password change.
+    """
+    user_id, _, stamp = str(session_id).partition(':')
+    try:
+        user_id = int(user_id)
+        stamp = int(stamp) if stamp else 0
+    except ValueError:
+        return None
+    user = identity_cache.get(user_id)
+    if user is not None and stamp != user.session_version:
+        # Our record may predate a password change made in another process
+        user = identity_cache.get(user_id, refresh=True)
+        if user is not None and stamp != user.session_version:
+            return None
+    return user
+
+
+def invalidate_user(user_id):
+    """Mark a user's identity as changed (call before committing the change)."""
+    bump_version(VERSION_KEY)
+    identity_cache.discard(user_id)
+
+
+def invalidate_all_users():
+    """Mark every user's identity as changed, e.g. after a bulk import."""
+    bump_version(VERSION_KEY)
+    identity_cache.clear()
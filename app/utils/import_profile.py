@@ -0,0 +1,67 @@
+"""Import-time profiling for app startup (``flask import-profile``).
+
+Runs a fresh interpreter with ``python -X importtime`` (imports already
+cached in the current process would otherwise cost nothing) and
+summarizes the report it writes to stderr.
+"""
+
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+CREATE_APP_SNIPPET = 'from app import create_app; create_app()'
+
+
+def run_importtime(args, env=None, cwd=None):
+    """Run ``python -X importtime *args``.
+
+    Returns:
+        tuple: (entries from parse_importtime, wall time in seconds)
+    """
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', *args], env=env, cwd=cwd,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    return parse_importtime(result.stderr), time.perf_counter() - started
+
+
+def parse_importtime(text):
+    """Parse ``-X importtime`` output.
+
+    Returns:
+        list[dict]: ``module``, ``self_us``, ``cumulative_us`` and ``depth``
+        (0 for modules imported directly by the profiled code)
+    """
+    entries = []
+    for line in text.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            continue  # Header line, or another program's stderr
+        module = name.strip()
+        entries.append({
+            'module': module,
+            'self_us': self_us,
+            'cumulative_us': cumulative_us,
+            'depth': (len(name) - len(name.lstrip()) - 1) // 2,
+        })
+    return entries
+
+
+def total_import_us(entries):
+    """Time spent importing, in microseconds (sum of the top-level imports)."""
+    return sum(entry['cumulative_us'] for entry in entries if entry['depth'] == 0)
+
+
+def by_package(entries):
+    """Self time per top-level package, largest first: [(package, microseconds, modules)]."""
+    totals, counts = defaultdict(int), defaultdict(int)
+    for entry in entries:
+        package = entry['module'].split('.', 1)[0]
+        totals[package] += entry['self_us']
+        counts[package] += 1
+    return sorted(((package, totals[package], counts[package]) for package in totals),
+                  key=lambda row: row[1], reverse=True)
@@ -0,0 +1,249 @@
+"""Durable background job queue stored in the application database.
+
+Slow side effects (emails, notifications) are queued instead of run on the
+request thread:
+
+    enqueue('booking_confirmation', {'booking_id': booking.id})
+    db.session.commit()
+
+enqueue() only adds a Job row to the current session, so the job is
+committed in the same transaction as the data it refers to: a booking that
+fails to save never sends a confirmation, and a saved one always queues it.
+
+``flask worker run`` executes queued jobs with JOB_WORKER_CONCURRENCY
+threads. Each claim is a single ``UPDATE ... RETURNING`` statement, so two
+workers (threads or processes) can never pick up the same job. A failing
+job is retried with exponential backoff (JOB_RETRY_BASE_SECONDS doubling up
+to JOB_RETRY_MAX_SECONDS) until it has run ``max_attempts`` times, then it
+is dead-lettered: kept with status ``dead`` and its last error until an
+admin retries it with ``flask worker retry``. Jobs left ``running`` by a
+worker that died are requeued after JOB_LOCK_TIMEOUT seconds. Finished
+jobs are deleted.
+
+Handlers are registered by kind with the job_handler decorator and receive
+the decoded payload; see app/utils/notifications.py.
+"""
+
+import json
+import os
+import random
+import signal
+import socket
+import threading
+import traceback
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, select, update
+
+from app.db import db
+from app.models import Job
+
+_handlers = {}
+
+
+def job_handler(kind):
+    """Register the decorated function as the handler for jobs of ``kind``.
+
+    Usage:
+        @job_handler('booking_confirmation')
+        def send_booking_confirmation(payload):
+            ...
+    """
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def enqueue(kind, payload=None, delay=0, max_attempts=None):
+    """Add a job to the current session; it is queued when the session commits.
+
+    Args:
+        kind (str): Registered handler name
+        payload (dict): JSON-serializable handler arguments
+        delay (float): Seconds to wait before the job may run
+        max_attempts (int): Runs before the job is dead-lettered
+            (default JOB_MAX_ATTEMPTS)
+
+    Returns:
+        Job: The pending job
+    """
+    job = Job(
+        kind=kind,
+        payload=json.dumps(payload or {}),
+        run_at=datetime.utcnow() + timedelta(seconds=delay),
+        max_attempts=max_attempts or current_app.config['JOB_MAX_ATTEMPTS'],
+    )
+    db.session.add(job)
+    return job
+
+
+def claim_job(worker_id):
+    """Atomically mark the oldest due job as running and return it (or None)."""
+    now = datetime.utcnow()
+    table = Job.__table__
+    due = (
+        select(table.c.id)
+        .where(table.c.status == 'queued', table.c.run_at <= now)
+        .order_by(table.c.run_at, table.c.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    row = db.session.execute(
+        update(table)
+        .where(table.c.id == due, table.c.status == 'queued')
+        .values(status='running', locked_by=worker_id, locked_at=now, attempts=table.c.attempts + 1)
+        .returning(table.c.id, table.c.kind, table.c.payload, table.c.attempts, table.c.max_attempts)
+    ).first()
+    db.session.commit()
+    return row
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next run of a job that has failed ``attempts`` times."""
+    config = current_app.config
+    delay = min(config['JOB_RETRY_BASE_SECONDS'] * 2 ** (attempts - 1), config['JOB_RETRY_MAX_SECONDS'])
+    # Jitter so jobs that failed together don't all retry together
+    return delay * random.uniform(0.8, 1.2)
+
+
+def run_job(job):
+    """Run a claimed job and record the outcome.
+
+    Returns:
+        str: ``done``, ``retry`` or ``dead``
+    """
+    table = Job.__table__
+    try:
+        handler = _handlers.get(job.kind)
+        if handler is None:
+            raise LookupError(f'no handler registered for job kind "{job.kind}"')
+        handler(json.loads(job.payload))
+    except Exception:
+        db.session.rollback()
+        error = traceback.format_exc(limit=5)
+        if job.attempts >= job.max_attempts:
+            values = {'status': 'dead', 'last_error': error}
+            outcome = 'dead'
+        else:
+            values = {'status': 'queued', 'last_error': error, 'locked_by': None, 'locked_at': None,
+                      'run_at': datetime.utcnow() + timedelta(seconds=retry_delay(job.attempts))}
+            outcome = 'retry'
+        db.session.execute(update(table).where(table.c.id == job.id).values(**values))
+        db.session.commit()
+        current_app.logger.warning('Job %s (%s) failed, attempt %s/%s: %s', job.id, job.kind,
+                                   job.attempts, job.max_attempts, error.strip().splitlines()[-1])
+        return outcome
+
+    db.session.execute(delete(table).where(table.c.id == job.id))
+    db.session.commit()
+    return 'done'
+
+
+def requeue_stale_jobs(timeout):
+    """Put jobs that have been ``running`` for over ``timeout`` seconds back in the queue.
+
+    Returns:
+        int: Number of jobs requeued
+    """
+    table = Job.__table__
+    result = db.session.execute(
+        update(table)
+        .where(table.c.status == 'running', table.c.locked_at < datetime.utcnow() - timedelta(seconds=timeout))
+        .values(status='queued', locked_by=None, locked_at=None, run_at=datetime.utcnow())
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def retry_dead_jobs(job_ids=None):
+    """Requeue dead-lettered jobs (all of them, or just ``job_ids``) with fresh attempts.
+
+    Returns:
+        int: Number of jobs requeued
+    """
+    table = Job.__table__
+    statement = (
+        update(table)
+        .where(table.c.status == 'dead')
+        .values(status='queued', attempts=0, locked_by=None, locked_at=None, run_at=datetime.utcnow())
+    )
+    if job_ids:
+        statement = statement.where(table.c.id.in_(job_ids))
+    result = db.session.execute(statement)
+    db.session.commit()
+    return result.rowcount
+
+
+class Worker:
+    """Runs queued jobs on ``concurrency`` threads until stopped.
+
+    Each thread has its own app context, and so its own database session.
+    SIGINT/SIGTERM stop the worker once the jobs in progress have finished.
+    A thread that hits an unexpected error (e.g. the database is locked)
+    logs it and retries with exponential backoff instead of exiting.
+    """
+
+    ERROR_BACKOFF_BASE = 1.0  # Seconds after the first failure, doubling...
+    ERROR_BACKOFF_MAX = 30.0  # ...up to this
+
+    def __init__(self, app, concurrency=1, poll_interval=1.0, burst=False):
+        self.app = app
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.burst = burst
+        self.name = f'{socket.gethostname()}:{os.getpid()}'
+        self.stats = {'done': 0, 'retry': 0, 'dead': 0}
+        self._stats_lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def stop(self, *args):
+        self._stopping.set()
+
+    def run(self):
+        """Process jobs until stopped (or, in burst mode, until none are due)."""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.stop)
+            signal.signal(signal.SIGTERM, self.stop)
+        threads = [
+            threading.Thread(target=self._work, args=(f'{self.name}:{index}',), name=f'job-worker-{index}')
+            for index in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        # Join with a timeout so the main thread stays responsive to signals
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=0.5)
+        return self.stats
+
+    def _work(self, worker_id):
+        with self.app.app_context():
+            lock_timeout = current_app.config['JOB_LOCK_TIMEOUT']
+            next_stale_check = datetime.min
+            failures = 0
+            while not self._stopping.is_set():
+                try:
+                    if datetime.utcnow() >= next_stale_check:
+                        requeue_stale_jobs(lock_timeout)
+                        next_stale_check = datetime.utcnow() + timedelta(seconds=lock_timeout / 2)
+                    job = claim_job(worker_id)
+                    if job is None:
+                        if self.burst:
+                            break
+                        self._stopping.wait(self.poll_interval)
+                        continue
+                    outcome = run_job(job)
+                    with self._stats_lock:
+                        self.stats[outcome] += 1
+                    failures = 0
+                except Exception:
+                    # E.g. "database is locked" while web workers write: keep
+                    # this thread alive and try again after a pause. A job
+                    # claimed before the error is requeued after JOB_LOCK_TIMEOUT.
+                    failures += 1
+                    current_app.logger.exception('Job worker %s failed (%s in a row)', worker_id, failures)
+                    db.session.rollback()
+                    self._stopping.wait(min(self.ERROR_BACKOFF_BASE * 2 ** (failures - 1), self.ERROR_BACKOFF_MAX))
+            db.session.remove()
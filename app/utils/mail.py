@@ -0,0 +1,52 @@
+"""Outgoing email over SMTP.
+
+Configured with MAIL_SERVER, MAIL_PORT, MAIL_USE_TLS (STARTTLS),
+MAIL_USE_SSL, MAIL_USERNAME, MAIL_PASSWORD, MAIL_DEFAULT_SENDER and
+MAIL_TIMEOUT. With no MAIL_SERVER, messages are written to the app log
+instead of being sent, which is convenient in development.
+
+Sending is slow and can fail, so call send_email() from background jobs
+(app/utils/notifications.py), never from a request handler.
+"""
+
+import smtplib
+from email.message import EmailMessage
+
+from flask import current_app
+
+
+def build_message(to, subject, body, reply_to=None, sender=None):
+    """Build a plain-text EmailMessage."""
+    message = EmailMessage()
+    message['From'] = sender or current_app.config['MAIL_DEFAULT_SENDER']
+    message['To'] = to
+    message['Subject'] = subject
+    if reply_to:
+        message['Reply-To'] = reply_to
+    message.set_content(body)
+    return message
+
+
+def send_email(to, subject, body, reply_to=None):
+    """Send a plain-text email; raises smtplib/socket errors so jobs can retry.
+
+    Args:
+        to (str): Recipient address
+        subject (str): Subject line
+        body (str): Plain-text body
+        reply_to (str): Optional Reply-To address
+    """
+    config = current_app.config
+    message = build_message(to, subject, body, reply_to=reply_to)
+
+    if not config['MAIL_SERVER']:
+        current_app.logger.info('MAIL_SERVER is not set; not sending:\n%s', message)
+        return
+
+    smtp_class = smtplib.SMTP_SSL if config['MAIL_USE_SSL'] else smtplib.SMTP
+    with smtp_class(config['MAIL_SERVER'], config['MAIL_PORT'], timeout=config['MAIL_TIMEOUT']) as smtp:
+        if config['MAIL_USE_TLS']:
+            smtp.starttls()
+        if config['MAIL_USERNAME']:
+            smtp.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
+        smtp.send_message(message)
@@ -0,0 +1,432 @@
+"""Process-shared application metrics in the Prometheus text format.
+
+Metrics are declared once at import time and updated from anywhere:
+
+    BOOKINGS_CREATED = Counter('bookings_created_total', 'Bookings created.', ['customer'])
+    BOOKINGS_CREATED.inc('guest')
+
+Each process keeps its values in its own memory-mapped file under
+METRICS_DIR (``metrics_<pid>.db``), so an update is a dict lookup and an
+8-byte write into shared memory: no locks across processes, no syscalls.
+The /metrics endpoint reads every process's file and adds the values up,
+so the numbers are correct however many worker processes serve requests.
+Files left behind by processes that have exited are folded into
+``metrics_archive.db`` at scrape time, keeping counters monotonic while the
+number of files stays bounded.
+
+Only counters and histograms are supported: both are sums, which is what
+makes adding up per-process files correct.
+
+File layout: an 8-byte header holding the number of bytes used, then
+entries of ``<uint32 key length><key, padded to 8 bytes><float64 value>``.
+Entries are only ever appended, and the header is updated after the entry
+is complete, so readers never see a partial entry.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left
+from functools import lru_cache
+
+try:
+    import fcntl
+except ImportError:  # Windows: no archiving of dead processes' files
+    fcntl = None
+
+_HEADER = struct.Struct('q')
+_LENGTH = struct.Struct('I')
+_VALUE = struct.Struct('d')
+_INITIAL_FILE_SIZE = 64 * 1024
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _padded(length):
+    return length + (-(_LENGTH.size + length) % 8)
+
+
+def _read_entries(data):
+    """Yield ``(key, value, value offset)`` for every entry in a metrics file's bytes."""
+    used = _HEADER.unpack_from(data, 0)[0] if len(data) >= _HEADER.size else 0
+    position = _HEADER.size
+    while position < used:
+        length = _LENGTH.unpack_from(data, position)[0]
+        key_start = position + _LENGTH.size
+        key = bytes(data[key_start:key_start + length]).decode('utf-8')
+        value_offset = key_start + _padded(length)
+        yield key, _VALUE.unpack_from(data, value_offset)[0], value_offset
+        position = value_offset + _VALUE.size
+
+
+class MmapValues:
+    """One process's metric values, stored in a memory-mapped file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'a+b')
+        size = os.fstat(self._file.fileno()).st_size
+        if size < _INITIAL_FILE_SIZE:
+            self._file.truncate(_INITIAL_FILE_SIZE)
+            size = _INITIAL_FILE_SIZE
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._offsets = {key: offset for key, _, offset in _read_entries(self._map)}
+        self._used = max(_HEADER.unpack_from(self._map, 0)[0], _HEADER.size)
+        self._lock = threading.Lock()
+
+    def _add_entry(self, key):
+        encoded = key.encode('utf-8')
+        entry_size = _LENGTH.size + _padded(len(encoded)) + _VALUE.size
+        if self._used + entry_size > len(self._map):
+            size = len(self._map)
+            while self._used + entry_size > size:
+                size *= 2
+            self._map.close()
+            self._file.truncate(size)
+            self._map = mmap.mmap(self._file.fileno(), size)
+        _LENGTH.pack_into(self._map, self._used, len(encoded))
+        self._map[self._used + _LENGTH.size:self._used + _LENGTH.size + len(encoded)] = encoded
+        offset = self._used + _LENGTH.size + _padded(len(encoded))
+        _VALUE.pack_into(self._map, offset, 0.0)
+        self._used += entry_size
+        _HEADER.pack_into(self._map, 0, self._used)
+        self._offsets[key] = offset
+        return offset
+
+    def offset(self, key):
+        """Return the value offset of ``key``, adding the entry if needed."""
+        offset = self._offsets.get(key)
+        if offset is None:
+            with self._lock:
+                offset = self._offsets.get(key)
+                if offset is None:
+                    offset = self._add_entry(key)
+        return offset
+
+    def add(self, offset, amount):
+        with self._lock:
+            _VALUE.pack_into(self._map, offset, _VALUE.unpack_from(self._map, offset)[0] + amount)
+
+    def add_many(self, changes):
+        """Apply several ``(offset, amount)`` changes under one lock acquisition."""
+        with self._lock:
+            for offset, amount in changes:
+                _VALUE.pack_into(self._map, offset, _VALUE.unpack_from(self._map, offset)[0] + amount)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class _Store:
+    """Where this process's values live; reopened in each forked child."""
+
+    def __init__(self):
+        self.directory = None
+        self._values = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def configure(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self.directory = directory
+            self._values = None
+
+    def values(self):
+        """This process's MmapValues, or None if metrics are not configured."""
+        values = self._values
+        if values is not None:
+            return values
+        if self.directory is None:
+            return None
+        with self._lock:
+            if self._values is None:
+                self._pid = os.getpid()
+                self._values = MmapValues(os.path.join(self.directory, f'metrics_{self._pid}.db'))
+            return self._values
+
+    def reset_after_fork(self):
+        # The parent's map belongs to the parent's file; start our own
+        self._values = None
+        self._lock = threading.Lock()
+
+
+_store = _Store()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_store.reset_after_fork)
+
+REGISTRY = []
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # Per-process cache of label values -> value offsets, rebuilt after
+        # fork or reconfiguration
+        self._offsets = {}
+        self._offsets_owner = None
+        REGISTRY.append(self)
+
+    def _key(self, sample, labels, extra=None):
+        pairs = list(zip(self.labelnames, labels))
+        if extra:
+            pairs.append(extra)
+        return json.dumps([self.name, sample, pairs])
+
+    def _offsets_for(self, labels):
+        values = _store.values()
+        if values is None:
+            return None, None
+        if self._offsets_owner is not values:
+            self._offsets = {}
+            self._offsets_owner = values
+        offsets = self._offsets.get(labels)
+        if offsets is None:
+            if len(labels) != len(self.labelnames):
+                raise ValueError(f'{self.name} expects labels {self.labelnames}, got {labels}')
+            offsets = self._offsets[labels] = [values.offset(key) for key in self._keys(labels)]
+        return values, offsets
+
+
+class Counter(_Metric):
+    """A value that only goes up, e.g. requests served."""
+
+    kind = 'counter'
+
+    def _keys(self, labels):
+        return [self._key(self.name, labels)]
+
+    def inc(self, *labels, amount=1):
+        values, offsets = self._offsets_for(labels)
+        if values is not None:
+            values.add(offsets[0], amount)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (e.g. latencies) over fixed buckets."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _keys(self, labels):
+        # Buckets are stored non-cumulatively (one write per observation)
+        # and made cumulative when rendered
+        keys = [self._key(f'{self.name}_bucket', labels, ('le', _format_bound(bound))) for bound in self.buckets]
+        keys.append(self._key(f'{self.name}_bucket', labels, ('le', '+Inf')))
+        keys.append(self._key(f'{self.name}_sum', labels))
+        keys.append(self._key(f'{self.name}_count', labels))
+        return keys
+
+    def observe(self, value, *labels):
+        values, offsets = self._offsets_for(labels)
+        if values is not None:
+            values.add_many(((offsets[bisect_left(self.buckets, value)], 1),
+                             (offsets[-2], value), (offsets[-1], 1)))
+
+    def time(self, *labels):
+        """Context manager observing the duration of its block, in seconds."""
+        return _Timer(self, labels)
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+
+def _format_bound(bound):
+    return repr(float(bound))
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _archive_dead_processes(directory):
+    """Fold files of exited processes into metrics_archive.db and delete them."""
+    if fcntl is None:
+        return
+    with open(os.path.join(directory, 'metrics.lock'), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        archive = None
+        try:
+            for name in os.listdir(directory):
+                if not (name.startswith('metrics_') and name.endswith('.db')):
+                    continue
+                pid = name[len('metrics_'):-len('.db')]
+                if not pid.isdigit() or _process_alive(int(pid)):
+                    continue
+                path = os.path.join(directory, name)
+                with open(path, 'rb') as handle:
+                    entries = list(_read_entries(handle.read()))
+                if archive is None:
+                    archive = MmapValues(os.path.join(directory, 'metrics_archive.db'))
+                for key, value, _ in entries:
+                    archive.add(archive.offset(key), value)
+                archive._map.flush()
+                os.remove(path)
+        finally:
+            if archive is not None:
+                archive.close()
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+@lru_cache(maxsize=65536)
+def _parse_key(key):
+    # The same keys appear in every process's file and every scrape
+    metric, sample, labels = json.loads(key)
+    return metric, sample, tuple(tuple(pair) for pair in labels)
+
+
+def collect(directory=None):
+    """Sum every process's values: ``{(name, sample, labels): value}``."""
+    directory = directory or _store.directory
+    if directory is None:
+        return {}
+    _archive_dead_processes(directory)
+    totals = {}
+    for name in os.listdir(directory):
+        if not (name.startswith('metrics_') and name.endswith('.db')):
+            continue
+        try:
+            with open(os.path.join(directory, name), 'rb') as handle:
+                data = handle.read()
+        except FileNotFoundError:
+            continue  # Archived by a concurrent scrape
+        for key, value, _ in _read_entries(data):
+            full_key = _parse_key(key)
+            totals[full_key] = totals.get(full_key, 0.0) + value
+    return totals
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_sample(sample, labels, value):
+    label_text = ','.join(f'{name}="{_escape(label)}"' for name, label in labels)
+    number = repr(value) if value != int(value) else str(int(value))
+    return f'{sample}{{{label_text}}} {number}' if label_text else f'{sample} {number}'
+
+
+def render_metrics(directory=None):
+    """Render all registered metrics, summed over processes, in the Prometheus text format."""
+    totals = collect(directory)
+    by_metric = {}
+    for (metric, sample, labels), value in totals.items():
+        by_metric.setdefault(metric, []).append((sample, labels, value))
+
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        samples = by_metric.get(metric.name, [])
+        if metric.kind == 'histogram':
+            samples = _cumulative_buckets(metric, samples)
+        else:
+            samples = sorted(samples)
+        for sample, labels, value in samples:
+            lines.append(_format_sample(sample, labels, value))
+    return '\n'.join(lines) + '\n'
+
+
+def _cumulative_buckets(histogram, samples):
+    bounds = [_format_bound(bound) for bound in histogram.buckets] + ['+Inf']
+    order = {bound: index for index, bound in enumerate(bounds)}
+    series = {}
+    others = []
+    for sample, labels, value in samples:
+        if sample.endswith('_bucket'):
+            base = tuple(pair for pair in labels if pair[0] != 'le')
+            bound = dict(labels)['le']
+            series.setdefault(base, [0.0] * len(bounds))[order[bound]] += value
+        else:
+            others.append((sample, labels, value))
+    result = []
+    for base in sorted(series):
+        running = 0.0
+        for bound, count in zip(bounds, series[base]):
+            running += count
+            result.append((f'{histogram.name}_bucket', base + (('le', bound),), running))
+    return result + sorted(others)
+
+
+def configure_metrics(directory):
+    """Store this process's metric values under ``directory``."""
+    _store.configure(directory)
+
+
+def init_metrics(app):
+    """Record request, database and business metrics for ``app``.
+
+    Per-process files go to METRICS_DIR, which must be shared by all the
+    app's worker processes on a host and not by anything else.
+    """
+    if not app.config['METRICS_ENABLED']:
+        return
+    from flask import request
+    from app.db import db
+    from sqlalchemy import event
+
+    configure_metrics(app.config['METRICS_DIR'])
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'checkout')
+    def count_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.inc()
+
+    # The start time is stamped by a WSGI wrapper rather than a
+    # before_request hook: it is cheaper and also covers other hooks
+    wsgi_app = app.wsgi_app
+
+    def timed_wsgi_app(environ, start_response):
+        environ['app.metrics_started'] = time.perf_counter()
+        return wsgi_app(environ, start_response)
+
+    app.wsgi_app = timed_wsgi_app
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = request.environ.get('app.metrics_started')
+        if started is not None:
+            # Endpoint names rather than paths keep label cardinality bounded
+            endpoint = request.endpoint or 'unmatched'
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, endpoint)
+            HTTP_REQUESTS.inc(endpoint, request.method, response.status_code)
+        return response
+
+
+# ---- Application metrics ----
+
+HTTP_REQUESTS = Counter('http_requests_total', 'HTTP requests served.', ['endpoint', 'method', 'status'])
+HTTP_REQUEST_DURATION = Histogram('http_request_duration_seconds', 'Time spent handling HTTP requests.',
+                                  ['endpoint'])
+DB_POOL_CHECKOUTS = Counter('db_pool_checkouts_total', 'Database connections checked out of the pool.')
+BOOKINGS_CREATED = Counter('bookings_created_total', 'Bookings created.', ['customer'])
+LOGIN_FAILURES = Counter('login_failures_total', 'Failed login attempts.', ['reason'])
@@ -0,0 +1,65 @@
+"""Customer and staff notifications, sent as background jobs.
+
+Routes call the queue_* functions before committing; the emails themselves
+are rendered and sent by ``flask worker run`` (see app/utils/jobs.py).
+Email bodies are the plain-text templates in templates/emails/.
+"""
+
+from flask import current_app, render_template
+
+from app.db import db
+from app.models import Booking
+from app.utils.jobs import enqueue, job_handler
+from app.utils.mail import send_email
+
+
+def queue_booking_confirmation(booking):
+    """Queue the confirmation email for a new booking (guests only: users have no email)."""
+    if booking.get_customer_email():
+        db.session.flush()  # Assigns booking.id
+        enqueue('booking_confirmation', {'booking_id': booking.id})
+
+
+def queue_booking_cancellation(booking):
+    """Queue the cancellation notice for a booking."""
+    if booking.get_customer_email():
+        enqueue('booking_cancellation', {'booking_id': booking.id})
+
+
+def queue_contact_message(name, email, message):
+    """Queue a contact form submission for delivery to CONTACT_EMAIL_TO."""
+    # The name ends up in the Subject header, which must stay on one line
+    enqueue('contact_message', {'name': ' '.join(name.split()), 'email': email, 'message': message})
+
+
+def _send_booking_email(booking_id, subject, template):
+    booking = db.session.get(Booking, booking_id)
+    if booking is None or not booking.get_customer_email():
+        return  # Deleted since it was queued: nothing to tell anyone
+    send_email(
+        booking.get_customer_email(),
+        subject.format(service=booking.service.name),
+        render_template(template, booking=booking),
+    )
+
+
+@job_handler('booking_confirmation')
+def send_booking_confirmation(payload):
+    _send_booking_email(payload['booking_id'], 'Your booking for {service}', 'emails/booking_confirmation.txt')
+
+
+@job_handler('booking_cancellation')
+def send_booking_cancellation(payload):
+    _send_booking_email(payload['booking_id'], 'Your booking for {service} was cancelled',
+                        'emails/booking_cancellation.txt')
+
+
+@job_handler('contact_message')
+def send_contact_message(payload):
+    config = current_app.config
+    send_email(
+        config['CONTACT_EMAIL_TO'] or config['MAIL_DEFAULT_SENDER'],
+        f"Contact form: {payload['name']}",
+        render_template('emails/contact_message.txt', **payload),
+        reply_to=payload['email'],
+    )
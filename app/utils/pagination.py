@@ -0,0 +1,166 @@
+"""Keyset (cursor) pagination helpers for PSv2 list views.
+
+Offset pagination gets slower the deeper you page because the database still
+has to walk every skipped row. Keyset pagination instead remembers the sort
+key of the last row shown and asks for rows strictly before/after it, so every
+page costs the same no matter how large the table grows.
+
+Cursors are opaque URL-safe tokens encoding a ``(sort value, id)`` pair. The
+sort value keeps its type (datetime, int, float or str) so the same helpers
+serve date-ordered bookings and price- or name-ordered products.
+"""
+
+import base64
+import binascii
+import operator
+from datetime import datetime
+
+from sqlalchemy import or_
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return 'd' + value.isoformat()
+    if isinstance(value, int):
+        return 'i' + str(value)
+    if isinstance(value, float):
+        return 'f' + repr(value)
+    return 's' + str(value)
+
+
+def _decode_value(text):
+    tag, body = text[:1], text[1:]
+    if tag == 'd':
+        return datetime.fromisoformat(body)
+    if tag == 'i':
+        return int(body)
+    if tag == 'f':
+        return float(body)
+    if tag == 's':
+        return body
+    # Untagged cursors predate typed values and always held a datetime
+    return datetime.fromisoformat(text)
+
+
+def encode_cursor(sort_value, row_id):
+    """Encode a ``(sort value, id)`` key into an opaque URL-safe token."""
+    raw = f'{_encode_value(sort_value)}|{row_id}'.encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Decode a cursor token back into a ``(sort value, id)`` pair.
+
+    Returns None for missing or malformed tokens so callers can simply fall
+    back to the first page instead of erroring on a tampered URL.
+    """
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+        sort_part, id_part = raw.rsplit('|', 1)
+        return _decode_value(sort_part), int(id_part)
+    except (ValueError, UnicodeError, binascii.Error):
+        return None
+
+
+class KeysetPage:
+    """One page of keyset-paginated results.
+
+    Attributes:
+        items (list): Rows on this page, in display order
+        per_page (int): Requested page size
+        next_cursor (str | None): Cursor for the next page, if any
+        prev_cursor (str | None): Cursor for the previous page, if any
+    """
+
+    def __init__(self, items, per_page, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def keyset_paginate(query, sort_column, id_column, per_page, after=None, before=None, descending=True):
+    """Return a KeysetPage of ``query`` ordered by ``(sort_column, id_column)``.
+
+    Args:
+        query: SQLAlchemy query without ordering applied
+        sort_column: Primary sort column (e.g. ``Booking.booking_date``)
+        id_column: Unique tie-breaker column (e.g. ``Booking.id``)
+        per_page (int): Number of rows per page
+        after (str): Cursor token; return the rows following this one
+        before (str): Cursor token; return the rows preceding this one
+        descending (bool): Sort direction of both columns (newest first by
+            default; pass False for e.g. cheapest-first or A-Z listings)
+
+    The cursor predicate is written as ``sort <= x AND (sort < x OR id < y)``
+    (mirrored for ascending order) rather than a plain OR so SQLite can turn
+    the first term into an index range seek. Only ``per_page + 1`` rows are
+    ever read, which is how we detect whether another page exists without
+    running a COUNT over the whole table.
+    """
+    after_key = decode_cursor(after)
+    before_key = decode_cursor(before) if after_key is None else None
+
+    # "Forward" comparisons follow the display order; "backward" ones reverse it
+    ascending_order = (sort_column.asc(), id_column.asc())
+    descending_order = (sort_column.desc(), id_column.desc())
+    if descending:
+        forward, forward_or_equal = operator.lt, operator.le
+        backward, backward_or_equal = operator.gt, operator.ge
+        forward_order, backward_order = descending_order, ascending_order
+    else:
+        forward, forward_or_equal = operator.gt, operator.ge
+        backward, backward_or_equal = operator.lt, operator.le
+        forward_order, backward_order = ascending_order, descending_order
+
+    if before_key is not None:
+        # Walk backwards from the cursor, then flip for display
+        sort_value, row_id = before_key
+        query = query.filter(
+            backward_or_equal(sort_column, sort_value),
+            or_(backward(sort_column, sort_value), backward(id_column, row_id)),
+        )
+        rows = query.order_by(*backward_order).limit(per_page + 1).all()
+        has_more = len(rows) > per_page
+        rows = list(reversed(rows[:per_page]))
+        has_prev, has_next = has_more, True
+    else:
+        if after_key is not None:
+            sort_value, row_id = after_key
+            query = query.filter(
+                forward_or_equal(sort_column, sort_value),
+                or_(forward(sort_column, sort_value), forward(id_column, row_id)),
+            )
+        rows = query.order_by(*forward_order).limit(per_page + 1).all()
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_prev = after_key is not None
+
+    next_cursor = prev_cursor = None
+    if rows:
+        sort_attr, id_attr = sort_column.key, id_column.key
+        if has_next:
+            last = rows[-1]
+            next_cursor = encode_cursor(getattr(last, sort_attr), getattr(last, id_attr))
+        if has_prev:
+            first = rows[0]
+            prev_cursor = encode_cursor(getattr(first, sort_attr), getattr(first, id_attr))
+
+    return KeysetPage(rows, per_page, next_cursor=next_cursor, prev_cursor=prev_cursor)
@@ -0,0 +1,129 @@
+"""Password hashing service for PSv2.
+
+Hashing and verifying passwords is deliberately slow, and running it inline
+on request threads lets a burst of logins stall every other request. This
+module runs werkzeug's hash functions in a small bounded worker pool:
+
+    * at most PASSWORD_HASH_WORKERS hashes run at once
+    * at most PASSWORD_HASH_QUEUE_LIMIT more may wait for a worker; beyond
+      that, callers get PasswordHashingBusy straight away (shed load rather
+      than pile up threads)
+
+The hash method and cost come from PASSWORD_HASH_METHOD (werkzeug syntax,
+e.g. 'scrypt:32768:8:1' or 'pbkdf2:sha256:600000'). Stored hashes made with
+other parameters are reported by needs_rehash() so login can upgrade them.
+
+PASSWORD_HASH_EXECUTOR picks 'thread' (default; hashlib releases the GIL
+while hashing) or 'process' workers.
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# werkzeug 2.3 defaults for methods given without explicit parameters
+_METHOD_DEFAULTS = {
+    'scrypt': 'scrypt:32768:8:1',
+    'pbkdf2': 'pbkdf2:sha256:600000',
+    'pbkdf2:sha256': 'pbkdf2:sha256:600000',
+}
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when the hashing queue is full; the request should be retried later."""
+
+
+def normalize_method(method):
+    """Expand a werkzeug method spec to its fully parameterized form."""
+    return _METHOD_DEFAULTS.get(method, method)
+
+
+class PasswordHasher:
+    """Bounded pool that runs password hashing off the request thread.
+
+    Args:
+        method (str): werkzeug hash method spec
+        workers (int): Number of concurrent hashing workers
+        queue_limit (int): Extra callers allowed to wait for a worker
+        timeout (float): Seconds a caller waits for its result
+        executor (str): 'thread' or 'process'
+    """
+
+    def __init__(self, method, workers=2, queue_limit=16, timeout=10.0, executor='thread'):
+        self.method = normalize_method(method)
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+        pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+        self._pool = pool_class(max_workers=workers)
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHashingBusy('Too many password operations in progress')
+        try:
+            future = self._pool.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Hold the slot until the work itself finishes, not just until this
+        # caller gives up waiting, so timed-out calls still count as queued
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result(timeout=self.timeout)
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, stored_hash, password):
+        return self._run(check_password_hash, stored_hash, password)
+
+    def needs_rehash(self, stored_hash):
+        """Return True if ``stored_hash`` was made with different parameters."""
+        return stored_hash.split('$', 1)[0] != self.method
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+
+_hashers = {}
+_hashers_lock = threading.Lock()
+
+
+def get_hasher():
+    """Return the PasswordHasher for the current app and process.
+
+    Pools are created lazily and keyed by pid, so a worker forked from a
+    preloaded parent builds its own pool instead of inheriting dead threads.
+    """
+    key = (id(current_app._get_current_object()), os.getpid())
+    hasher = _hashers.get(key)
+    if hasher is None:
+        with _hashers_lock:
+            hasher = _hashers.get(key)
+            if hasher is None:
+                config = current_app.config
+                hasher = PasswordHasher(
+                    config.get('PASSWORD_HASH_METHOD', 'scrypt'),
+                    workers=config.get('PASSWORD_HASH_WORKERS', 2),
+                    queue_limit=config.get('PASSWORD_HASH_QUEUE_LIMIT', 16),
+                    timeout=config.get('PASSWORD_HASH_TIMEOUT', 10.0),
+                    executor=config.get('PASSWORD_HASH_EXECUTOR', 'thread'),
+                )
+                _hashers[key] = hasher
+    return hasher
+
+
+def hash_password(password):
+    """Hash a password with the configured method on the hashing pool."""
+    return get_hasher().hash(password)
+
+
+def verify_password(stored_hash, password):
+    """Check a password against a stored hash on the hashing pool."""
+    return get_hasher().verify(stored_hash, password)
+
+
+def needs_rehash(stored_hash):
+    """Return True if a stored hash should be upgraded to the configured method."""
+    return get_hasher().needs_rehash(stored_hash)
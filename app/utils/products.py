@@ -0,0 +1,107 @@
+"""Shop catalog queries: filtered, sorted, keyset-paginated product listings.
+
+Every listing is (active products) + optional category + optional price
+range, ordered by one of SORT_OPTIONS. Without a price range, or when
+sorting by price, each shape maps onto one of the Product indexes, so a page
+costs an index seek plus ``per_page + 1`` rows no matter how large the
+catalog is. A price range sorted by name or newest seeks the range on the
+price index and sorts the matching rows, so its cost grows with the range.
+
+Anonymous visitors mostly request the same handful of pages (the first page
+of each category/sort), so results are kept in ``product_catalog``, a keyed
+cache invalidated through the 'product' cache_version row. Writers must call
+``product_catalog.invalidate()`` before committing.
+"""
+
+from collections import namedtuple
+
+from app.db import db
+from app.models import Product
+from app.utils.catalog_cache import ProductRecord, product_catalog
+from app.utils.pagination import KeysetPage, decode_cursor, keyset_paginate
+
+# Sort key -> (label, sort column, descending)
+SORT_OPTIONS = {
+    'newest': ('Newest', Product.id, True),
+    'price_asc': ('Price: low to high', Product.price, False),
+    'price_desc': ('Price: high to low', Product.price, True),
+    'name': ('Name: A to Z', Product.name, False),
+}
+DEFAULT_SORT = 'newest'
+
+ProductFilters = namedtuple('ProductFilters', ['category', 'min_price', 'max_price', 'sort'])
+
+
+def _parse_price(value):
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return None
+    return price if price >= 0 else None
+
+
+def parse_product_filters(args):
+    """Build ProductFilters from request args, ignoring invalid values.
+
+    Args:
+        args: ``request.args`` (category, min_price, max_price, sort)
+    """
+    category = (args.get('category') or '').strip()[:50] or None
+    min_price = _parse_price(args.get('min_price'))
+    max_price = _parse_price(args.get('max_price'))
+    if min_price is not None and max_price is not None and min_price > max_price:
+        min_price, max_price = max_price, min_price
+    sort = args.get('sort')
+    if sort not in SORT_OPTIONS:
+        sort = DEFAULT_SORT
+    return ProductFilters(category, min_price, max_price, sort)
+
+
+def _record_columns():
+    return (Product.id, Product.name, Product.description, Product.category, Product.price, Product.image)
+
+
+def _load_page(filters, per_page, after, before):
+    query = db.session.query(*_record_columns()).filter_by(is_active=True)
+    if filters.category:
+        query = query.filter(Product.category == filters.category)
+    if filters.min_price is not None:
+        query = query.filter(Product.price >= filters.min_price)
+    if filters.max_price is not None:
+        query = query.filter(Product.price <= filters.max_price)
+
+    _, sort_column, descending = SORT_OPTIONS[filters.sort]
+    page = keyset_paginate(query, sort_column, Product.id, per_page,
+                           after=after, before=before, descending=descending)
+    items = tuple(ProductRecord(*row) for row in page.items)
+    return KeysetPage(items, per_page, next_cursor=page.next_cursor, prev_cursor=page.prev_cursor)
+
+
+def get_product_page(filters, per_page, after=None, before=None):
+    """Return a cached KeysetPage of ProductRecords for the shop listing.
+
+    Args:
+        filters (ProductFilters): Parsed listing filters
+        per_page (int): Products per page
+        after (str): Cursor token of the page to follow
+        before (str): Cursor token of the page to precede
+    """
+    after_key = decode_cursor(after)
+    before_key = decode_cursor(before) if after_key is None else None
+    key = ('page', filters, per_page, after_key, before_key)
+    return product_catalog.get(key, lambda: _load_page(filters, per_page, after, before))
+
+
+def _load_categories():
+    rows = (
+        db.session.query(Product.category)
+        .filter_by(is_active=True)
+        .distinct()
+        .order_by(Product.category)
+    )
+    return tuple(category for (category,) in rows)
+
+
+def get_product_categories():
+    """Return the sorted categories that have at least one active product."""
+    return product_catalog.get(('categories',), _load_categories)
@@ -0,0 +1,42 @@
+"""SQLite query plan helpers for PSv2.
+
+Wraps ``EXPLAIN QUERY PLAN`` so CLI commands and diagnostics can show how
+SQLite will execute a statement, and flag full table scans.
+"""
+
+from sqlalchemy import text
+
+
+def explain_query_plan(connection, sql, params=None):
+    """Return the EXPLAIN QUERY PLAN rows for a SQL statement.
+
+    Args:
+        connection: SQLAlchemy Connection or Session to run against
+        sql: SQL string, or a SQLAlchemy Query/Select to compile
+        params (dict): Bound parameters for a plain SQL string
+
+    Returns:
+        list[tuple]: ``(id, parent, detail)`` rows as reported by SQLite
+    """
+    if not isinstance(sql, str):
+        statement = getattr(sql, 'statement', sql)
+        compiled = statement.compile()
+        sql, params = str(compiled), compiled.params
+    rows = connection.execute(text(f'EXPLAIN QUERY PLAN {sql}'), params or {}).fetchall()
+    return [(row[0], row[1], row[3]) for row in rows]
+
+
+def format_query_plan(plan):
+    """Render plan rows as an indented tree, one line per step."""
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, detail in plan:
+        level = depth.get(parent, -1) + 1
+        depth[node_id] = level
+        lines.append(f'{"  " * level}{detail}')
+    return lines
+
+
+def is_table_scan(detail):
+    """Return True if a plan step reads a whole table instead of using an index."""
+    return detail.startswith('SCAN') and 'USING' not in detail
@@ -0,0 +1,197 @@
+"""Token-bucket rate limiting for expensive public endpoints.
+
+Each limited endpoint gets one bucket per client IP and, optionally, one per
+submitted identity (username or email), so a script can't get around the
+limit by rotating either one. A bucket holds up to ``burst`` tokens and
+refills at ``rate`` tokens per second. Every request spends one token, and
+an empty bucket gets a 429 with a Retry-After header.
+
+Buckets live in one of two stores:
+    memory: per-process LRU dict capped at RATE_LIMIT_MAX_KEYS entries
+    sqlite: a small shared SQLite file so limits hold across worker processes
+
+Configuration (app.config):
+    RATE_LIMIT_ENABLED: Master switch
+    RATE_LIMIT_STORAGE: 'memory' or 'sqlite'. Unset means memory, except
+        that ``flask serve`` picks sqlite when it runs more than one worker:
+        with per-process buckets every client would get the limit once per
+        worker.
+    RATE_LIMIT_SQLITE_PATH: Database file for the sqlite store
+    RATE_LIMIT_MAX_KEYS: LRU capacity of the memory store
+    RATE_LIMITS: {endpoint name: 'N/period' or 'N/period;burst=M'} overrides
+        for the limits declared in the @rate_limit decorators
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, request
+from werkzeug.exceptions import TooManyRequests
+
+_PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+def parse_limit(spec):
+    """Parse '5/minute' or '5/minute;burst=10' into ``(rate per second, burst)``."""
+    spec, _, options = spec.partition(';')
+    count, _, period = spec.strip().partition('/')
+    count = int(count)
+    seconds = _PERIODS[period.strip().rstrip('s')]
+    burst = count
+    if options.strip().startswith('burst='):
+        burst = int(options.strip()[len('burst='):])
+    return count / seconds, burst
+
+
+def _refill(tokens, updated, rate, burst, now):
+    return min(burst, tokens + (now - updated) * rate)
+
+
+def _spend(tokens, rate):
+    """Try to spend one token; returns ``(new tokens, allowed, retry_after seconds)``."""
+    if tokens >= 1:
+        return tokens - 1, True, 0
+    return tokens, False, max(1, math.ceil((1 - tokens) / rate))
+
+
+class MemoryStore:
+    """Process-local bucket store with LRU eviction to bound memory use."""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, rate, burst, now):
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens, allowed, retry_after = _spend(_refill(tokens, updated, rate, burst, now), rate)
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+class SQLiteStore:
+    """Bucket store shared by all worker processes through a SQLite file.
+
+    Each hit is one short ``BEGIN IMMEDIATE`` read-modify-write transaction.
+    Buckets that have been idle long enough to be full again carry no
+    information and are pruned periodically.
+    """
+
+    PRUNE_EVERY = 1000
+    IDLE_SECONDS = 3600
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._hits = 0
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS rate_limit_bucket ('
+                ' key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def hit(self, key, rate, burst, now):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT tokens, updated FROM rate_limit_bucket WHERE key = ?', (key,)
+            ).fetchone()
+            tokens, updated = row if row else (burst, now)
+            tokens, allowed, retry_after = _spend(_refill(tokens, updated, rate, burst, now), rate)
+            conn.execute(
+                'INSERT OR REPLACE INTO rate_limit_bucket (key, tokens, updated) VALUES (?, ?, ?)',
+                (key, tokens, now),
+            )
+            self._hits += 1
+            if self._hits % self.PRUNE_EVERY == 0:
+                conn.execute('DELETE FROM rate_limit_bucket WHERE updated < ?', (now - self.IDLE_SECONDS,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return allowed, retry_after
+
+
+def get_store():
+    """Return the bucket store for the current app, creating it on first use."""
+    store = current_app.extensions.get('rate_limit_store')
+    if store is None:
+        config = current_app.config
+        if config.get('RATE_LIMIT_STORAGE') == 'sqlite':
+            path = config.get('RATE_LIMIT_SQLITE_PATH') or os.path.join(current_app.instance_path, 'ratelimit.db')
+            store = SQLiteStore(path)
+        else:
+            store = MemoryStore(config.get('RATE_LIMIT_MAX_KEYS', 10000))
+        current_app.extensions['rate_limit_store'] = store
+    return store
+
+
+def client_ip():
+    """Key function: the client's IP address."""
+    return request.remote_addr or 'unknown'
+
+
+def form_field(name):
+    """Key function factory: a submitted form field, e.g. the username or email."""
+    def key_func():
+        value = request.form.get(name, '').strip().lower()
+        return value or None
+    key_func.__name__ = f'form_{name}'
+    return key_func
+
+
+def rate_limit(name, limit, keys=(client_ip,), methods=('POST',)):
+    """Decorator applying a token-bucket limit to a view.
+
+    Args:
+        name (str): Endpoint name, used in bucket keys and RATE_LIMITS overrides
+        limit (str): Default limit such as '10/minute' or '10/minute;burst=20'
+        keys (tuple): Key functions; each one gets its own bucket and the
+            request is rejected if any of them is empty. Functions returning
+            None are skipped
+        methods (tuple): HTTP methods to limit (GETs of forms are free)
+
+    Usage:
+        @auth_bp.route('/login', methods=['GET', 'POST'])
+        @rate_limit('login', '10/minute', keys=(client_ip, form_field('username')))
+        def login():
+            ...
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped_view(*args, **kwargs):
+            config = current_app.config
+            if request.method in methods and config.get('RATE_LIMIT_ENABLED', True):
+                rate, burst = parse_limit(config.get('RATE_LIMITS', {}).get(name, limit))
+                store = get_store()
+                now = time.time()
+                for key_func in keys:
+                    value = key_func()
+                    if value is None:
+                        continue
+                    allowed, retry_after = store.hit(f'{name}:{key_func.__name__}:{value}', rate, burst, now)
+                    if not allowed:
+                        raise TooManyRequests(retry_after=retry_after)
+            return view(*args, **kwargs)
+
+        return wrapped_view
+
+    return decorator
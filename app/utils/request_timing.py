@@ -0,0 +1,176 @@
+"""Opt-in per-request performance instrumentation.
+
+With REQUEST_TIMING_ENABLED, every request measures:
+
+    db     number and total time of SQL statements (engine cursor events)
+    tpl    template rendering time (Flask's template signals), excluding
+           SQL run while rendering, e.g. lazy loads, which counts as db
+    app    the rest of the handler: total - db - tpl
+    total  from before_request to after_request
+
+These go out in a ``Server-Timing`` header (shown in the browser dev tools'
+network timing panel) and into a rolling summary of the last
+REQUEST_TIMING_WINDOW requests per endpoint, shown on /admin/performance.
+The summary is per process: with several worker processes each keeps its
+own.
+
+Streamed responses are timed up to the point the body starts streaming.
+"""
+
+import threading
+import time
+from collections import deque
+
+from flask import before_render_template, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Endpoints not worth timing
+_IGNORED_ENDPOINTS = {'static', 'assets.bundle'}
+
+
+class RequestTiming:
+    """Measurements for the current request (stored on ``flask.g``)."""
+
+    __slots__ = ('started', 'sql_count', 'sql_time', 'template_time', '_render_started')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self._render_started = []
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class TimingSummary:
+    """Rolling window of request timings per endpoint (thread-safe)."""
+
+    def __init__(self, window=200):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, total, sql_count, sql_time, template_time):
+        with self._lock:
+            samples = self._samples.get(endpoint)
+            if samples is None:
+                samples = self._samples[endpoint] = deque(maxlen=self.window)
+            samples.append((total, sql_count, sql_time, template_time))
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def snapshot(self):
+        """Summaries per endpoint, the endpoint with the most total time first.
+
+        Times are in milliseconds.
+        """
+        with self._lock:
+            samples = {endpoint: list(values) for endpoint, values in self._samples.items()}
+        rows = []
+        for endpoint, values in samples.items():
+            count = len(values)
+            totals = sorted(value[0] for value in values)
+            rows.append({
+                'endpoint': endpoint,
+                'requests': count,
+                'mean_ms': sum(totals) / count * 1000,
+                'p50_ms': _percentile(totals, 0.5) * 1000,
+                'p95_ms': _percentile(totals, 0.95) * 1000,
+                'max_ms': totals[-1] * 1000,
+                'sql_queries': sum(value[1] for value in values) / count,
+                'sql_ms': sum(value[2] for value in values) / count * 1000,
+                'template_ms': sum(value[3] for value in values) / count * 1000,
+                'time_spent_ms': sum(totals) * 1000,
+            })
+        rows.sort(key=lambda row: row['time_spent_ms'], reverse=True)
+        return rows
+
+
+def _current_timing():
+    return g.get('_request_timing') if has_request_context() else None
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_timing() is not None:
+        conn.info.setdefault('_request_timing_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timing = _current_timing()
+    started = conn.info.get('_request_timing_started')
+    if timing is not None and started:
+        timing.sql_count += 1
+        timing.sql_time += time.perf_counter() - started.pop()
+
+
+def _before_render(sender, template, context, **extra):
+    timing = _current_timing()
+    if timing is not None:
+        timing._render_started.append((time.perf_counter(), timing.sql_time))
+
+
+def _after_render(sender, template, context, **extra):
+    timing = _current_timing()
+    if timing is not None and timing._render_started:
+        started, sql_time = timing._render_started.pop()
+        elapsed = time.perf_counter() - started - (timing.sql_time - sql_time)
+        # Nested render_template calls (e.g. rendering an email inside a
+        # request) are already inside the outer render's time
+        if not timing._render_started:
+            timing.template_time += elapsed
+
+
+def server_timing_header(timing, total):
+    """Format measurements as a Server-Timing header value (durations in ms)."""
+    other = max(total - timing.sql_time - timing.template_time, 0.0)
+    return ', '.join([
+        f'db;dur={timing.sql_time * 1000:.1f};desc="{timing.sql_count} queries"',
+        f'tpl;dur={timing.template_time * 1000:.1f};desc="Templates"',
+        f'app;dur={other * 1000:.1f};desc="Python"',
+        f'total;dur={total * 1000:.1f}',
+    ])
+
+
+def init_request_timing(app):
+    """Install the request hooks if REQUEST_TIMING_ENABLED is set.
+
+    The summary is kept on ``app.extensions['request_timing']`` either way,
+    so the admin page can tell whether timing is on.
+    """
+    summary = TimingSummary(app.config['REQUEST_TIMING_WINDOW'])
+    app.extensions['request_timing'] = summary
+    if not app.config['REQUEST_TIMING_ENABLED']:
+        return
+
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+
+    @app.before_request
+    def start_request_timing():
+        g._request_timing = RequestTiming()
+
+    @app.after_request
+    def finish_request_timing(response):
+        timing = g.pop('_request_timing', None)
+        if timing is None:
+            return response
+        total = time.perf_counter() - timing.started
+        response.headers.add('Server-Timing', server_timing_header(timing, total))
+        if request.endpoint and request.endpoint not in _IGNORED_ENDPOINTS:
+            summary.record(request.endpoint, total, timing.sql_count, timing.sql_time, timing.template_time)
+        return response
+
+
+def get_timing_summary(app):
+    """Return the app's TimingSummary, or None if timing is disabled."""
+    if not app.config['REQUEST_TIMING_ENABLED']:
+        return None
+    return app.extensions.get('request_timing')
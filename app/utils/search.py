@@ -0,0 +1,92 @@
+"""Full-text service search backed by the SQLite FTS5 ``service_fts`` index.
+
+The index mirrors Service.name and Service.description and is kept in sync
+by triggers (see SERVICE_FTS_DDL in app/models.py), so writers need do
+nothing special. Searches are:
+
+    * prefix-aware: every word typed also matches longer words, so "gro"
+      finds "Grooming"
+    * ranked with bm25, with name matches weighted above description ones
+    * safe: user input is reduced to plain quoted terms, never passed to
+      MATCH as raw FTS5 query syntax
+
+On databases other than SQLite the search falls back to a LIKE filter.
+"""
+
+import re
+
+from sqlalchemy import text
+
+from app.db import db
+from app.models import Service
+from app.utils.catalog_cache import ServiceRecord
+
+# bm25 column weights, in index column order (name, description)
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+MAX_TERMS = 8
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def search_terms(query):
+    """Split free text into at most MAX_TERMS lowercase search words."""
+    return [word.lower() for word in _WORD.findall(query or '')][:MAX_TERMS]
+
+
+def build_match_query(query):
+    """Turn free text into an FTS5 MATCH expression (None if nothing to search).
+
+    Each word becomes a quoted prefix term and all terms must match:
+    ``dog gro`` -> ``"dog"* "gro"*``.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_services(query, limit=50):
+    """Return up to ``limit`` ServiceRecords matching ``query``, best first."""
+    if db.engine.dialect.name != 'sqlite':
+        return _like_search(query, limit)
+
+    match = build_match_query(query)
+    if match is None:
+        return []
+    rows = db.session.execute(
+        text(
+            'SELECT service.id, service.name, service.description, service.price '
+            'FROM service_fts JOIN service ON service.id = service_fts.rowid '
+            'WHERE service_fts MATCH :match '
+            'ORDER BY bm25(service_fts, :name_weight, :description_weight), service.id '
+            'LIMIT :limit'
+        ),
+        {'match': match, 'name_weight': NAME_WEIGHT,
+         'description_weight': DESCRIPTION_WEIGHT, 'limit': limit},
+    )
+    return [ServiceRecord(*row) for row in rows]
+
+
+def _like_search(query, limit):
+    terms = search_terms(query)
+    if not terms:
+        return []
+    rows = db.session.query(Service.id, Service.name, Service.description, Service.price)
+    for term in terms:
+        pattern = f'%{term}%'
+        rows = rows.filter(db.or_(Service.name.ilike(pattern), Service.description.ilike(pattern)))
+    return [ServiceRecord(*row) for row in rows.order_by(Service.name, Service.id).limit(limit)]
+
+
+def rebuild_service_index():
+    """Rebuild service_fts from the service table and merge its segments.
+
+    Returns:
+        int: Number of services indexed
+    """
+    db.session.execute(text("INSERT INTO service_fts(service_fts) VALUES ('rebuild')"))
+    db.session.execute(text("INSERT INTO service_fts(service_fts) VALUES ('optimize')"))
+    db.session.commit()
+    return db.session.query(Service).count()
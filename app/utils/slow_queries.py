@@ -0,0 +1,194 @@
+"""Slow SQL statement recorder.
+
+Every statement the app's engine runs is timed (cursor events, a couple of
+microseconds each). Statements taking at least SLOW_QUERY_THRESHOLD_MS are
+recorded with:
+
+    * the SQL, its parameters (truncated; redacted for statements that
+      touch passwords) and duration
+    * where it ran: the request endpoint, or the CLI command
+    * its EXPLAIN QUERY PLAN, captured straight away on the same connection
+
+Records go into a ring buffer of the last SLOW_QUERY_BUFFER_SIZE entries
+(per process, shown on /admin/performance) and, if SLOW_QUERY_LOG_PATH is
+set, as JSON lines to a size-rotated log file, which is what
+``flask database slow-queries`` reads. Set SLOW_QUERY_ENABLED=0 to turn
+recording off entirely.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+import click
+from flask import has_request_context, request
+from sqlalchemy import event
+
+from app.db import db
+from app.utils.query_plans import format_query_plan
+
+_EXPLAINABLE = re.compile(r'^\s*(SELECT|WITH|UPDATE|DELETE|INSERT)\b', re.IGNORECASE)
+_MAX_PARAMETERS_LENGTH = 500
+
+
+class SlowQueryLog:
+    """Ring buffer of slow statements, optionally mirrored to a rotating file."""
+
+    def __init__(self, threshold_ms=100, size=200, path=None, max_bytes=5 * 1024 * 1024, backups=3):
+        self.threshold = threshold_ms / 1000
+        self._entries = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._file_logger = None
+        if path:
+            self._file_logger = logging.getLogger(f'{__name__}.{path}')
+            self._file_logger.propagate = False
+            self._file_logger.setLevel(logging.INFO)
+            if not self._file_logger.handlers:
+                handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                self._file_logger.addHandler(handler)
+
+    def record(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+        if self._file_logger is not None:
+            self._file_logger.info(json.dumps(entry, default=str))
+
+    def entries(self):
+        """Recorded statements, most recent first."""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def normalize_statement(sql):
+    """Collapse literals, placeholder lists and whitespace so similar statements group together."""
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+    sql = re.sub(r'\(\s*\?(?:\s*,\s*\?)+\s*\)', '(?, ...)', sql)
+    return ' '.join(sql.split())
+
+
+def _describe_parameters(statement, parameters, executemany):
+    if 'password' in statement.lower():
+        return '<redacted>'
+    if executemany:
+        parameters = f'{len(parameters)} rows, first: {parameters[0]!r}' if parameters else '[]'
+    text = parameters if isinstance(parameters, str) else repr(parameters)
+    if len(text) > _MAX_PARAMETERS_LENGTH:
+        text = text[:_MAX_PARAMETERS_LENGTH] + '...'
+    return text
+
+
+def _source():
+    if has_request_context():
+        return request.endpoint or request.path
+    context = click.get_current_context(silent=True)
+    return f'cli: {context.command_path}' if context is not None else None
+
+
+def _explain(cursor, statement, parameters, executemany):
+    if executemany or not _EXPLAINABLE.match(statement):
+        return []
+    explain_cursor = cursor.connection.cursor()
+    try:
+        rows = explain_cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters or ()).fetchall()
+    except Exception as e:
+        return [f'(plan unavailable: {e})']
+    finally:
+        explain_cursor.close()
+    return format_query_plan([(row[0], row[1], row[3]) for row in rows])
+
+
+def init_slow_query_log(app):
+    """Time the app's engine statements and record slow ones on ``app.extensions['slow_queries']``."""
+    config = app.config
+    if not config['SLOW_QUERY_ENABLED']:
+        return
+    log = SlowQueryLog(
+        threshold_ms=config['SLOW_QUERY_THRESHOLD_MS'],
+        size=config['SLOW_QUERY_BUFFER_SIZE'],
+        path=config['SLOW_QUERY_LOG_PATH'],
+        max_bytes=config['SLOW_QUERY_LOG_MAX_BYTES'],
+        backups=config['SLOW_QUERY_LOG_BACKUPS'],
+    )
+    app.extensions['slow_queries'] = log
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_slow_query_started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def check_duration(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('_slow_query_started')
+        if not started:
+            return
+        duration = time.perf_counter() - started.pop()
+        if duration < log.threshold:
+            return
+        log.record({
+            'at': datetime.utcnow().isoformat(timespec='seconds'),
+            'duration_ms': round(duration * 1000, 2),
+            'source': _source(),
+            'statement': statement,
+            'parameters': _describe_parameters(statement, parameters, executemany),
+            'plan': _explain(cursor, statement, parameters, executemany),
+        })
+
+
+def get_slow_query_log(app):
+    """Return the app's SlowQueryLog, or None if recording is off."""
+    return app.extensions.get('slow_queries')
+
+
+def read_log_file(path, backups=0):
+    """Yield entries from a slow-query log file and its rotated backups, oldest first."""
+    for index in range(backups, -1, -1):
+        name = f'{path}.{index}' if index else path
+        if not os.path.exists(name):
+            continue
+        with open(name, encoding='utf-8') as handle:
+            for line in handle:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # Line cut short by a crash or rotation
+
+
+def aggregate(entries):
+    """Group entries by normalized statement, slowest total first.
+
+    Returns:
+        list[dict]: ``statement``, ``count``, ``total_ms``, ``mean_ms``,
+        ``max_ms``, ``sources`` and the ``plan`` of the slowest occurrence
+    """
+    groups = {}
+    for entry in entries:
+        key = normalize_statement(entry['statement'])
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {'statement': key, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                                   'sources': set(), 'plan': []}
+        group['count'] += 1
+        group['total_ms'] += entry['duration_ms']
+        if entry['duration_ms'] >= group['max_ms']:
+            group['max_ms'] = entry['duration_ms']
+            group['plan'] = entry.get('plan') or []
+        if entry.get('source'):
+            group['sources'].add(entry['source'])
+    for group in groups.values():
+        group['mean_ms'] = group['total_ms'] / group['count']
+        group['sources'] = sorted(group['sources'])
+    return sorted(groups.values(), key=lambda group: group['total_ms'], reverse=True)
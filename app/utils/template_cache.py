@@ -0,0 +1,168 @@
+"""Template fragment caching and the Jinja bytecode cache.
+
+Fragment cache
+    ``{% cache key, ttl %}...{% endcache %}`` stores the rendered markup of
+    a block under ``key`` for ``ttl`` seconds (FRAGMENT_CACHE_TTL if
+    omitted). Build keys from everything the block shows, so edits
+    invalidate entries by changing the key rather than by explicit purges::
+
+        {% cache ['booking-card', booking.id, booking.updated_at, current_user.role], 600 %}
+
+    A None key renders the block uncached. Keys are scoped to the template
+    file and its modification time, so editing a template never serves the
+    old markup.
+
+    Entries live in one of two backends (FRAGMENT_CACHE_BACKEND):
+        memory: per-process LRU dict capped at FRAGMENT_CACHE_MAX_ENTRIES
+        sqlite: a SQLite file shared by all worker processes
+    'none' turns the tag into a no-op.
+
+Bytecode cache
+    Compiled templates are stored in JINJA_BYTECODE_CACHE_DIR, so a fresh
+    worker loads them instead of parsing and compiling every template again.
+    Jinja checks the source checksum, so edited templates are recompiled.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+
+class MemoryFragmentCache:
+    """Process-local fragment store with LRU eviction."""
+
+    def __init__(self, max_entries=5000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, expires):
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteFragmentCache:
+    """Fragment store shared by all worker processes through a SQLite file.
+
+    The file is opened on first use. Expired entries are deleted every
+    PRUNE_EVERY writes.
+    """
+
+    PRUNE_EVERY = 500
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS fragment_cache ('
+                ' key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)'
+            )
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key, now):
+        row = self._connect().execute(
+            'SELECT value FROM fragment_cache WHERE key = ? AND expires > ?', (key, now)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value, expires):
+        conn = self._connect()
+        conn.execute('INSERT OR REPLACE INTO fragment_cache (key, value, expires) VALUES (?, ?, ?)',
+                     (key, value, expires))
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            conn.execute('DELETE FROM fragment_cache WHERE expires <= ?', (time.time(),))
+
+    def clear(self):
+        self._connect().execute('DELETE FROM fragment_cache')
+
+
+class FragmentCacheExtension(Extension):
+    """Jinja extension adding the ``{% cache key, ttl %}`` block tag."""
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None, fragment_cache_ttl=300)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key = parser.parse_expression()
+        ttl = parser.parse_expression() if parser.stream.skip_if('comma') else nodes.Const(None)
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        try:
+            modified = os.stat(parser.filename).st_mtime_ns if parser.filename else 0
+        except OSError:
+            modified = 0
+        scope = nodes.Const(f'{parser.name}:{lineno}:{modified}')
+        return nodes.CallBlock(self.call_method('_render', [scope, key, ttl]), [], [], body).set_lineno(lineno)
+
+    def _render(self, scope, key, ttl, caller):
+        store = self.environment.fragment_cache
+        if store is None or key is None:
+            return caller()
+        cache_key = hashlib.sha1(f'{scope}|{key!r}'.encode()).hexdigest()
+        now = time.time()
+        value = store.get(cache_key, now)
+        if value is None:
+            value = caller()
+            store.set(cache_key, str(value), now + (ttl if ttl is not None else self.environment.fragment_cache_ttl))
+        return Markup(value)
+
+
+def create_fragment_cache(config, instance_path):
+    """Build the backend named by FRAGMENT_CACHE_BACKEND, or None for 'none'."""
+    backend = config['FRAGMENT_CACHE_BACKEND']
+    if backend == 'none':
+        return None
+    if backend == 'sqlite':
+        return SQLiteFragmentCache(config['FRAGMENT_CACHE_SQLITE_PATH'] or os.path.join(instance_path, 'fragments.db'))
+    return MemoryFragmentCache(config['FRAGMENT_CACHE_MAX_ENTRIES'])
+
+
+def init_template_caches(app):
+    """Install the ``{% cache %}`` tag and, if configured, the bytecode cache on the app's Jinja env."""
+    env = app.jinja_env
+    env.add_extension(FragmentCacheExtension)
+    env.fragment_cache = create_fragment_cache(app.config, app.instance_path)
+    env.fragment_cache_ttl = app.config['FRAGMENT_CACHE_TTL']
+
+    directory = app.config['JINJA_BYTECODE_CACHE_DIR']
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        env.bytecode_cache = FileSystemBytecodeCache(directory)
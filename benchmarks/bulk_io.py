@@ -0,0 +1,120 @@
+"""Bulk import/export throughput benchmark.
+
+Generates synthetic service, user and booking files, then times, against a
+scratch database:
+
+    insert   importing them into empty tables
+    update   importing the same files again (every row matches an existing one)
+    export   streaming every row back out
+
+for each entity and format. Throughput is reported in rows per minute;
+the target is at least 100k rows/minute each way.
+
+Usage:
+    python benchmarks/bulk_io.py [--rows 100000] [--batch-size 1000] [--format csv jsonl]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import order matters: bookings reference services and users by name
+ENTITIES = ('service', 'user', 'booking')
+
+
+def generate(entity, rows):
+    """Yield synthetic input records for an entity."""
+    start = datetime(2030, 1, 1, 9)
+    statuses = ['pending', 'confirmed', 'completed', 'cancelled']
+    for i in range(rows):
+        if entity == 'service':
+            yield {'name': f'Service {i}', 'description': f'Benchmark service number {i}',
+                   'price': round(10 + i % 90 + 0.99, 2)}
+        elif entity == 'user':
+            # A precomputed hash: hashing passwords would dominate the run
+            yield {'username': f'user{i}', 'role': 'customer',
+                   'password_hash': 'scrypt:32768:8:1$benchmark$' + '0' * 128,
+                   'created_at': start.isoformat()}
+        else:
+            yield {'service': f'Service {i % 1000}', 'username': f'user{i % 1000}' if i % 3 == 0 else '',
+                   'guest_name': f'Guest {i}', 'guest_email': f'guest{i}@example.com',
+                   'booking_date': (start + timedelta(minutes=30 * i)).isoformat(),
+                   'status': statuses[i % len(statuses)]}
+
+
+def write_input(path, entity, rows, fmt):
+    from app.utils.bulk_io import write_records
+
+    fieldnames = list(next(generate(entity, 1)))
+    with open(path, 'w', encoding='utf-8', newline='') as handle:
+        write_records(handle, fmt, fieldnames, generate(entity, rows))
+
+
+def rate(rows, seconds):
+    return round(rows / seconds * 60) if seconds else None
+
+
+def run(fmt, rows, batch_size, workdir):
+    from app import create_app
+    from app.db import db
+    from app.utils.bulk_io import export_records, import_records, read_records
+
+    db_path = os.path.join(workdir, f'bulk_{fmt}.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}', 'SECRET_KEY': 'benchmark'})
+    results = []
+    with app.app_context():
+        db.create_all()
+        for entity in ENTITIES:
+            source = os.path.join(workdir, f'{entity}.{fmt}')
+            write_input(source, entity, rows, fmt)
+
+            timings = {}
+            for phase in ('insert', 'update'):
+                with open(source, encoding='utf-8', newline='') as handle:
+                    started = time.perf_counter()
+                    result = import_records(entity, read_records(handle, fmt), batch_size=batch_size)
+                    timings[phase] = time.perf_counter() - started
+                if result.errors:
+                    raise RuntimeError(f'{entity} {phase}: {result.errors[:3]}')
+
+            destination = os.path.join(workdir, f'{entity}_out.{fmt}')
+            with open(destination, 'w', encoding='utf-8', newline='') as handle:
+                started = time.perf_counter()
+                exported = export_records(entity, handle, fmt, batch_size=batch_size)
+                timings['export'] = time.perf_counter() - started
+
+            results.append({
+                'entity': entity,
+                'format': fmt,
+                'rows': rows,
+                'insert_rows_per_min': rate(rows, timings['insert']),
+                'update_rows_per_min': rate(rows, timings['update']),
+                'export_rows_per_min': rate(exported, timings['export']),
+                'seconds': {phase: round(value, 2) for phase, value in timings.items()},
+            })
+        db.engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000, help='Rows per entity')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--format', nargs='+', default=['csv', 'jsonl'], choices=['csv', 'jsonl'])
+    args = parser.parse_args()
+
+    report = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for fmt in args.format:
+            report.extend(run(fmt, args.rows, args.batch_size, workdir))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Template fragment cache and bytecode cache benchmark.
+
+Times, in milliseconds per request (test client, warm caches):
+
+    bookings   /bookings/all?per_page=100 as an admin, 100 bookings
+    services   /services with --services services
+
+for each fragment backend (none, memory, sqlite), and the time to load
+and compile every template in a fresh process-like environment with and
+without a warm bytecode cache.
+
+Usage:
+    python benchmarks/fragment_cache.py [--requests 200] [--services 50]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_app(workdir, **config):
+    from app import create_app
+
+    return create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.join(workdir, "fragments.db")}',
+        'SECRET_KEY': 'benchmark',
+        'RATE_LIMIT_ENABLED': False,
+        'METRICS_ENABLED': False,
+        'SLOW_QUERY_LOG_PATH': '',
+        'FRAGMENT_CACHE_SQLITE_PATH': os.path.join(workdir, 'fragment_store.db'),
+        'JINJA_BYTECODE_CACHE_DIR': '',
+        **config,
+    })
+
+
+def seed(app, services):
+    from app.db import db
+    from app.models import Booking, Service, User
+
+    with app.app_context():
+        db.create_all()
+        admin = User(username='admin', role='admin')
+        admin.set_password('benchmark')
+        db.session.add(admin)
+        rows = [Service(name=f'Service {index}', description='Benchmark service ' * 5, price=10 + index)
+                for index in range(services)]
+        db.session.add_all(rows)
+        db.session.flush()
+        start = datetime(2026, 1, 1, 9)
+        for index in range(100):
+            db.session.add(Booking(service_id=rows[index % services].id, guest_name=f'Guest {index}',
+                                   guest_email=f'guest{index}@example.com', notes='Benchmark booking',
+                                   booking_date=start + timedelta(hours=index), status='confirmed'))
+        db.session.commit()
+
+
+def per_request_ms(client, path, requests):
+    for _ in range(5):
+        client.get(path)
+    started = time.perf_counter()
+    for _ in range(requests):
+        client.get(path)
+    return round((time.perf_counter() - started) / requests * 1000, 2)
+
+
+def compile_all_ms(workdir, bytecode_dir):
+    app = make_app(workdir, JINJA_BYTECODE_CACHE_DIR=bytecode_dir)
+    names = [name for name in app.jinja_env.list_templates() if name.endswith(('.html', '.txt'))]
+    started = time.perf_counter()
+    for name in names:
+        app.jinja_env.get_template(name)
+    return round((time.perf_counter() - started) * 1000, 1), len(names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--services', type=int, default=50)
+    args = parser.parse_args()
+
+    report = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        seed(make_app(workdir), args.services)
+        for backend in ('none', 'memory', 'sqlite'):
+            client = make_app(workdir, FRAGMENT_CACHE_BACKEND=backend).test_client()
+            client.post('/auth/login', data={'username': 'admin', 'password': 'benchmark'})
+            report[backend] = {
+                'bookings_ms': per_request_ms(client, '/bookings/all?per_page=100', args.requests),
+                'services_ms': per_request_ms(client, '/services', args.requests),
+            }
+
+        bytecode_dir = os.path.join(workdir, 'jinja_cache')
+        report['compile_templates'] = {}
+        report['compile_templates']['no_bytecode_cache_ms'], count = compile_all_ms(workdir, '')
+        compile_all_ms(workdir, bytecode_dir)  # Populate the cache
+        report['compile_templates']['warm_bytecode_cache_ms'], _ = compile_all_ms(workdir, bytecode_dir)
+        report['compile_templates']['templates'] = count
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,285 @@
+"""HTTP load-testing harness for PSv2.
+
+Seeds a scratch database, serves the app on a local port in a separate
+process, and drives concurrent mixed traffic against it:
+
+    services       anonymous GET /services
+    guest_booking  anonymous POST /bookings/new/<id>
+    login          POST /auth/login as a seeded customer
+    admin_bookings GET /bookings/all as a logged-in admin
+
+Per-endpoint throughput, p50/p95/p99 latency and error rates are printed as
+JSON (and optionally written to a file) so runs can be compared release over
+release. Point --url at an already running server to skip seeding; it must
+then contain the ADMIN and CUSTOMER accounts below and have rate limiting
+disabled (RATE_LIMIT_ENABLED=0).
+
+Usage:
+    python benchmarks/load_test.py [--concurrency 8] [--duration 10] [--output report.json]
+"""
+
+import argparse
+import http.cookiejar
+import json
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Endpoint name -> relative weight in the traffic mix
+TRAFFIC_MIX = {
+    'services': 50,
+    'guest_booking': 20,
+    'login': 10,
+    'admin_bookings': 20,
+}
+
+ADMIN = ('bench_admin', 'bench-password')
+CUSTOMER = ('bench_customer', 'bench-password')
+
+
+def bench_config(db_path):
+    return {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'SECRET_KEY': 'benchmark',
+        # The harness deliberately hammers login/booking from one IP
+        'RATE_LIMIT_ENABLED': False,
+    }
+
+
+def seed_database(db_path, services=20, bookings=5000, customers=50):
+    """Create the schema and a realistic dataset in a scratch database."""
+    from app import create_app
+    from app.db import db
+    from app.models import Booking, Service, User
+
+    app = create_app(bench_config(db_path))
+    with app.app_context():
+        db.create_all()
+        admin = User(username=ADMIN[0], role='admin')
+        admin.set_password(ADMIN[1])
+        customer = User(username=CUSTOMER[0], role='customer')
+        customer.set_password(CUSTOMER[1])
+        db.session.add_all([admin, customer])
+        # Extra customers share one hash; only the named ones ever log in
+        db.session.add_all([
+            User(username=f'customer{i}', password=customer.password, role='customer')
+            for i in range(customers)
+        ])
+        db.session.add_all([
+            Service(name=f'Service {i}', description=f'Benchmark service {i}', price=10.0 + i)
+            for i in range(services)
+        ])
+        db.session.flush()
+
+        start = datetime(2030, 1, 1, 9)
+        statuses = ['pending', 'confirmed', 'completed', 'cancelled']
+        db.session.bulk_insert_mappings(Booking, [
+            {
+                'service_id': 1 + i % services,
+                'user_id': None if i % 3 else 3 + i % customers,
+                'guest_name': f'Guest {i}',
+                'guest_email': f'guest{i}@example.com',
+                'booking_date': start + timedelta(hours=i),
+                'status': statuses[i % len(statuses)],
+            }
+            for i in range(bookings)
+        ])
+        db.session.commit()
+
+
+def serve(db_path, port):
+    """Run the app on a threaded Werkzeug server (child process entry point)."""
+    import logging
+    from werkzeug.serving import make_server
+    from app import create_app
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    app = create_app(bench_config(db_path))
+    make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_server(base_url, timeout=15.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(base_url + '/services', timeout=1).read()
+            return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.1)
+    raise RuntimeError(f'Server at {base_url} did not start')
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Treat redirects as the response so each request is timed on its own."""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def make_client():
+    jar = http.cookiejar.CookieJar()
+    return urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar), _NoRedirect())
+
+
+def request(client, url, data=None):
+    """Perform one request; returns the HTTP status (0 for connection errors)."""
+    body = urllib.parse.urlencode(data).encode() if data is not None else None
+    try:
+        with client.open(url, data=body, timeout=30) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as error:
+        error.read()
+        return error.code
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return 0
+
+
+class Worker(threading.Thread):
+    """One simulated client issuing weighted random requests until the deadline."""
+
+    def __init__(self, base_url, deadline, service_ids, results):
+        super().__init__(daemon=True)
+        self.base_url = base_url
+        self.deadline = deadline
+        self.service_ids = service_ids
+        self.results = results
+        self.rng = random.Random()
+        self.anonymous = make_client()
+        self.admin = make_client()
+
+    def login(self, client, username, password):
+        return request(client, self.base_url + '/auth/login',
+                       {'username': username, 'password': password})
+
+    def run(self):
+        self.login(self.admin, *ADMIN)
+        names, weights = zip(*TRAFFIC_MIX.items())
+        while time.time() < self.deadline:
+            name = self.rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            status = getattr(self, f'do_{name}')()
+            elapsed = time.perf_counter() - started
+            self.results[name].append((elapsed, status))
+
+    def do_services(self):
+        return request(self.anonymous, self.base_url + '/services')
+
+    def do_guest_booking(self):
+        service_id = self.rng.choice(self.service_ids)
+        when = datetime.now() + timedelta(days=self.rng.randint(1, 365), hours=self.rng.randint(0, 23))
+        return request(make_client(), f'{self.base_url}/bookings/new/{service_id}', {
+            'booking_date': when.strftime('%Y-%m-%d'),
+            'booking_time': when.strftime('%H:00'),
+            'guest_name': 'Load Test',
+            'guest_email': 'load@example.com',
+        })
+
+    def do_login(self):
+        return self.login(make_client(), *CUSTOMER)
+
+    def do_admin_bookings(self):
+        return request(self.admin, self.base_url + '/bookings/all')
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples, duration):
+    latencies = sorted(elapsed for elapsed, _ in samples)
+    errors = sum(1 for _, status in samples if status == 0 or status >= 400)
+    to_ms = lambda value: round(value * 1000, 2) if value is not None else None
+    return {
+        'requests': len(samples),
+        'throughput_rps': round(len(samples) / duration, 1),
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        'p50_ms': to_ms(percentile(latencies, 0.50)),
+        'p95_ms': to_ms(percentile(latencies, 0.95)),
+        'p99_ms': to_ms(percentile(latencies, 0.99)),
+        'max_ms': to_ms(latencies[-1] if latencies else None),
+    }
+
+
+def run_load(base_url, concurrency, duration, service_ids):
+    results = {name: [] for name in TRAFFIC_MIX}
+    deadline = time.time() + duration
+    workers = [Worker(base_url, deadline, service_ids, results) for _ in range(concurrency)]
+    started = time.time()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.time() - started
+
+    report = {name: summarize(samples, elapsed) for name, samples in results.items()}
+    report['total'] = summarize([s for samples in results.values() for s in samples], elapsed)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='Benchmark an already running server instead of a local one')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds of load')
+    parser.add_argument('--services', type=int, default=20)
+    parser.add_argument('--bookings', type=int, default=5000)
+    parser.add_argument('--output', help='Also write the JSON report to this file')
+    args = parser.parse_args()
+
+    server = None
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.url:
+            base_url = args.url.rstrip('/')
+        else:
+            db_path = os.path.join(tmp, 'bench.db')
+            seed_database(db_path, services=args.services, bookings=args.bookings)
+            port = free_port()
+            server = multiprocessing.Process(target=serve, args=(db_path, port), daemon=True)
+            server.start()
+            base_url = f'http://127.0.0.1:{port}'
+        try:
+            wait_for_server(base_url)
+            report = {
+                'started_at': datetime.utcnow().isoformat(timespec='seconds'),
+                'target': args.url or 'local werkzeug (threaded)',
+                'concurrency': args.concurrency,
+                'duration_s': args.duration,
+                'endpoints': run_load(base_url, args.concurrency, args.duration,
+                                      list(range(1, args.services + 1))),
+            }
+        finally:
+            if server is not None:
+                server.terminate()
+                server.join()
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            handle.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
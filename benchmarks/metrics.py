@@ -0,0 +1,94 @@
+"""Metrics hot-path overhead benchmark.
+
+Times, in microseconds per call:
+
+    counter_inc         Counter.inc with three labels
+    histogram_observe   Histogram.observe with one label
+    request_overhead    a test-client request with metrics on minus the
+                        same request with metrics off
+
+and the time to render /metrics for a populated registry. The target is a
+per-request overhead of a few microseconds.
+
+Usage:
+    python benchmarks/metrics.py [--calls 200000] [--requests 2000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def per_call_us(func, calls):
+    started = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def request_time_us(workdir, enabled, requests):
+    from app import create_app
+    from app.db import db
+
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.join(workdir, "metrics.db")}',
+        'SECRET_KEY': 'benchmark',
+        'METRICS_ENABLED': enabled,
+        'METRICS_DIR': os.path.join(workdir, 'metrics'),
+        'SLOW_QUERY_ENABLED': False,
+    })
+
+    @app.route('/benchmark-noop')
+    def noop():
+        return 'ok'
+
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    for _ in range(100):
+        client.get('/benchmark-noop')
+    started = time.perf_counter()
+    for _ in range(requests):
+        client.get('/benchmark-noop')
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=200000)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    from app.utils.metrics import Counter, Histogram, configure_metrics, render_metrics
+
+    with tempfile.TemporaryDirectory() as workdir:
+        configure_metrics(os.path.join(workdir, 'micro'))
+        counter = Counter('benchmark_total', 'Benchmark counter.', ['endpoint', 'method', 'status'])
+        histogram = Histogram('benchmark_seconds', 'Benchmark histogram.', ['endpoint'])
+        for index in range(200):
+            counter.inc(f'endpoint_{index}', 'GET', 200)
+            histogram.observe(index / 1000, f'endpoint_{index}')
+        report = {
+            'counter_inc_us': round(per_call_us(lambda: counter.inc('home', 'GET', 200), args.calls), 2),
+            'histogram_observe_us': round(per_call_us(lambda: histogram.observe(0.0123, 'home'), args.calls), 2),
+        }
+        started = time.perf_counter()
+        render_metrics()
+        report['render_ms'] = round((time.perf_counter() - started) * 1000, 2)
+
+        # Alternate to even out warm-up effects
+        disabled = min(request_time_us(workdir, False, args.requests) for _ in range(2))
+        enabled = min(request_time_us(workdir, True, args.requests) for _ in range(2))
+        report['request_us_metrics_off'] = round(disabled, 1)
+        report['request_us_metrics_on'] = round(enabled, 1)
+        report['request_overhead_us'] = round(enabled - disabled, 1)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
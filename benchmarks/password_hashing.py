@@ -0,0 +1,86 @@
+"""Password hashing throughput benchmark.
+
+Measures how many logins (hash verifications) per second the hashing pool
+sustains for several PASSWORD_HASH_METHOD / PASSWORD_HASH_WORKERS settings,
+with a fixed number of concurrent callers standing in for request threads.
+Use it to pick a cost that keeps login latency acceptable on your hardware.
+
+Usage:
+    python benchmarks/password_hashing.py [--callers 8] [--seconds 3]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.password_hashing import PasswordHasher, PasswordHashingBusy
+
+METHODS = [
+    'pbkdf2:sha256:260000',
+    'pbkdf2:sha256:600000',
+    'scrypt:16384:8:1',
+    'scrypt:32768:8:1',
+]
+
+
+def run(method, workers, callers, seconds, executor):
+    hasher = PasswordHasher(method, workers=workers, queue_limit=callers, executor=executor)
+    stored = hasher.hash('correct horse battery staple')
+    counts = {'ok': 0, 'busy': 0}
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.time() + seconds
+
+    def caller():
+        while time.time() < deadline:
+            started = time.perf_counter()
+            try:
+                hasher.verify(stored, 'correct horse battery staple')
+                outcome = 'ok'
+            except PasswordHashingBusy:
+                outcome = 'busy'
+            with lock:
+                counts[outcome] += 1
+                if outcome == 'ok':
+                    latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=caller) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    hasher.shutdown()
+
+    latencies.sort()
+    return {
+        'method': method,
+        'workers': workers,
+        'logins_per_sec': round(counts['ok'] / seconds, 1),
+        'rejected_busy': counts['busy'],
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--callers', type=int, default=8, help='Concurrent login attempts')
+    parser.add_argument('--seconds', type=float, default=3.0, help='Duration of each run')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--executor', choices=['thread', 'process'], default='thread')
+    args = parser.parse_args()
+
+    report = [
+        run(method, workers, args.callers, args.seconds, args.executor)
+        for method in METHODS
+        for workers in args.workers
+    ]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""HTTP throughput: ``flask serve`` against the debug dev server.
+
+Starts each server on a scratch database, drives it with --clients
+concurrent client processes (one request per connection) for --duration
+seconds per path, and reports requests/second and latency percentiles:
+
+    dev      flask run --debug, what ``python run.py`` used to start
+             (reloader and debugger on)
+    prefork  flask serve --workers N --threads M
+
+Usage:
+    python benchmarks/serving.py [--clients 16] [--duration 10] [--workers 4] [--threads 8]
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+APP_MODULE = '''
+from app import create_app
+
+app = create_app({{
+    'SQLALCHEMY_DATABASE_URI': 'sqlite:///{db_path}',
+    'SECRET_KEY': 'benchmark',
+    'RATE_LIMIT_ENABLED': False,
+    'METRICS_DIR': '{metrics_dir}',
+    'SLOW_QUERY_LOG_PATH': '',
+}})
+'''
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def prepare(workdir):
+    """Write the app module and seed the scratch database; return the module path."""
+    from app import create_app
+    from app.db import db
+    from app.models import Service
+
+    db_path = os.path.join(workdir, 'serving.db')
+    module = os.path.join(workdir, 'bench_app.py')
+    with open(module, 'w') as handle:
+        handle.write(APP_MODULE.format(db_path=db_path, metrics_dir=os.path.join(workdir, 'metrics')))
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}', 'SECRET_KEY': 'benchmark',
+                      'SLOW_QUERY_LOG_PATH': '', 'METRICS_ENABLED': False})
+    with app.app_context():
+        db.create_all()
+        for index in range(20):
+            db.session.add(Service(name=f'Service {index}', description='Benchmark service', price=10 + index))
+        db.session.commit()
+    return module
+
+
+def wait_until_up(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'server on port {port} did not start')
+
+
+def client(port, path, duration):
+    """Request ``path`` back to back for ``duration`` seconds; return (latencies, errors)."""
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            conn.request('GET', path, headers={'Connection': 'close'})
+            response = conn.getresponse()
+            response.read()
+            conn.close()
+        except OSError:
+            errors += 1
+            continue
+        if response.status != 200:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    return latencies, errors
+
+
+def load(port, path, clients, duration):
+    client(port, path, 1)  # Warm up templates, caches and connection pools
+    with multiprocessing.Pool(clients) as pool:
+        results = pool.starmap(client, [(port, path, duration)] * clients)
+    latencies = sorted(latency for result in results for latency in result[0])
+    errors = sum(result[1] for result in results)
+
+    def percentile(fraction):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000, 1) if latencies else None
+
+    return {
+        'requests_per_second': round(len(latencies) / duration, 1),
+        'p50_ms': percentile(0.5),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'errors': errors,
+    }
+
+
+def run_server(command, port, paths, args):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL, start_new_session=True)
+    try:
+        wait_until_up(port)
+        return {path: load(port, path, args.clients, args.duration) for path in paths}
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per path and server.')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--path', action='append', dest='paths', help='Path to request (repeatable).')
+    args = parser.parse_args()
+    paths = args.paths or ['/', '/services']
+
+    report = {'cpus': os.cpu_count(), 'clients': args.clients}
+    with tempfile.TemporaryDirectory() as workdir:
+        module = prepare(workdir)
+        flask = [sys.executable, '-m', 'flask', '--app', module]
+
+        port = free_port()
+        report['dev'] = run_server(flask + ['run', '--debug', '--port', str(port)], port, paths, args)
+
+        port = free_port()
+        report['prefork'] = run_server(flask + [
+            'serve', '--port', str(port), '--workers', str(args.workers), '--threads', str(args.threads),
+        ], port, paths, args)
+
+    for path in paths:
+        dev, prefork = report['dev'][path]['requests_per_second'], report['prefork'][path]['requests_per_second']
+        report.setdefault('speedup', {})[path] = round(prefork / dev, 2) if dev else None
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
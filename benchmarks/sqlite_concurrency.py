@@ -0,0 +1,135 @@
+"""Concurrent reader/writer benchmark for the SQLite engine profile.
+
+Runs the same mixed workload against a scratch database twice: once with
+SQLite's stock settings (rollback journal) and once with the pragmas from
+app.db.DEFAULT_SQLITE_PRAGMAS (WAL, busy_timeout, ...). Each reader and writer
+is a separate process, like gunicorn workers sharing instance/ps.db.
+
+Usage:
+    python benchmarks/sqlite_concurrency.py [--readers 4] [--writers 2] [--seconds 5]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, insert, select
+from sqlalchemy.exc import OperationalError
+
+from app.db import db, DEFAULT_SQLITE_PRAGMAS, apply_sqlite_pragmas
+from app.models import Booking, Service
+
+PROFILES = {
+    'default': {},
+    'tuned': DEFAULT_SQLITE_PRAGMAS,
+}
+
+
+def make_engine(path, pragmas):
+    # timeout=0 disables pysqlite's own retry loop so the only lock waiting
+    # is what the profile's busy_timeout pragma asks for
+    engine = create_engine(f'sqlite:///{path}', connect_args={'timeout': 0})
+
+    @event.listens_for(engine, 'connect')
+    def _connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+    return engine
+
+
+def setup_database(path, pragmas, rows=2000):
+    engine = make_engine(path, pragmas)
+    db.metadata.create_all(engine)
+    start = datetime(2030, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(Service.__table__), [{'name': 'Bath', 'price': 30.0}])
+        conn.execute(insert(Booking.__table__), [
+            {'service_id': 1, 'booking_date': start + timedelta(minutes=15 * i),
+             'status': 'pending', 'guest_name': f'guest{i}'}
+            for i in range(rows)
+        ])
+    engine.dispose()
+
+
+def reader(path, pragmas, deadline, results):
+    engine = make_engine(path, pragmas)
+    ops = errors = 0
+    page = (select(Booking.__table__)
+            .order_by(Booking.booking_date.desc(), Booking.id.desc())
+            .limit(21))
+    while time.time() < deadline:
+        try:
+            with engine.connect() as conn:
+                conn.execute(page).fetchall()
+            ops += 1
+        except OperationalError:
+            errors += 1
+    results.put(('read', ops, errors))
+
+
+def writer(path, pragmas, deadline, results):
+    engine = make_engine(path, pragmas)
+    ops = errors = 0
+    when = datetime(2031, 1, 1)
+    while time.time() < deadline:
+        try:
+            with engine.begin() as conn:
+                conn.execute(insert(Booking.__table__).values(
+                    service_id=1, booking_date=when, status='pending', guest_name='bench'))
+            ops += 1
+        except OperationalError:
+            errors += 1
+    results.put(('write', ops, errors))
+
+
+def run_profile(name, readers, writers, seconds):
+    pragmas = PROFILES[name]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        setup_database(path, pragmas)
+
+        results = multiprocessing.Queue()
+        deadline = time.time() + seconds
+        procs = [multiprocessing.Process(target=reader, args=(path, pragmas, deadline, results))
+                 for _ in range(readers)]
+        procs += [multiprocessing.Process(target=writer, args=(path, pragmas, deadline, results))
+                  for _ in range(writers)]
+        for proc in procs:
+            proc.start()
+        totals = {'read': [0, 0], 'write': [0, 0]}
+        for _ in procs:
+            kind, ops, errors = results.get()
+            totals[kind][0] += ops
+            totals[kind][1] += errors
+        for proc in procs:
+            proc.join()
+
+    return {
+        'profile': name,
+        'reads_per_sec': round(totals['read'][0] / seconds, 1),
+        'writes_per_sec': round(totals['write'][0] / seconds, 1),
+        'read_errors': totals['read'][1],
+        'write_errors': totals['write'][1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    args = parser.parse_args()
+
+    report = [run_profile(name, args.readers, args.writers, args.seconds) for name in PROFILES]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
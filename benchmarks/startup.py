@@ -0,0 +1,90 @@
+"""Cold-start latency of the app and the CLI.
+
+Each scenario runs --runs times in a fresh interpreter against a scratch
+database, with blueprints registered lazily (LAZY_BLUEPRINTS=1, the
+default) and eagerly (LAZY_BLUEPRINTS=0). Reports the median and minimum
+wall time in milliseconds:
+
+    boot           import the app and run create_app(), what a server
+                   worker or `flask serve` master does before serving
+    first_request  boot, then serve GET / through the test client
+    cli            `flask user list`
+
+Usage:
+    python benchmarks/startup.py [--runs 10]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+APP_MODULE = '''
+from app import create_app
+
+app = create_app({{
+    'SQLALCHEMY_DATABASE_URI': 'sqlite:///{db_path}',
+    'SECRET_KEY': 'benchmark',
+    'METRICS_DIR': '{metrics_dir}',
+    'SLOW_QUERY_LOG_PATH': '',
+}})
+'''
+
+
+def prepare(workdir):
+    """Write the app module and create the scratch database; return the module path."""
+    from app import create_app
+    from app.db import db
+
+    db_path = os.path.join(workdir, 'startup.db')
+    module = os.path.join(workdir, 'bench_app.py')
+    with open(module, 'w') as handle:
+        handle.write(APP_MODULE.format(db_path=db_path, metrics_dir=os.path.join(workdir, 'metrics')))
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}', 'SECRET_KEY': 'benchmark',
+                      'SLOW_QUERY_LOG_PATH': '', 'METRICS_ENABLED': False})
+    with app.app_context():
+        db.create_all()
+    return module
+
+
+def time_runs(command, env, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - started) * 1000)
+    return {'median_ms': round(statistics.median(timings), 1), 'min_ms': round(min(timings), 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    report = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        module = prepare(workdir)
+        workdir_import = f'import sys; sys.path.insert(0, {workdir!r}); '
+        scenarios = {
+            'boot': [sys.executable, '-c', workdir_import + 'import bench_app'],
+            'first_request': [sys.executable, '-c', workdir_import + (
+                'import bench_app; assert bench_app.app.test_client().get("/").status_code == 200')],
+            'cli': [sys.executable, '-m', 'flask', '--app', module, 'user', 'list'],
+        }
+        for lazy in ('1', '0'):
+            env = dict(os.environ, PYTHONPATH=ROOT, LAZY_BLUEPRINTS=lazy)
+            mode = 'lazy' if lazy == '1' else 'eager'
+            for name, command in scenarios.items():
+                report.setdefault(name, {})[mode] = time_runs(command, env, args.runs)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -51,6 +51,14 @@ def get_metadata():
     return target_db.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    """Keep autogenerate away from tables that only exist in hand-written
+    migrations, i.e. the FTS5 search index and its shadow tables."""
+    if type_ == 'table' and reflected and compare_to is None and name.startswith('service_fts'):
+        return False
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -93,10 +101,21 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        sqlite = connection.dialect.name == 'sqlite'
+        if sqlite:
+            # configure_sqlite turns foreign keys on for every connection, but
+            # batch migrations rebuild tables (copy, DROP, rename), and the
+            # DROP fails while other tables still reference the old one. The
+            # pragma is a no-op inside a transaction, so set it and commit
+            # before Alembic begins its own.
+            connection.exec_driver_sql('PRAGMA foreign_keys = OFF')
+            connection.commit()
+
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
@@ -106,6 +125,10 @@ def run_migrations_online():
         with context.begin_transaction():
             context.run_migrations()
 
+        if sqlite:
+            connection.exec_driver_sql('PRAGMA foreign_keys = ON')
+            connection.commit()
+
 
 if context.is_offline_mode():
     run_migrations_offline()
@@ -0,0 +1,34 @@
+"""Add indexes for booking access paths
+
+Revision ID: 3b7d2e91c4a8
+Revises: ef00a50bb467
+Create Date: 2026-10-17 09:12:41.205318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7d2e91c4a8'
+down_revision = 'ef00a50bb467'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.create_index('ix_booking_booking_date', ['booking_date'], unique=False)
+        batch_op.create_index('ix_booking_user_id_booking_date', ['user_id', 'booking_date'], unique=False)
+        batch_op.create_index('ix_booking_status_booking_date', ['status', 'booking_date'], unique=False)
+        batch_op.create_index('ix_booking_service_id_booking_date', ['service_id', 'booking_date'], unique=False)
+        batch_op.create_index('ix_booking_guest_email', ['guest_email'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.drop_index('ix_booking_guest_email')
+        batch_op.drop_index('ix_booking_service_id_booking_date')
+        batch_op.drop_index('ix_booking_status_booking_date')
+        batch_op.drop_index('ix_booking_user_id_booking_date')
+        batch_op.drop_index('ix_booking_booking_date')
@@ -0,0 +1,29 @@
+"""Add cache_version table for cross-process cache invalidation
+
+Revision ID: a41c7f0d2e55
+Revises: 3b7d2e91c4a8
+Create Date: 2026-10-17 11:03:27.914062
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41c7f0d2e55'
+down_revision = '3b7d2e91c4a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cache_version',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('cache_version')
@@ -0,0 +1,38 @@
+"""Add price to Booking
+
+Revision ID: b6e1f4a2d807
+Revises: a7d3e5c91f20
+Create Date: 2026-10-17 21:05:37.614290
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e1f4a2d807'
+down_revision = 'a7d3e5c91f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('price', sa.Float(), nullable=True))
+
+    # Existing bookings get their service's current price, and the rollup
+    # revenue is recomputed from those so later writes reverse exact amounts
+    op.execute('UPDATE booking SET price = (SELECT service.price FROM service WHERE service.id = booking.service_id)')
+    op.execute("""
+        UPDATE booking_rollup SET revenue = (
+            SELECT COALESCE(SUM(booking.price), 0) FROM booking
+            WHERE date(booking.booking_date) = booking_rollup.day
+              AND booking.service_id = booking_rollup.service_id
+              AND COALESCE(booking.status, 'pending') = booking_rollup.status
+        )
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.drop_column('price')
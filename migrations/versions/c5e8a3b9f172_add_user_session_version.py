@@ -0,0 +1,26 @@
+"""Add session_version to User
+
+Revision ID: c5e8a3b9f172
+Revises: a41c7f0d2e55
+Create Date: 2026-10-17 14:36:08.417253
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e8a3b9f172'
+down_revision = 'a41c7f0d2e55'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('session_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('session_version')
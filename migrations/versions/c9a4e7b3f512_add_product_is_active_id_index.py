@@ -0,0 +1,28 @@
+"""Add (is_active, id) index for newest-first shop pages
+
+Revision ID: c9a4e7b3f512
+Revises: b6e1f4a2d807
+Create Date: 2026-10-17 21:48:12.305871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9a4e7b3f512'
+down_revision = 'b6e1f4a2d807'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # if_not_exists: databases created while d8f2b6a41e93 briefly included
+    # this index already have it
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.create_index('ix_product_is_active_id', ['is_active', 'id'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.drop_index('ix_product_is_active_id', if_exists=True)
@@ -0,0 +1,67 @@
+"""Add product table for the shop catalog
+
+Revision ID: d8f2b6a41e93
+Revises: c5e8a3b9f172
+Create Date: 2026-10-17 16:12:45.208731
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8f2b6a41e93'
+down_revision = 'c5e8a3b9f172'
+branch_labels = None
+depends_on = None
+
+# The products previously hard-coded in the shop view
+INITIAL_PRODUCTS = [
+    ('Premium Dog Food', 'High-quality nutrition for your furry friend', 'food', 49.99, '🍖'),
+    ('Cat Grooming Kit', 'Complete grooming essentials for cats', 'grooming', 29.99, '🧴'),
+    ('Pet Toy Set', 'Fun and interactive toys for pets', 'toys', 19.99, '🎾'),
+    ('Pet Carrier', 'Safe and comfortable travel carrier', 'travel', 79.99, '🎒'),
+    ('Pet Bed', 'Cozy and comfortable pet bed', 'beds', 39.99, '🛏️'),
+    ('Dog Leash', 'Durable and comfortable dog leash', 'walking', 15.99, '🦮'),
+]
+
+
+def upgrade():
+    product = op.create_table('product',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('image', sa.String(length=16), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.create_index('ix_product_is_active_price', ['is_active', 'price'], unique=False)
+        batch_op.create_index('ix_product_is_active_name', ['is_active', 'name'], unique=False)
+        batch_op.create_index('ix_product_is_active_category', ['is_active', 'category'], unique=False)
+        batch_op.create_index('ix_product_is_active_category_price', ['is_active', 'category', 'price'], unique=False)
+        batch_op.create_index('ix_product_is_active_category_name', ['is_active', 'category', 'name'], unique=False)
+
+    now = datetime.utcnow()
+    op.bulk_insert(product, [
+        {'name': name, 'description': description, 'category': category, 'price': price,
+         'image': image, 'is_active': True, 'created_at': now, 'updated_at': now}
+        for name, description, category, price, image in INITIAL_PRODUCTS
+    ])
+
+
+def downgrade():
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.drop_index('ix_product_is_active_category_name')
+        batch_op.drop_index('ix_product_is_active_category_price')
+        batch_op.drop_index('ix_product_is_active_category')
+        batch_op.drop_index('ix_product_is_active_name')
+        batch_op.drop_index('ix_product_is_active_price')
+
+    op.drop_table('product')
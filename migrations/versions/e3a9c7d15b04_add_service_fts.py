@@ -0,0 +1,56 @@
+"""Add FTS5 full-text index over services
+
+Revision ID: e3a9c7d15b04
+Revises: d8f2b6a41e93
+Create Date: 2026-10-17 17:05:31.640218
+
+service_fts is an external-content FTS5 table kept in sync by triggers on
+the service table. Note that a later batch_alter_table on 'service' recreates
+the table and drops these triggers; such a migration must recreate them.
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3a9c7d15b04'
+down_revision = 'd8f2b6a41e93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE VIRTUAL TABLE service_fts USING fts5(
+            name, description,
+            content='service', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER service_fts_ai AFTER INSERT ON service BEGIN
+            INSERT INTO service_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER service_fts_ad AFTER DELETE ON service BEGIN
+            INSERT INTO service_fts(service_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER service_fts_au AFTER UPDATE OF name, description ON service BEGIN
+            INSERT INTO service_fts(service_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO service_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+        END
+    """)
+    # Index the services that already exist
+    op.execute("INSERT INTO service_fts(service_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    op.execute('DROP TRIGGER IF EXISTS service_fts_au')
+    op.execute('DROP TRIGGER IF EXISTS service_fts_ad')
+    op.execute('DROP TRIGGER IF EXISTS service_fts_ai')
+    op.execute('DROP TABLE IF EXISTS service_fts')
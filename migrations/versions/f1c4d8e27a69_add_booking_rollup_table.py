@@ -0,0 +1,45 @@
+"""Add booking_rollup table for analytics
+
+Revision ID: f1c4d8e27a69
+Revises: e3a9c7d15b04
+Create Date: 2026-10-17 18:02:14.559310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c4d8e27a69'
+down_revision = 'e3a9c7d15b04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('booking_rollup',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('service_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('bookings', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'service_id', 'status')
+    )
+    with op.batch_alter_table('booking_rollup', schema=None) as batch_op:
+        batch_op.create_index('ix_booking_rollup_service_id_day', ['service_id', 'day'], unique=False)
+
+    # Backfill from the bookings that already exist
+    op.execute("""
+        INSERT INTO booking_rollup (day, service_id, status, bookings, revenue)
+        SELECT date(booking.booking_date), booking.service_id, COALESCE(booking.status, 'pending'),
+               COUNT(*), COALESCE(SUM(service.price), 0)
+        FROM booking LEFT JOIN service ON service.id = booking.service_id
+        GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('booking_rollup', schema=None) as batch_op:
+        batch_op.drop_index('ix_booking_rollup_service_id_day')
+
+    op.drop_table('booking_rollup')
@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.db import db  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    """App on a scratch SQLite database with every table created."""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "test.db"}',
+        'SECRET_KEY': 'test',
+        'RATE_LIMIT_ENABLED': False,
+        'METRICS_ENABLED': False,
+        'METRICS_DIR': str(tmp_path / 'metrics'),
+        'SLOW_QUERY_LOG_PATH': '',
+        'JINJA_BYTECODE_CACHE_DIR': '',
+        'FRAGMENT_CACHE_BACKEND': 'none',
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
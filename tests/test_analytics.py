@@ -0,0 +1,76 @@
+from datetime import datetime
+
+from app.db import db
+from app.models import Booking, BookingRollup, Service
+from app.utils.analytics import rebuild_rollups
+
+
+def rollups():
+    return {(row.day, row.service_id, row.status): (row.bookings, round(row.revenue, 2))
+            for row in BookingRollup.query.all() if row.bookings or row.revenue}
+
+
+def add_booking(service, status='pending'):
+    booking = Booking(service_id=service.id, guest_name='Guest', guest_email='guest@example.com',
+                      booking_date=datetime(2030, 1, 1, 10), status=status)
+    db.session.add(booking)
+    db.session.commit()
+    return booking
+
+
+def test_booking_keeps_price_it_was_booked_at(app):
+    service = Service(name='Grooming', price=40.0)
+    db.session.add(service)
+    db.session.commit()
+    booking = add_booking(service)
+
+    service.price = 55.0
+    db.session.commit()
+    booking.status = 'confirmed'
+    db.session.commit()
+
+    assert booking.price == 40.0
+    assert rollups() == {(booking.booking_date.date(), service.id, 'confirmed'): (1, 40.0)}
+
+
+def test_incremental_rollups_match_rebuild_after_price_change(app):
+    service = Service(name='Grooming', price=40.0)
+    db.session.add(service)
+    db.session.commit()
+    first = add_booking(service)
+    service.price = 55.0
+    db.session.commit()
+    add_booking(service)
+    first.status = 'completed'
+    db.session.commit()
+
+    incremental = rollups()
+    rebuild_rollups()
+    assert rollups() == incremental
+
+
+def test_deleting_expired_booking_decrements_rollup(app):
+    service = Service(name='Grooming', price=40.0)
+    db.session.add(service)
+    db.session.commit()
+    booking = add_booking(service, status='confirmed')
+    add_booking(service, status='confirmed')
+    db.session.expire_all()  # As after any commit: nothing loaded in memory
+
+    db.session.delete(booking)
+    db.session.commit()
+
+    assert rollups() == {(datetime(2030, 1, 1).date(), service.id, 'confirmed'): (1, 40.0)}
+
+
+def test_deleting_changed_booking_uses_committed_values(app):
+    service = Service(name='Grooming', price=40.0)
+    db.session.add(service)
+    db.session.commit()
+    booking = add_booking(service)
+
+    booking.status = 'cancelled'
+    db.session.delete(booking)
+    db.session.commit()
+
+    assert rollups() == {}
@@ -0,0 +1,61 @@
+import threading
+
+from app.db import db
+from app.models import Booking, Service
+from app.routes import bookings as booking_routes
+from app.utils.availability import is_slot_available
+
+
+def booking_form(name):
+    return {'booking_date': '2030-01-07', 'booking_time': '10:00',
+            'guest_name': name, 'guest_email': f'{name.lower()}@example.com'}
+
+
+def make_service():
+    service = Service(name='Grooming', price=25)
+    db.session.add(service)
+    db.session.commit()
+    return service.id
+
+
+def test_guest_booking_created(app, client):
+    service_id = make_service()
+    response = client.post(f'/bookings/new/{service_id}', data=booking_form('Ann'))
+    assert response.status_code == 302
+    assert Booking.query.count() == 1
+
+
+def test_full_slot_rejected(app, client):
+    service_id = make_service()
+    client.post(f'/bookings/new/{service_id}', data=booking_form('Ann'))
+    response = client.post(f'/bookings/new/{service_id}', data=booking_form('Bob'))
+    assert b'fully booked' in response.data
+    assert Booking.query.count() == 1
+
+
+def test_concurrent_requests_cannot_overbook_slot(app, monkeypatch):
+    """Both requests pass the availability check before either inserts."""
+    service_id = make_service()
+    both_checked = threading.Barrier(2, timeout=10)
+
+    def racing_is_slot_available(*args):
+        available = is_slot_available(*args)
+        both_checked.wait()
+        return available
+
+    monkeypatch.setattr(booking_routes, 'is_slot_available', racing_is_slot_available)
+    responses = {}
+
+    def book(name):
+        responses[name] = app.test_client().post(f'/bookings/new/{service_id}', data=booking_form(name))
+
+    threads = [threading.Thread(target=book, args=(name,)) for name in ('Ann', 'Bob')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    db.session.remove()
+    assert Booking.query.count() == 1
+    assert sorted(response.status_code for response in responses.values()) == [200, 302]
+    assert any(b'fully booked' in response.data for response in responses.values())
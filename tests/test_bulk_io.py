@@ -0,0 +1,47 @@
+import io
+
+from werkzeug.security import generate_password_hash
+
+from app.db import db
+from app.models import User
+from app.utils.bulk_io import import_records, read_records
+from app.utils.identity_cache import load_cached_user
+
+
+def import_users(csv_text):
+    result = import_records('user', read_records(io.StringIO(csv_text), 'csv'))
+    assert result.errors == []
+    return result
+
+
+def make_user(password_hash):
+    user = User(username='ann', role='customer', password=password_hash)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def test_import_with_new_password_signs_out_existing_sessions(app):
+    user = make_user(generate_password_hash('old', method='pbkdf2:sha256:1000'))
+    session_id = user.get_id()
+    assert load_cached_user(session_id) is not None
+
+    new_hash = generate_password_hash('new', method='pbkdf2:sha256:1000')
+    assert import_users(f'username,password_hash\nann,{new_hash}\n').updated == 1
+
+    db.session.expire_all()
+    assert user.session_version == 1
+    assert load_cached_user(session_id) is None
+    assert load_cached_user(user.get_id()) is not None
+
+
+def test_import_with_same_password_keeps_sessions(app):
+    password_hash = generate_password_hash('old', method='pbkdf2:sha256:1000')
+    user = make_user(password_hash)
+    session_id = user.get_id()
+
+    import_users(f'username,role,password_hash\nann,admin,{password_hash}\n')
+
+    db.session.expire_all()
+    assert (user.role, user.session_version) == ('admin', 0)
+    assert load_cached_user(session_id) is not None
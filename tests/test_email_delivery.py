@@ -0,0 +1,137 @@
+"""Email delivery through the job queue, against a local SMTP sink."""
+
+import email
+import email.policy
+import socket
+import socketserver
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.db import db
+from app.models import Booking, Job, Service
+from app.utils.jobs import Worker, enqueue
+from app.utils.notifications import queue_booking_confirmation, queue_contact_message
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Just enough server-side SMTP for smtplib: accepts and stores every message."""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.reply('220 sink ready')
+        recipients = []
+        for raw in self.rfile:
+            command = raw.decode('ascii', 'replace').strip()
+            verb = command[:4].upper()
+            if verb in ('EHLO', 'HELO'):
+                self.reply('250 sink')
+            elif verb == 'MAIL':
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                recipients.append(command.split(':', 1)[1].strip(' <>'))
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                lines = []
+                for line in self.rfile:
+                    if line in (b'.\r\n', b'.\n'):
+                        break
+                    lines.append(line[1:] if line.startswith(b'..') else line)
+                message = email.message_from_bytes(b''.join(lines), policy=email.policy.default)
+                self.server.messages.append((recipients, message))
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:  # RSET, NOOP
+                self.reply('250 OK')
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), SMTPSinkHandler)
+        self.port = self.server_address[1]
+        self.messages = []
+
+
+def closed_port():
+    """A localhost port nothing is listening on."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def sink(app):
+    server = SMTPSink()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    app.config.update(MAIL_SERVER='127.0.0.1', MAIL_PORT=server.port, MAIL_TIMEOUT=5,
+                      CONTACT_EMAIL_TO='staff@example.com')
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def run_worker(app):
+    return Worker(app, concurrency=2, burst=True).run()
+
+
+def test_booking_confirmation_and_contact_message_delivered(app, sink):
+    service = Service(name='Grooming', price=25)
+    db.session.add(service)
+    db.session.flush()
+    for index in range(3):
+        booking = Booking(service_id=service.id, guest_name=f'Guest {index}', guest_email=f'guest{index}@example.com',
+                          booking_date=datetime(2030, 1, 1, 9) + timedelta(hours=index))
+        db.session.add(booking)
+        queue_booking_confirmation(booking)
+    queue_contact_message('Jane  Doe', 'jane@example.com', 'Do you groom cats?')
+    db.session.commit()
+
+    stats = run_worker(app)
+
+    assert stats == {'done': 4, 'retry': 0, 'dead': 0}
+    recipients = sorted(address for to, _ in sink.messages for address in to)
+    assert recipients == ['guest0@example.com', 'guest1@example.com', 'guest2@example.com', 'staff@example.com']
+    subjects = {message['Subject']: message for _, message in sink.messages}
+    assert 'Your booking for Grooming' in subjects
+    assert subjects['Contact form: Jane Doe']['Reply-To'] == 'jane@example.com'
+    assert Job.query.count() == 0
+
+
+def test_refused_delivery_is_retried(app, sink):
+    app.config['MAIL_PORT'] = closed_port()
+    queue_contact_message('Retry', 'retry@example.com', 'Sent while the mail server is down')
+    db.session.commit()
+
+    assert run_worker(app) == {'done': 0, 'retry': 1, 'dead': 0}
+    job = Job.query.one()
+    assert (job.status, job.attempts) == ('queued', 1)
+    assert 'ConnectionRefusedError' in job.last_error
+    assert job.run_at > datetime.utcnow()
+
+    app.config['MAIL_PORT'] = sink.port
+    job.run_at = datetime.utcnow()
+    db.session.commit()
+
+    assert run_worker(app) == {'done': 1, 'retry': 0, 'dead': 0}
+    assert Job.query.count() == 0
+    assert [message['Reply-To'] for _, message in sink.messages] == ['retry@example.com']
+
+
+def test_refused_delivery_is_dead_lettered_after_last_attempt(app, sink):
+    app.config['MAIL_PORT'] = closed_port()
+    enqueue('contact_message', {'name': 'Dead', 'email': 'dead@example.com', 'message': 'Never sent'},
+            max_attempts=1)
+    db.session.commit()
+
+    assert run_worker(app) == {'done': 0, 'retry': 0, 'dead': 1}
+    assert [job.status for job in Job.query.all()] == ['dead']
+    assert sink.messages == []
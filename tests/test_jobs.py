@@ -0,0 +1,39 @@
+from sqlalchemy.exc import OperationalError
+
+from app.db import db
+from app.models import Job
+from app.utils import jobs
+from app.utils.jobs import Worker, enqueue, job_handler
+
+processed = []
+
+
+@job_handler('test_record')
+def record(payload):
+    processed.append(payload['n'])
+
+
+def test_worker_survives_database_errors(app, monkeypatch):
+    processed.clear()
+    for n in range(3):
+        enqueue('test_record', {'n': n})
+    db.session.commit()
+
+    claim_job = jobs.claim_job
+    calls = []
+
+    def flaky_claim_job(worker_id):
+        calls.append(worker_id)
+        if len(calls) == 1:
+            raise OperationalError('UPDATE job ...', {}, Exception('database is locked'))
+        return claim_job(worker_id)
+
+    monkeypatch.setattr(jobs, 'claim_job', flaky_claim_job)
+    worker = Worker(app, concurrency=1, burst=True)
+    worker.ERROR_BACKOFF_BASE = 0.01
+
+    stats = worker.run()
+
+    assert sorted(processed) == [0, 1, 2]
+    assert stats == {'done': 3, 'retry': 0, 'dead': 0}
+    assert Job.query.count() == 0